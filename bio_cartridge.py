@@ -14,16 +14,37 @@ Structure:
 PROJECT OMNI: Context Morphing 완벽 지원
 """
 
+import sys
 import logging
 import json
+import sqlite3
+import threading
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
-import pickle
 
 logger = logging.getLogger(__name__)
 
+CARTRIDGE_DIR = Path(__file__).resolve().parent
+TOOLS_DIR = CARTRIDGE_DIR / "tools"
+
+
+def resolve_knowledge_dir() -> Path:
+    """SBI 인덱스 경로 (tools/sbi_registry.default_db_path, manifest.yaml의 paths.knowledge)
+
+    ResearchEngine, verify_brain.py와 같은 함수로 정하므로 같은 프로세스에서는 공유 SBIPipeline을
+    함께 쓴다. tools 모듈을 불러올 수 없으면 knowledge_base를 사용한다.
+    """
+    if str(TOOLS_DIR) not in sys.path:
+        sys.path.append(str(TOOLS_DIR))
+    try:
+        from sbi_registry import default_db_path
+    except ImportError as e:
+        logger.warning(f"⚠️ SBI registry unavailable ({e}); using default knowledge path")
+        return CARTRIDGE_DIR / "knowledge_base"
+    return Path(default_db_path())
+
 
 class ResearchDomain(Enum):
     """생물학 연구 도메인"""
@@ -52,9 +73,10 @@ class BioMemory:
     tools/sbi_pipeline.py와 통합
     """
     
-    def __init__(self, knowledge_dir: str = "./knowledge"):
-        self.knowledge_dir = Path(knowledge_dir)
-        self.knowledge_dir.mkdir(exist_ok=True)
+    def __init__(self, knowledge_dir: Optional[str] = None):
+        # 기본 경로: ResearchEngine 등과 공유하는 SBI 인덱스 경로 (manifest.yaml의 paths.knowledge)
+        self.knowledge_dir = Path(knowledge_dir) if knowledge_dir else resolve_knowledge_dir()
+        self.knowledge_dir.mkdir(parents=True, exist_ok=True)
         
         # 기초 생물학 지식
         self.knowledge_base = {
@@ -90,21 +112,29 @@ class BioMemory:
         }
         
         self.research_data = {}
+        self.indexed_chunks = 0
+        self._pipeline = None  # 공유 SBIPipeline (처음 검색할 때 가져옴, 실패 시 False)
         self._load_faiss_index()
         
     def _load_faiss_index(self):
-        """FAISS 인덱스 로드 (tools/sbi_pipeline.py)"""
-        faiss_path = self.knowledge_dir / "faiss_index.bin"
-        pkl_path = self.knowledge_dir / "knowledge_data.pkl"
+        """FAISS 인덱스 확인 (tools/sbi_pipeline.py)
+
+        청크 본문은 sbi_pipeline의 SQLite 저장소(knowledge.db)에서 필요할 때만 읽으므로
+        여기서는 청크 수만 확인한다. 인덱스 스냅샷 파일명은 세대마다 바뀌므로 커밋된 상태는
+        knowledge.db를 기준으로 판단한다.
+        """
+        store_path = self.knowledge_dir / "knowledge.db"
         
-        if faiss_path.exists():
-            logger.info("🧬 Loading FAISS index...")
+        if store_path.exists():
             try:
-                with open(pkl_path, 'rb') as f:
-                    self.research_data = pickle.load(f)
-                logger.info(f"✅ FAISS loaded: {len(self.research_data)} entries")
+                conn = sqlite3.connect(f"file:{store_path}?mode=ro", uri=True)
+                try:
+                    self.indexed_chunks = conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+                finally:
+                    conn.close()
+                logger.info(f"✅ FAISS index found: {self.indexed_chunks} chunks")
             except Exception as e:
-                logger.warning(f"⚠️ FAISS load failed: {e}")
+                logger.warning(f"⚠️ FAISS index check failed: {e}")
     
     def recall_knowledge(self, topic: str) -> Dict[str, Any]:
         """지식 회상"""
@@ -112,11 +142,38 @@ class BioMemory:
             return self.knowledge_base[topic]
         return {}
     
+    def _shared_pipeline(self):
+        """knowledge_dir 인덱스의 공유 SBIPipeline (tools/sbi_registry.py)
+
+        ResearchEngine 등 같은 프로세스의 다른 사용자와 FAISS 인덱스와 임베딩 모델을 공유한다.
+        인덱스가 없거나 의존성이 없으면 None.
+        """
+        if self._pipeline is None and (self.knowledge_dir / "knowledge.db").exists():
+            if str(TOOLS_DIR) not in sys.path:
+                sys.path.append(str(TOOLS_DIR))
+            try:
+                from sbi_registry import acquire_pipeline
+                self._pipeline = acquire_pipeline(str(self.knowledge_dir))
+            except Exception as e:
+                logger.warning(f"⚠️ SBI pipeline unavailable: {e}")
+                self._pipeline = False
+        return self._pipeline or None
+
     def search_papers(self, query: str, limit: int = 10) -> List[Dict]:
         """FAISS를 사용한 논문 검색 (sbi_pipeline.py)"""
         logger.info(f"🧬 Searching papers: {query}")
-        # sbi_pipeline.py의 검색 로직을 호출
+        # sbi_pipeline.py의 검색 로직을 호출 (인덱스가 없으면 저장된 연구 결과에서 찾음)
+        pipeline = self._shared_pipeline()
+        if pipeline:
+            return pipeline.search(query, n_results=limit)
         return self.research_data.get(query, [])[:limit]
+
+    def release(self):
+        """공유 SBIPipeline 참조 반환"""
+        if self._pipeline:
+            from sbi_registry import release_pipeline
+            release_pipeline(self._pipeline)
+        self._pipeline = None
     
     def add_research_result(self, domain: str, result: Dict):
         """연구 결과 추가"""
@@ -491,13 +548,47 @@ class BioCartridge:
         }
 
 
-# 전역 인스턴스
-bio_cartridge = BioCartridge()
+class _LazyCartridge:
+    """처음 속성에 접근할 때(activate() 포함) BioCartridge를 생성하는 대리 객체
+
+    PROJECT OMNI Context Morphing은 여러 카트리지를 임포트하므로, 임포트만으로는 지식 폴더
+    생성이나 인덱스 확인을 하지 않는다.
+    """
+
+    def __init__(self, factory):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    object.__setattr__(self, "_instance", self._factory())
+        return self._instance
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._get(), name, value)
+
+    def __repr__(self):
+        return f"<lazy BioCartridge ({'initialized' if self.initialized else 'not initialized'})>"
+
+
+# 전역 인스턴스 (처음 사용할 때 생성)
+bio_cartridge = _LazyCartridge(BioCartridge)
 
 
 def init_bio_cartridge():
     """Bio-Cartridge 초기화"""
     logger.info("🧬 Initializing Bio-Cartridge...")
+    bio_cartridge._get()
     logger.info("✅ Bio-Cartridge ready")
 
 
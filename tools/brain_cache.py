@@ -0,0 +1,119 @@
+# tools/brain_cache.py
+"""
+BrainCache - Brain 응답 디스크 캐시
+같은 프롬프트(정규화 기준), task_type, Brain 클래스 조합의 응답을 SQLite에 보관하여 재사용
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed);
+"""
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_prompt(prompt: str) -> str:
+    """공백 차이를 무시하도록 프롬프트 정규화"""
+    return _WHITESPACE_RE.sub(' ', prompt).strip()
+
+
+class BrainCache:
+    """Brain 응답 캐시 (SQLite, TTL + 항목 수 제한 LRU)
+
+    키는 정규화된 프롬프트, task_type, Brain 클래스 이름의 SHA-256이다. 프롬프트에는 검색된
+    근거 문서가 포함되므로 코퍼스가 바뀌면 키도 바뀌어 자연히 새로 계산된다.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = 7 * 24 * 3600, max_entries: int = 5000):
+        """
+        Args:
+            path: 캐시 SQLite 파일 경로
+            ttl: 응답 유효 시간 (초, None이면 무제한)
+            max_entries: 최대 항목 수 (초과 시 가장 오래 사용되지 않은 항목부터 삭제)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def make_key(prompt: str, task_type: str, brain_name: str) -> str:
+        payload = "\x00".join([brain_name, task_type, normalize_prompt(prompt)])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """캐시된 응답 조회 (만료된 항목은 삭제)"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str):
+        """응답 저장 (항목 수 제한을 넘으면 오래 사용되지 않은 항목부터 삭제)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, accessed) "
+                "VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계 (항목 수, 적중/실패 수, 적중률 = 절약한 Brain 호출 비율)"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,73 @@
+# tools/conftest.py
+"""
+pytest 공통 설정
+임베딩 모델은 텍스트 해시로 정해지는 가짜 SentenceTransformer로 바꿔 모델 다운로드 없이 빠르게 실행
+"""
+
+import hashlib
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+EMBEDDING_DIM = 384
+
+
+class FakeSentenceTransformer:
+    """같은 텍스트에 항상 같은 벡터를 돌려주는 임베딩 모델 (검색 결과를 정확히 예측할 수 있음)"""
+
+    max_seq_length = 256
+
+    def __init__(self, name, *args, **kwargs):
+        self.name = name
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        vectors = [
+            np.random.default_rng(int(hashlib.md5(text.encode()).hexdigest()[:8], 16))
+            .standard_normal(EMBEDDING_DIM)
+            .astype('float32')
+            for text in texts
+        ]
+        return np.array(vectors, dtype='float32').reshape(len(texts), EMBEDDING_DIM)
+
+
+# sbi_pipeline을 임포트하기 전에 설치해야 설치 여부 확인(_installed)에서도 사용됨
+_fake = types.ModuleType('sentence_transformers')
+_fake.SentenceTransformer = FakeSentenceTransformer
+sys.modules['sentence_transformers'] = _fake
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_docs(root, count: int, words: int = 400, prefix: str = 'doc', folder: str = ''):
+    """문서마다 고유한 단어로 이루어진 텍스트 파일 생성 (경로 목록 반환)"""
+    directory = os.path.join(str(root), folder)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"{prefix}{i:02d}.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(" ".join(f"{prefix}{i}w{j}" for j in range(words)))
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def docs(tmp_path):
+    """인덱싱할 문서 폴더 (12개 파일)"""
+    root = tmp_path / "onedrive"
+    write_docs(root, 12)
+    return root
+
+
+@pytest.fixture
+def pipeline(tmp_path, docs):
+    """docs를 인덱싱한 SBIPipeline (기본 설정)"""
+    from sbi_pipeline import SBIPipeline
+
+    pipeline = SBIPipeline(str(docs), str(tmp_path / "db"), max_workers=1)
+    pipeline.load_and_index()
+    yield pipeline
+    pipeline.close()
@@ -0,0 +1,93 @@
+# tools/context_packer.py
+"""
+Context Packer
+검색된 근거 문서를 중복 제거/순위화하여 토큰 예산 안에서 프롬프트 컨텍스트로 구성
+"""
+
+from typing import Dict, List, Set
+
+from sbi_lexical import estimate_tokens, tokenize
+
+RRF_K = 60  # 소스별 순위를 공통 점수로 바꾸는 Reciprocal Rank 상수
+
+
+def shingles(text: str, size: int = 3) -> Set[tuple]:
+    """토큰 size-gram 집합 (근접 중복 판정용)"""
+    tokens = tokenize(text)
+    if len(tokens) < size:
+        return {tuple(tokens)} if tokens else set()
+    return {tuple(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def _jaccard(a: Set[tuple], b: Set[tuple]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """추정 토큰 수가 max_tokens 이하가 되도록 본문 뒤쪽을 잘라냄"""
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    cut = len(text) * max_tokens // tokens
+    while cut > 0 and estimate_tokens(text[:cut]) > max_tokens:
+        cut = cut * 9 // 10
+    return text[:cut]
+
+
+def pack_context(
+    items: List[Dict],
+    token_budget: int = 3000,
+    per_source_cap: int = 2,
+    max_item_tokens: int = 600,
+    similarity: float = 0.8,
+    min_item_tokens: int = 64,
+) -> List[Dict]:
+    """근거 문서를 토큰 예산 안에 채워 넣기
+
+    1. 순위 점수: 소스(검색 경로)별 순위를 1 / (RRF_K + rank)로 바꿔 서로 다른 검색 결과를 비교
+    2. 중복 제거: 더 높은 순위의 항목과 토큰 3-gram Jaccard 유사도가 similarity 이상이면 제외
+       (겹치는 청크, 같은 문서가 여러 경로로 검색된 경우)
+    3. 점수 순으로 담되, 같은 source는 per_source_cap개까지만 넣고 항목당 max_item_tokens로 자른다.
+       남은 예산보다 큰 항목은 min_item_tokens 이상 남았을 때만 잘라서 넣는다.
+
+    Args:
+        items: {source, content, rank} 목록 (rank는 해당 검색 결과 안에서의 0부터 시작하는 순위,
+            나머지 키는 그대로 유지)
+
+    Returns:
+        선택된 항목 (점수 순). content는 잘린 본문이며 score, tokens 키가 추가된다.
+    """
+    ranked = sorted(enumerate(items), key=lambda pair: (pair[1].get('rank', 0), pair[0]))
+    selected, seen, per_source = [], [], {}
+    used = 0
+
+    for _, item in ranked:
+        if used >= token_budget:
+            break
+        source = item.get('source')
+        if per_source.get(source, 0) >= per_source_cap:
+            continue
+
+        fingerprint = shingles(item['content'])
+        if any(_jaccard(fingerprint, other) >= similarity for other in seen):
+            continue
+
+        content = truncate_to_tokens(item['content'], min(max_item_tokens, token_budget - used))
+        if content != item['content'] and token_budget - used < min(
+            min_item_tokens, max_item_tokens
+        ):
+            continue  # 남은 예산에 의미 있는 분량이 들어가지 않음
+        tokens = estimate_tokens(content)
+
+        seen.append(fingerprint)
+        per_source[source] = per_source.get(source, 0) + 1
+        used += tokens
+        selected.append(
+            dict(
+                item, content=content, tokens=tokens, score=1.0 / (RRF_K + item.get('rank', 0) + 1)
+            )
+        )
+
+    return selected
@@ -0,0 +1,175 @@
+# tools/local_index.py
+"""
+LocalDocIndex - 로컬 연구 문서(.md) 검색 인덱스
+ResearchEngine.meta_analyze의 로컬 문서 검색을 전체 트리 스캔 대신 영구 BM25 역색인으로 처리
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+from loguru import logger
+
+from sbi_lexical import LexicalIndex
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT UNIQUE NOT NULL,
+    source TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+"""
+
+
+class LocalDocIndex:
+    """로컬 마크다운 문서 인덱스
+
+    문서 경로, 크기, mtime, 본문을 docs 테이블에 두고 본문은 BM25 역색인(sbi_lexical)으로 색인한다.
+    refresh()는 stat만으로 바뀐 파일을 찾아 그 파일만 다시 읽으며, search()는 마지막 갱신 후
+    refresh_interval초가 지났을 때만 refresh()를 호출하므로 대부분의 질의는 SQLite 조회만 한다.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        dirs: Iterable[str],
+        db_path: str,
+        extensions=(".md",),
+        refresh_interval: float = 60.0,
+    ):
+        """
+        Args:
+            root: 검색 기준 폴더 (프로젝트 루트)
+            dirs: root 아래에서 색인할 하위 폴더 목록
+            db_path: 인덱스 SQLite 파일 경로
+            extensions: 색인할 파일 확장자
+            refresh_interval: search() 시 변경 확인 최소 간격 (초, 0이면 매번 확인)
+        """
+        self.root = root
+        self.dirs = list(dirs)
+        self.db_path = db_path
+        self.extensions = tuple(extensions)
+        self.refresh_interval = refresh_interval
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.lexical = LexicalIndex(self._conn)
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def _scan(self) -> Dict[str, tuple]:
+        """색인 대상 파일 목록 (path -> (source, size, mtime_ns)), 파일 내용은 읽지 않음"""
+        found = {}
+        for sub in self.dirs:
+            target_path = os.path.join(self.root, sub)
+            if not os.path.exists(target_path):
+                continue
+            for root, _, files in os.walk(target_path):
+                for file in files:
+                    if not file.endswith(self.extensions):
+                        continue
+                    path = os.path.join(root, file)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    found[path] = (f"{sub}/{file}", st.st_size, st.st_mtime_ns)
+        return found
+
+    def refresh(self) -> int:
+        """추가/변경/삭제된 파일만 인덱스에 반영 (반영한 파일 수 반환)"""
+        with self._lock:
+            found = self._scan()
+            known = {
+                row[0]: (row[1], row[2], row[3])
+                for row in self._conn.execute("SELECT path, id, size, mtime_ns FROM docs")
+            }
+
+            removed = [known[path][0] for path in known if path not in found]
+            changed = [
+                path
+                for path, (_, size, mtime_ns) in found.items()
+                if known.get(path, (None,))[1:] != (size, mtime_ns)
+            ]
+            stale = removed + [known[path][0] for path in changed if path in known]
+            if stale:
+                self.lexical.remove(stale)
+                self._conn.executemany(
+                    "DELETE FROM docs WHERE id = ?", [(doc_id,) for doc_id in stale]
+                )
+
+            for path in changed:
+                source, size, mtime_ns = found[path]
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        text = f.read()
+                except Exception as e:
+                    logger.error(f"Error reading {source}: {e}")
+                    continue
+                cursor = self._conn.execute(
+                    "INSERT INTO docs (path, source, size, mtime_ns, text) VALUES (?, ?, ?, ?, ?)",
+                    (path, source, size, mtime_ns, text),
+                )
+                self.lexical.add(cursor.lastrowid, text)
+
+            self._conn.commit()
+            self._last_refresh = time.monotonic()
+
+        if removed or changed:
+            logger.info(
+                f"Local document index updated: {len(changed)} added/modified, "
+                f"{len(removed)} removed."
+            )
+        return len(removed) + len(changed)
+
+    def search(self, query: str, limit: int = 10, refresh: Optional[bool] = None) -> List[Dict]:
+        """BM25 순위로 관련 문서 검색
+
+        Args:
+            refresh: True면 항상, False면 변경 확인 없이 검색 (기본: refresh_interval 경과 시에만 확인)
+
+        Returns:
+            점수 순 [{path, source, content, score}] 목록
+        """
+        if limit <= 0:
+            return []
+        if refresh or (
+            refresh is None and time.monotonic() - self._last_refresh >= self.refresh_interval
+        ):
+            self.refresh()
+
+        with self._lock:
+            scored = self.lexical.search(query, limit)
+            if not scored:
+                return []
+            placeholders = ','.join('?' * len(scored))
+            rows = {
+                row[0]: row
+                for row in self._conn.execute(
+                    f"SELECT id, path, source, text FROM docs WHERE id IN ({placeholders})",
+                    [doc_id for doc_id, _ in scored],
+                )
+            }
+        return [
+            {
+                "path": rows[doc_id][1],
+                "source": rows[doc_id][2],
+                "content": rows[doc_id][3],
+                "score": score,
+            }
+            for doc_id, score in scored
+            if doc_id in rows
+        ]
+
+    def close(self):
+        self._conn.close()
@@ -5,117 +5,435 @@ ResearchEngine - SHawn-BIO 고도화 엔진 (v3.6)
 import os
 import sys
 import asyncio
-from typing import List, Optional, Tuple
+import importlib
+import importlib.util
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from loguru import logger
 
+from brain_cache import BrainCache
+from context_packer import pack_context
+from local_index import LocalDocIndex
+from sbi_registry import default_db_path
+
 # 프로젝트 루트 및 시스템 폴더 경로 추가
 curr_dir = os.path.dirname(os.path.abspath(__file__))
 root_dir = os.path.dirname(curr_dir)
 sys.path.append(os.path.join(root_dir, "99-System"))
 
 # SHawnBrain 의존성 - 유연한 임포트 지원
-BRAIN_AVAILABLE = False
-brain_class = None
+# 설치 여부만 확인하고 실제 임포트/초기화는 Brain을 처음 사용할 때 (빠른 시작)
+BRAIN_MODULES = [
+    ("shawn_brain_v4", "SHawnBrainV4"),  # 1순위: SHawn-BOT의 최신 v4 아키텍처
+    ("shawn_brain", "SHawnBrain"),  # 2순위: 기본 SHawnBrain
+]
+BRAIN_AVAILABLE = any(importlib.util.find_spec(module) is not None for module, _ in BRAIN_MODULES)
+if not BRAIN_AVAILABLE:
+    logger.warning("⚠️ SHawnBrain not available. Install SHawn-BOT or set PYTHONPATH.")
 
-# 환경에 따라 적절한 Brain 모듈 로드
-try:
-    # 1순위: SHawn-BOT의 최신 v4 아키텍처
-    from shawn_brain_v4 import SHawnBrainV4
-    brain_class = SHawnBrainV4
-    BRAIN_AVAILABLE = True
-    logger.info("✅ SHawnBrainV4 loaded successfully")
-except ImportError:
-    try:
-        # 2순위: 기본 SHawnBrain
-        from shawn_brain import SHawnBrain
-        brain_class = SHawnBrain
-        BRAIN_AVAILABLE = True
-        logger.info("✅ SHawnBrain loaded successfully")
-    except ImportError:
-        logger.warning("⚠️ SHawnBrain not available. Install SHawn-BOT or set PYTHONPATH.")
-
-# 로컬 SBI Pipeline 임포트
+
+def load_brain_class():
+    """환경에 따라 적절한 Brain 클래스 임포트 (없으면 None)"""
+    for module, name in BRAIN_MODULES:
+        try:
+            brain_class = getattr(importlib.import_module(module), name)
+        except (ImportError, AttributeError):
+            continue
+        logger.info(f"✅ {name} loaded successfully")
+        return brain_class
+    return None
+
+
+# 로컬 SBI Pipeline 임포트 (faiss/임베딩 모델은 처음 사용할 때 로드하므로 가벼움)
 try:
-    from sbi_pipeline import SBIPipeline
+    import sbi_pipeline  # noqa: F401 (가용성 확인)
+    from sbi_registry import acquire_pipeline, release_pipeline
+
     PIPELINE_AVAILABLE = True
 except ImportError:
     PIPELINE_AVAILABLE = False
     logger.warning("⚠️ SBIPipeline not available. RAG search disabled.")
 
+# 로컬 문서(.md) 검색 대상 폴더
+LOCAL_SEARCH_DIRS = ["01-Analysis", "02-Literature", "03-Vault", "papers", "concepts", "analysis"]
+
+
+_UNSET = object()  # 아직 초기화하지 않은 Brain/Pipeline 표시
+
 
 class ResearchEngine:
     """SHawn-BIO 메타 분석 엔진"""
 
-    def __init__(self):
-        # Brain 초기화 (가용 버전에 따라)
-        if BRAIN_AVAILABLE and brain_class:
-            try:
-                # V4는 use_ensemble 파라미터 지원
-                if brain_class.__name__ == 'SHawnBrainV4':
-                    self.brain = brain_class(use_ensemble=False)
-                else:
-                    self.brain = brain_class()
-            except Exception as e:
-                logger.error(f"Failed to initialize brain: {e}")
-                self.brain = None
-        else:
-            self.brain = None
-
-        # Pipeline 초기화
-        if PIPELINE_AVAILABLE:
-            try:
-                self.pipeline = SBIPipeline()
-            except Exception as e:
-                logger.error(f"Failed to initialize pipeline: {e}")
-                self.pipeline = None
-        else:
-            self.pipeline = None
+    def __init__(
+        self,
+        retrieval_timeout: float = 10.0,
+        retrieval_workers: int = 4,
+        context_tokens: int = 3000,
+        per_source_cap: int = 2,
+        max_item_tokens: int = 600,
+        response_cache: bool = True,
+        cache_ttl: Optional[float] = 7 * 24 * 3600,
+        cache_entries: int = 5000,
+        cache_debates: bool = False,
+        knowledge_dir: Optional[str] = None,
+    ):
+        """
+        Args:
+            retrieval_timeout: 검색 소스(OneDrive RAG, 로컬 문서)별 최대 대기 시간 (초).
+                초과한 소스는 결과 없이 건너뛰고 나머지 소스로 분석을 진행한다.
+            retrieval_workers: 검색을 실행할 스레드 수 (이벤트 루프를 막지 않도록 별도 스레드에서 실행)
+            context_tokens: 프롬프트에 넣을 근거 문서의 토큰 예산 (Brain 모델의 컨텍스트 창에 맞춰 조정)
+            per_source_cap: 같은 문서에서 가져올 수 있는 최대 근거 수
+            max_item_tokens: 근거 하나의 최대 토큰 수
+            response_cache: Brain 응답 디스크 캐시 사용 여부 (knowledge_dir/brain_cache.db, 처음 쓸 때 연다).
+                프롬프트(검색된 근거 포함)가 같으면 Brain을 다시 호출하지 않는다.
+            cache_ttl: 캐시된 응답의 유효 시간 (초, None이면 무제한)
+            cache_entries: 캐시 최대 항목 수
+            cache_debates: 토론(is_debate) 응답도 캐시할지 여부 (기본: 매번 새로 토론)
+            knowledge_dir: SBI 인덱스와 로컬 문서 인덱스를 둘 폴더 (기본: sbi_registry.default_db_path,
+                manifest.yaml의 paths.knowledge)
+        """
+        # Brain/Pipeline은 처음 사용할 때 초기화 (미리 로드하려면 warmup())
+        self._brain = _UNSET
+        self._pipeline = _UNSET
+        self._init_lock = threading.Lock()
+        self._rag_ready: Optional[Future] = None  # Pipeline 준비(인덱스/임베딩 모델 로드) 작업
+        self._rag_lock = threading.Lock()
 
         # 연구 문서 경로 설정
         self.bio_root = root_dir  # 프로젝트 루트 (01~04 폴더 포함)
+        # SBIPipeline, BioMemory, verify_brain과 같은 함수로 정한 인덱스 폴더
+        self.knowledge_dir = knowledge_dir or default_db_path()
+        self.local_index = LocalDocIndex(
+            self.bio_root,
+            LOCAL_SEARCH_DIRS,
+            os.path.join(self.knowledge_dir, "local_docs.db"),
+        )
+        # 검색(임베딩/FAISS/SQLite)은 동기 작업이므로 전용 스레드 풀에서 실행
+        self.retrieval_timeout = retrieval_timeout
+        self.context_tokens = context_tokens
+        self.per_source_cap = per_source_cap
+        self.max_item_tokens = max_item_tokens
+        self._executor = ThreadPoolExecutor(
+            max_workers=retrieval_workers, thread_name_prefix="research-retrieval"
+        )
+        # 진행 중인 (topic, is_debate) 분석 -> [task, 대기 호출자 수]
+        self._inflight: Dict[Tuple, list] = {}
+        self.cache_debates = cache_debates
+        self._brain_cache = _UNSET if response_cache else None
+        self._cache_options = {"ttl": cache_ttl, "max_entries": cache_entries}
         logger.info(f"🧬 ResearchEngine initialized. Bio-Root: {self.bio_root}")
 
-    async def meta_analyze(self, topic: str, is_debate: bool = False) -> str:
-        """관련된 모든 문서(OneDrive RAG + Local md)를 찾아 통합 분석 수행"""
+    @property
+    def brain(self):
+        """SHawnBrain (처음 접근할 때 가용 버전에 따라 초기화, 실패 시 None)"""
+        if self._brain is _UNSET:
+            with self._init_lock:
+                if self._brain is _UNSET:
+                    self._brain = self._create_brain()
+        return self._brain
+
+    @brain.setter
+    def brain(self, value):
+        self._brain = value
+
+    @property
+    def pipeline(self):
+        """SBIPipeline (처음 접근할 때 초기화, 실패 시 None)"""
+        if self._pipeline is _UNSET:
+            with self._init_lock:
+                if self._pipeline is _UNSET:
+                    self._pipeline = self._create_pipeline()
+        return self._pipeline
+
+    @pipeline.setter
+    def pipeline(self, value):
+        self._pipeline = value
+
+    @property
+    def brain_cache(self) -> Optional[BrainCache]:
+        """Brain 응답 캐시 (처음 접근할 때 열고, response_cache=False면 None)"""
+        if self._brain_cache is _UNSET:
+            with self._init_lock:
+                if self._brain_cache is _UNSET:
+                    self._brain_cache = BrainCache(
+                        os.path.join(self.knowledge_dir, "brain_cache.db"), **self._cache_options
+                    )
+        return self._brain_cache
+
+    @staticmethod
+    def _create_brain():
+        brain_class = load_brain_class() if BRAIN_AVAILABLE else None
+        if not brain_class:
+            return None
+        try:
+            # V4는 use_ensemble 파라미터 지원
+            if brain_class.__name__ == 'SHawnBrainV4':
+                return brain_class(use_ensemble=False)
+            return brain_class()
+        except Exception as e:
+            logger.error(f"Failed to initialize brain: {e}")
+            return None
+
+    def _create_pipeline(self):
+        if not PIPELINE_AVAILABLE:
+            return None
+        try:
+            # 같은 프로세스의 다른 엔진/BioMemory와 인덱스 및 임베딩 모델을 공유
+            return acquire_pipeline(self.knowledge_dir)
+        except Exception as e:
+            logger.error(f"Failed to initialize pipeline: {e}")
+            return None
+
+    def _rag_enabled(self) -> bool:
+        """RAG 검색 가능 여부 (Pipeline을 초기화하지 않고 판단)"""
+        if self._pipeline is _UNSET:
+            return PIPELINE_AVAILABLE
+        return self._pipeline is not None
+
+    def _prepare_rag(self) -> Future:
+        """Pipeline 준비(인덱스 로드, 임베딩 모델 warmup)를 스레드 풀에서 한 번만 시작
+
+        검색 시간 제한(retrieval_timeout)은 검색에만 적용하므로, 첫 검색은 이 작업이 끝나기를 제한 없이
+        기다린 뒤 시간을 잰다.
+        """
+        with self._rag_lock:
+            if self._rag_ready is None:
+                self._rag_ready = self._executor.submit(self._warm_pipeline)
+            return self._rag_ready
+
+    def _warm_pipeline(self):
+        pipeline = self.pipeline
+        if pipeline:
+            try:
+                pipeline.warmup()
+            except Exception as e:
+                logger.error(f"Pipeline warmup failed: {e}")
+
+    def warmup(self):
+        """Brain, Pipeline(인덱스/임베딩 모델), 로컬 문서 인덱스를 미리 로드 (서버 시작 시 첫 요청 지연 제거)"""
+        brain = self.brain
+        self._prepare_rag().result()
+        pipeline = self.pipeline
+        self.local_index.refresh()
+        logger.info(
+            f"ResearchEngine warmed up (Brain: {'ready' if brain else 'n/a'}, "
+            f"Pipeline: {'ready' if pipeline else 'n/a'})"
+        )
+
+    def _search_rag(self, topics: List[str]) -> List[List[Dict]]:
+        """OneDrive 벡터 DB 검색 (동기, 스레드 풀에서 실행). 여러 주제를 한 번의 배치 검색으로 처리
+
+        Pipeline 초기화와 모델 로드는 _prepare_rag()에서 먼저 끝내므로 여기서는 검색만 한다.
+        """
+        if not self.pipeline:
+            return [[] for _ in topics]
+        return [
+            [
+                {
+                    "origin": "OneDrive",
+                    "source": hit['source'],
+                    "content": hit['content'],
+                    "rank": rank,
+                }
+                for rank, hit in enumerate(hits)
+            ]
+            for hits in self.pipeline.search_many(topics, n_results=5)
+        ]
+
+    def _search_local(self, topics: List[str]) -> List[List[Dict]]:
+        """로컬 md 문서 검색 (동기, 스레드 풀에서 실행)"""
+        return [
+            [
+                {
+                    "origin": "Local",
+                    "source": hit['source'],
+                    "content": hit['content'],
+                    "rank": rank,
+                }
+                for rank, hit in enumerate(self.local_index.search(topic, limit=10))
+            ]
+            for topic in topics
+        ]
+
+    async def _run_source(
+        self,
+        name: str,
+        search: Callable[[List[str]], List[List[Dict]]],
+        topics: List[str],
+        prepare: Optional[Callable[[], Future]] = None,
+    ) -> List[List[Dict]]:
+        """검색 소스 하나를 스레드 풀에서 실행 (시간 초과/오류 시 빈 결과)
+
+        prepare가 있으면 그 준비 작업(공유)을 시간 제한 없이 기다린 뒤 검색에만 시간 제한을 둔다.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            if prepare is not None:
+                # 한 호출자가 취소되어도 다른 호출자가 기다리는 준비 작업은 계속됨
+                await asyncio.shield(asyncio.wrap_future(prepare()))
+            return await asyncio.wait_for(
+                loop.run_in_executor(self._executor, search, topics), timeout=self.retrieval_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"{name} search timed out after {self.retrieval_timeout}s; skipping")
+        except Exception as e:
+            logger.error(f"{name} search failed: {e}")
+        return [[] for _ in topics]
+
+    async def retrieve_many(self, topics: List[str]) -> Dict[str, List[Dict]]:
+        """모든 검색 소스를 동시에 실행하고 주제별 근거 {origin, source, content, rank}를 소스 순서(OneDrive, 로컬)대로 병합"""
+        topics = list(dict.fromkeys(topics))
+        sources = [("Local document", self._search_local, None)]
+        if self._rag_enabled():
+            sources.insert(0, ("RAG", self._search_rag, self._prepare_rag))
+        results = await asyncio.gather(
+            *(self._run_source(name, search, topics, prepare) for name, search, prepare in sources)
+        )
+        return {
+            topic: [entry for per_source in results for entry in per_source[i]]
+            for i, topic in enumerate(topics)
+        }
+
+    async def retrieve(self, topic: str) -> List[Dict]:
+        """단일 주제 검색 (retrieve_many 참고)"""
+        return (await self.retrieve_many([topic]))[topic]
+
+    async def _coalesced(self, key: Tuple, factory: Callable[[], Awaitable[str]]) -> str:
+        """같은 키의 작업이 이미 진행 중이면 새로 실행하지 않고 그 결과를 함께 기다림
+
+        한 호출자가 취소되어도 다른 호출자에게 영향이 없도록 shield하고, 기다리는 호출자가
+        모두 취소되면 작업도 취소한다.
+        """
+        entry = self._inflight.get(key)
+        if entry is None:
+            entry = self._inflight[key] = [asyncio.ensure_future(factory()), 0]
+            entry[0].add_done_callback(
+                lambda _: self._inflight.pop(key) if self._inflight.get(key) is entry else None
+            )
+        entry[1] += 1
+        try:
+            return await asyncio.shield(entry[0])
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not entry[0].done():
+                entry[0].cancel()
+
+    async def meta_analyze(
+        self, topic: str, is_debate: bool = False, return_info: bool = False
+    ) -> Union[str, Tuple[str, Dict[str, Any]]]:
+        """관련된 모든 문서(OneDrive RAG + Local md)를 찾아 통합 분석 수행
+
+        Args:
+            return_info: True면 (결과, info)를 반환. info는 {cached, task_type, brain}으로
+                cached는 Brain 호출 없이 응답 캐시에서 가져왔는지를 나타낸다.
+        """
         logger.info(f"Starting {'Debate' if is_debate else 'Meta-Analysis'} for: {topic}")
-        
-        matched_content = []
 
-        # 1. 문서 검색 (Vector DB - OneDrive)
-        if self.pipeline:
+        async def run():
+            # 1~2. 문서 검색 (Vector DB - OneDrive, Local md - 영구 BM25 인덱스)
+            # 이벤트 루프를 막지 않도록 스레드 풀에서 동시에 실행하고, 소스별 시간 제한을 둔다
+            return await self._analyze(topic, await self.retrieve(topic), is_debate)
+
+        response, info = await self._coalesced((topic, is_debate), run)
+        return (response, info) if return_info else response
+
+    async def meta_analyze_many(
+        self,
+        topics: List[str],
+        is_debate: bool = False,
+        concurrency: int = 4,
+        batch_size: int = 32,
+        return_info: bool = False,
+    ) -> AsyncIterator[Tuple]:
+        """여러 주제를 일괄 분석하여 끝나는 순서대로 (topic, 결과)를 내보냄
+
+        검색은 batch_size개 주제씩 한 번에 (RAG는 search_many 한 번) 수행하고, 검색이 끝난 주제부터
+        Brain을 호출한다. 동시에 진행하는 Brain 호출은 concurrency개로 제한하므로 전체 소요 시간은
+        호출 시간의 합이 아니라 슬롯별 가장 느린 호출들에 의해 결정된다. 중복 주제와 이미 진행 중인
+        같은 주제(meta_analyze 포함)는 한 번만 실행하며, 결과도 주제별로 한 번만 내보낸다.
+        return_info가 True면 (topic, 결과, info)를 내보낸다 (meta_analyze 참고).
+        """
+        topics = list(dict.fromkeys(topics))
+        if not topics:
+            return
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        loop = asyncio.get_running_loop()
+        contexts = {topic: loop.create_future() for topic in topics}
+
+        async def retrieve_batches():
             try:
-                rag_hits = self.pipeline.search(topic, n_results=5)
-                for hit in rag_hits:
-                    matched_content.append(f"Source (OneDrive): {hit['source']}\nContent:\n{hit['content'][:1000]}")
+                for i in range(0, len(topics), batch_size):
+                    batch = topics[i : i + batch_size]
+                    for topic, matched_content in (await self.retrieve_many(batch)).items():
+                        contexts[topic].set_result(matched_content)
             except Exception as e:
-                logger.error(f"RAG Search failed: {e}")
-
-        # 2. 문서 검색 (Local md - 전문 구조 탐색)
-        search_dirs = ["01-Analysis", "02-Literature", "03-Vault", "papers", "concepts", "analysis"]
-        for sub in search_dirs:
-            target_path = os.path.join(self.bio_root, sub)
-            if not os.path.exists(target_path): continue
-            
-            for root, dirs, files in os.walk(target_path):
-                for file in files:
-                    if file.endswith(".md"):
-                        path = os.path.join(root, file)
-                        try:
-                            with open(path, 'r', encoding='utf-8') as f:
-                                content = f.read()
-                                if topic.lower() in content.lower():
-                                    matched_content.append(f"Source ({sub}/{file}): {content[:1000]}...")
-                                    if len(matched_content) >= 10: break
-                        except Exception as e:
-                            logger.error(f"Error reading {file}: {e}")
-                if len(matched_content) >= 10: break
+                logger.error(f"Bulk retrieval failed: {e}")
+                for context in contexts.values():
+                    if not context.done():
+                        context.set_result([])
 
-        if not matched_content:
-            return "🔍 관련 문서를 찾을 수 없습니다. 주제를 더 광범위하게 입력해 보세요."
+        async def analyze(topic: str):
+            async def run():
+                context = contexts[topic]
+                try:
+                    matched_content = await asyncio.shield(context)
+                except asyncio.CancelledError:
+                    # 일괄 분석이 중단되었어도 같은 주제를 기다리는 다른 호출자가 남아 있으면 직접 검색
+                    entry = self._inflight.get((topic, is_debate))
+                    mine = 0 if tasks[topic].done() else 1  # 아직 놓아주지 않은 이 호출의 대기
+                    if not context.cancelled() or entry is None or entry[1] <= mine:
+                        raise
+                    matched_content = await self.retrieve(topic)
+                async with semaphore:
+                    return await self._analyze(topic, matched_content, is_debate)
 
-        combined_context = "\n\n".join(matched_content[:8])
-        
-        # 3. 분석/토론 프롬프트 구성
+            response, info = await self._coalesced((topic, is_debate), run)
+            return (topic, response, info) if return_info else (topic, response)
+
+        logger.info(
+            f"Starting bulk {'Debate' if is_debate else 'Meta-Analysis'} for {len(topics)} topics "
+            f"(concurrency {concurrency})"
+        )
+        producer = asyncio.ensure_future(retrieve_batches())
+        tasks = {topic: asyncio.ensure_future(analyze(topic)) for topic in topics}
+        try:
+            for next_done in asyncio.as_completed(tasks.values()):
+                yield await next_done
+        finally:
+            # 중단된 경우 이 호출이 만든 작업만 정리. 공유된 분석 작업은 취소하지 않고 _coalesced의
+            # 대기 호출자 수로 놓아주며 (남은 호출자가 없을 때만 취소됨), 일괄 검색 결과를 기다리던
+            # 공유 작업은 context가 취소되면 직접 검색으로 이어간다
+            for future in list(tasks.values()) + [producer] + list(contexts.values()):
+                future.cancel()
+
+    def pack_evidence(self, evidence: List[Dict]) -> List[Dict]:
+        """근거 문서를 중복 제거/순위화하여 토큰 예산 안에 들어갈 항목만 선택"""
+        return pack_context(
+            evidence,
+            token_budget=self.context_tokens,
+            per_source_cap=self.per_source_cap,
+            max_item_tokens=self.max_item_tokens,
+        )
+
+    def build_context(self, evidence: List[Dict]) -> str:
+        """근거 문서를 토큰 예산 안에서 프롬프트 컨텍스트로 구성"""
+        return self._format_context(self.pack_evidence(evidence))
+
+    @staticmethod
+    def _format_context(packed: List[Dict]) -> str:
+        return "\n\n".join(
+            (
+                f"Source (OneDrive): {item['source']}\nContent:\n{item['content']}"
+                if item['origin'] == "OneDrive"
+                else f"Source ({item['source']}): {item['content']}..."
+            )
+            for item in packed
+        )
+
+    def _build_prompt(self, topic: str, combined_context: str, is_debate: bool) -> Tuple[str, str]:
+        """분석/토론 프롬프트와 Brain task_type 구성"""
         task_type = "gemini"
         if is_debate:
             prompt = f"""
@@ -144,17 +462,68 @@ class ResearchEngine:
 3. 추가 실험 설계 (Detailed Design) 제안
 """
             task_type = "gemini" # v4.5에서 지원하는 일반 지능 타입
+        return prompt, task_type
+
+    def _new_info(self) -> Dict[str, Any]:
+        return {
+            "cached": False,
+            "task_type": None,
+            "brain": type(self.brain).__name__ if self.brain else None,
+        }
+
+    def _cached_response(
+        self, topic: str, prompt: str, task_type: str, is_debate: bool
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """응답 캐시 조회 (캐시 키, 캐시된 응답). 캐시를 쓰지 않는 경우 키는 None"""
+        if (is_debate and not self.cache_debates) or not self.brain_cache:
+            return None, None
+        cache_key = BrainCache.make_key(prompt, task_type, type(self.brain).__name__)
+        cached = self.brain_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Brain response cache hit for: {topic}")
+        return cache_key, cached
+
+    def _store_response(self, cache_key: Optional[str], response):
+        """정상 응답만 캐시에 저장 (오류/경고 메시지 제외)"""
+        if cache_key and isinstance(response, str) and response and not response.startswith("⚠️"):
+            self.brain_cache.put(cache_key, response)
+
+    async def _analyze(
+        self, topic: str, matched_content: List[Dict], is_debate: bool
+    ) -> Tuple[str, Dict[str, Any]]:
+        """검색된 문서로 프롬프트를 구성하고 Brain 호출 (결과, info) 반환"""
+        info = self._new_info()
+        if not matched_content:
+            return "🔍 관련 문서를 찾을 수 없습니다. 주제를 더 광범위하게 입력해 보세요.", info
+
+        combined_context = self.build_context(matched_content)
+
+        # 3. 분석/토론 프롬프트 구성
+        prompt, task_type = self._build_prompt(topic, combined_context, is_debate)
+        info["task_type"] = task_type
 
         # 4. Brain 호출
         if not self.brain:
             logger.warning("SHawnBrain not initialized. Returning raw context only.")
-            return f"⚠️ SHawnBrain 모듈 미연결. 수집된 문서:\n\n{combined_context}"
+            return f"⚠️ SHawnBrain 모듈 미연결. 수집된 문서:\n\n{combined_context}", info
+
+        # 같은 프롬프트(= 같은 주제와 같은 근거)의 응답이 캐시에 있으면 Brain을 호출하지 않음
+        cache_key, cached = self._cached_response(topic, prompt, task_type, is_debate)
+        if cached is not None:
+            info["cached"] = True
+            return cached, info
+
+        response = await self._call_brain(prompt, task_type)
+        self._store_response(cache_key, response)
+        return response, info
 
+    async def _call_brain(self, prompt: str, task_type: str) -> str:
+        """Brain 호출 (오류 시 경고 메시지 반환)"""
         try:
             # V4는 think() 메서드 사용, 기본은 process() 사용
             if hasattr(self.brain, 'think'):
                 # V4 think() supports task_type
-                response, info = await self.brain.think(prompt, task_type=task_type)
+                response, _ = await self.brain.think(prompt, task_type=task_type)
             elif hasattr(self.brain, 'process'):
                 # Legacy compatibility
                 response, used_model, _ = await self.brain.process(prompt, domain="bio")
@@ -163,9 +532,98 @@ class ResearchEngine:
         except Exception as e:
             logger.error(f"Brain processing failed: {e}")
             response = f"⚠️ 분석 중 오류 발생: {e}"
-
         return response
 
+    async def meta_analyze_stream(
+        self, topic: str, is_debate: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """meta_analyze의 스트리밍 버전 - 전체 응답을 기다리지 않고 진행 상황과 응답을 이벤트로 내보냄
+
+        이벤트 (순서대로):
+            {"type": "progress", "stage": "retrieval" | "generation", "message": str}
+            {"type": "sources", "sources": [{origin, source, tokens}]} - 프롬프트에 들어간 근거 문서
+            {"type": "chunk", "text": str} - 응답 조각. Brain이 think_stream()을 지원하면 생성되는 대로,
+                아니면(캐시 적중 포함) 전체 응답을 한 번에
+            {"type": "done", "info": {cached, task_type, brain}}
+                - meta_analyze(return_info=True)와 같은 info
+        """
+        logger.info(f"Starting streamed {'Debate' if is_debate else 'Meta-Analysis'} for: {topic}")
+        info = self._new_info()
+        yield {
+            "type": "progress",
+            "stage": "retrieval",
+            "message": f"Searching documents for: {topic}",
+        }
+        packed = self.pack_evidence(await self.retrieve(topic))
+        yield {
+            "type": "sources",
+            "sources": [
+                {"origin": item['origin'], "source": item['source'], "tokens": item['tokens']}
+                for item in packed
+            ],
+        }
+        if not packed:
+            yield {
+                "type": "chunk",
+                "text": "🔍 관련 문서를 찾을 수 없습니다. 주제를 더 광범위하게 입력해 보세요.",
+            }
+            yield {"type": "done", "info": info}
+            return
+
+        combined_context = self._format_context(packed)
+        prompt, task_type = self._build_prompt(topic, combined_context, is_debate)
+        info["task_type"] = task_type
+        if not self.brain:
+            logger.warning("SHawnBrain not initialized. Returning raw context only.")
+            yield {
+                "type": "chunk",
+                "text": f"⚠️ SHawnBrain 모듈 미연결. 수집된 문서:\n\n{combined_context}",
+            }
+            yield {"type": "done", "info": info}
+            return
+
+        cache_key, cached = self._cached_response(topic, prompt, task_type, is_debate)
+        if cached is not None:
+            info["cached"] = True
+            yield {"type": "chunk", "text": cached}
+            yield {"type": "done", "info": info}
+            return
+
+        yield {
+            "type": "progress",
+            "stage": "generation",
+            "message": f"Generating response ({task_type})",
+        }
+        if hasattr(self.brain, 'think_stream'):
+            parts = []
+            try:
+                async for part in self.brain.think_stream(prompt, task_type=task_type):
+                    if part:
+                        parts.append(part)
+                        yield {"type": "chunk", "text": part}
+            except Exception as e:
+                logger.error(f"Brain streaming failed: {e}")
+                yield {"type": "chunk", "text": f"\n⚠️ 분석 중 오류 발생: {e}"}
+                cache_key = None  # 중간에 끊긴 응답은 캐시하지 않음
+            self._store_response(cache_key, "".join(parts))
+        else:
+            # 스트리밍 미지원 Brain: 전체 응답을 한 번에 전달
+            response = await self._call_brain(prompt, task_type)
+            self._store_response(cache_key, response)
+            yield {"type": "chunk", "text": response}
+        yield {"type": "done", "info": info}
+
+    def close(self):
+        """검색 스레드 풀을 정리하고 공유 Pipeline 참조를 반환"""
+        self._executor.shutdown(wait=True)
+        if self._pipeline not in (_UNSET, None):
+            release_pipeline(self._pipeline)
+        self._pipeline = None
+        self.local_index.close()
+        if self._brain_cache not in (_UNSET, None):
+            self._brain_cache.close()
+        self._brain_cache = None
+
     def get_stats(self):
         """SBI 시스템 통계 반환"""
         if self.pipeline:
@@ -0,0 +1,72 @@
+# tools/sbi_cache.py
+"""
+SBI Query Cache
+질의 임베딩 및 검색 결과 캐시 (크기 제한 LRU + TTL)
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """크기 제한 + TTL LRU 캐시
+
+    가장 오래 사용되지 않은 항목부터 내보내며, ttl(초)이 지난 항목은 조회 시 만료 처리한다.
+    여러 스레드에서 동시에 사용할 수 있고, stats()로 적중률을 확인할 수 있다.
+    maxsize가 0이면 아무것도 저장하지 않는다.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """항목 조회 (적중 시 최근 사용으로 갱신)"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and self.ttl is not None and time.monotonic() - item[1] > self.ttl:
+                del self._data[key]
+                item = None
+            if item is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value: Any):
+        """항목 저장 (가득 차면 가장 오래 사용되지 않은 항목부터 제거)"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계 (크기, 적중/실패 수, 적중률, 제거 수)"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,176 @@
+# tools/sbi_filter.py
+"""
+SBI Search Filter
+메타데이터 조건(파일명/경로 glob, 파일 형식, 인덱싱 날짜, 도메인 태그)으로 검색 대상 청크를 제한
+"""
+
+import os
+import fnmatch
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+Timestamp = Union[float, int, date, datetime]
+
+
+def _to_timestamp(value: Optional[Timestamp]) -> Optional[float]:
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return value.timestamp()
+
+
+class FileAttrs(NamedTuple):
+    """필터 평가에 쓰는 파일 속성 (경로에서만 정해지므로 파일당 한 번 계산해 둠)"""
+
+    relpath: str  # OneDrive 기준 상대 경로 ('/' 구분)
+    name: str
+    ext: str  # 소문자 확장자 ('.pdf')
+    domain: Optional[str]
+
+    @classmethod
+    def of(cls, relpath: str, domain: Optional[str]) -> 'FileAttrs':
+        name = os.path.basename(relpath)
+        return cls(relpath, name, os.path.splitext(name)[1].lower(), domain)
+
+
+@dataclass(frozen=True)
+class SearchFilter:
+    """검색 필터 (모든 조건을 만족하는 파일의 청크만 검색, None인 조건은 무시)
+
+    Attributes:
+        source: 파일명 또는 OneDrive 기준 상대 경로에 대한 glob (예: "*organoid*", "Papers/2024/*")
+        file_types: 허용할 확장자 (예: ("pdf",), (".md", ".txt"))
+        indexed_after: 이 시각 이후 인덱싱된 파일만 (epoch 초, date, datetime)
+        indexed_before: 이 시각 이전에 인덱싱된 파일만
+        domain: 도메인 태그 (SBIPipeline.domain_of 참고)
+    """
+
+    source: Optional[str] = None
+    file_types: Tuple[str, ...] = ()
+    indexed_after: Optional[Timestamp] = None
+    indexed_before: Optional[Timestamp] = None
+    domain: Optional[str] = None
+
+    def __post_init__(self):
+        file_types = (self.file_types,) if isinstance(self.file_types, str) else self.file_types
+        object.__setattr__(
+            self, 'file_types', tuple(sorted('.' + ext.lower().lstrip('.') for ext in file_types))
+        )
+        object.__setattr__(self, 'indexed_after', _to_timestamp(self.indexed_after))
+        object.__setattr__(self, 'indexed_before', _to_timestamp(self.indexed_before))
+
+    @classmethod
+    def coerce(cls, value: Union[None, Dict, 'SearchFilter']) -> Optional['SearchFilter']:
+        """dict 또는 SearchFilter를 SearchFilter로 변환 (조건이 없으면 None)"""
+        if value is None:
+            return None
+        flt = value if isinstance(value, cls) else cls(**value)
+        return flt if flt != cls() else None
+
+    def matches(self, relpath: str, indexed_at: Optional[float], domain: Optional[str]) -> bool:
+        """파일 하나가 조건을 만족하는지 여부 (인덱싱 시각을 모르는 파일은 날짜 조건에서 제외)"""
+        return self.matches_file(FileAttrs.of(relpath, domain), indexed_at)
+
+    def matches_file(self, attrs: FileAttrs, indexed_at: Optional[float]) -> bool:
+        """미리 계산한 파일 속성으로 matches() 평가"""
+        if self.source and not (
+            fnmatch.fnmatch(attrs.name, self.source) or fnmatch.fnmatch(attrs.relpath, self.source)
+        ):
+            return False
+        if self.file_types and attrs.ext not in self.file_types:
+            return False
+        if self.indexed_after is not None and (
+            indexed_at is None or indexed_at < self.indexed_after
+        ):
+            return False
+        if self.indexed_before is not None and (
+            indexed_at is None or indexed_at >= self.indexed_before
+        ):
+            return False
+        if self.domain is not None and attrs.domain != self.domain:
+            return False
+        return True
+
+
+class ChunkIdMap:
+    """청크 id(FAISS id) -> 파일 번호, 원본 벡터 행 매핑 (청크당 20바이트)
+
+    id 오름차순 배열에 현재 청크(와 아직 정리되지 않은 삭제분)만 담으므로, 크기는 AUTOINCREMENT id가
+    지나온 범위가 아니라 행 수에 비례하고 조회는 이진 탐색이다. 필터 조건은 파일 단위로
+    평가하고(파일 수만큼), 결과를 이 매핑으로 펼쳐 허용된 id 배열을 만든다. 따라서 필터 평가 비용은
+    청크 수에 대해 numpy 인덱싱 한 번이다. 삭제된 청크는 파일 번호가 -1이 되므로 어떤 필터에서도
+    허용되지 않는다.
+    """
+
+    def __init__(self):
+        self.paths: List[str] = []
+        self._file_index: Dict[str, int] = {}
+        self._ids = array('q')  # 청크 id (오름차순)
+        self._files = array('i')  # 파일 번호 (-1: 삭제된 청크)
+        self._rows = array('q')  # 원본 벡터 행 (-1: 삭제된 청크)
+        self._dead = 0
+
+    def __len__(self) -> int:
+        """살아 있는 청크 수"""
+        return len(self._ids) - self._dead
+
+    def add(self, chunk_id: int, path: str, row: int):
+        """청크 추가 (id는 오름차순으로 추가해야 함, AUTOINCREMENT id 순서)"""
+        if self._ids and chunk_id <= self._ids[-1]:
+            raise ValueError(
+                f"chunk ids must be added in increasing order ({chunk_id} <= {self._ids[-1]})"
+            )
+        number = self._file_index.get(path)
+        if number is None:
+            number = self._file_index[path] = len(self.paths)
+            self.paths.append(path)
+        self._ids.append(chunk_id)
+        self._files.append(number)
+        self._rows.append(row)
+
+    def _locate(self, chunk_ids) -> Tuple[np.ndarray, np.ndarray]:
+        """청크 id 배열의 (배열 내 위치, 찾았는지 여부)"""
+        chunk_ids = np.asarray(chunk_ids, dtype='int64')
+        ids = np.frombuffer(self._ids, dtype=np.int64)
+        at = np.searchsorted(ids, chunk_ids)
+        found = at < len(ids)
+        found[found] = ids[at[found]] == chunk_ids[found]
+        return at, found
+
+    def discard(self, chunk_ids: Iterable[int]):
+        at, found = self._locate(list(chunk_ids))
+        for i in at[found].tolist():
+            if self._files[i] >= 0:
+                self._files[i] = -1
+                self._rows[i] = -1
+                self._dead += 1
+
+    def rows(self, chunk_ids) -> np.ndarray:
+        """청크 id 배열의 원본 벡터 행 (없는 id는 -1)"""
+        at, found = self._locate(chunk_ids)
+        rows = np.full(len(at), -1, dtype='int64')
+        if found.any():
+            rows[found] = np.frombuffer(self._rows, dtype=np.int64)[at[found]]
+        return rows
+
+    def ids(self, allowed_paths: Iterable[str]) -> np.ndarray:
+        """허용된 파일에 속한 청크 id (오름차순)"""
+        allowed = np.zeros(len(self.paths) + 1, dtype=bool)  # 마지막 칸: 삭제된 청크(-1)
+        for path in allowed_paths:
+            number = self._file_index.get(path)
+            if number is not None:
+                allowed[number] = True
+        return np.frombuffer(self._ids, dtype=np.int64)[
+            allowed[np.frombuffer(self._files, dtype=np.int32)]
+        ]
+
+    def live_ids(self) -> np.ndarray:
+        """삭제되지 않은 청크 id (오름차순)"""
+        return np.frombuffer(self._ids, dtype=np.int64)[
+            np.frombuffer(self._files, dtype=np.int32) >= 0
+        ]
@@ -0,0 +1,184 @@
+# tools/sbi_lexical.py
+"""
+SBI Lexical Index
+청크 본문에 대한 BM25 역색인 (SQLite, ChunkStore와 같은 DB/트랜잭션 사용) 및 텍스트 유틸리티
+"""
+
+import re
+import math
+import sqlite3
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+(?:[-_.][0-9a-z]+)*|[가-힣]+")
+_SEPARATOR_RE = re.compile(r"[-_.]")
+_HANGUL_RE = re.compile(r'[\uac00-\ud7a3]')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY,
+    df INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    chunk_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, chunk_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_chunk ON postings(chunk_id);
+CREATE TABLE IF NOT EXISTS chunk_terms (
+    chunk_id INTEGER PRIMARY KEY,
+    length INTEGER NOT NULL
+);
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 추정 (한글은 글자당 1토큰, 그 외는 4자당 1토큰)"""
+    hangul = len(_HANGUL_RE.findall(text))
+    return max(1, hangul + (len(text) - hangul) // 4)
+
+
+def tokenize(text: str) -> List[str]:
+    """검색용 토큰 분리
+
+    영문/숫자는 소문자로 바꾸고 하이픈 등으로 이어진 토큰(Cytokeratin-7)은 전체와 각 부분을 모두
+    남긴다. 한글은 조사가 붙어도 일치하도록 2글자 단위(bigram)로 나눈다 (한 글자 단어는 그대로).
+    """
+    tokens = []
+    for word in _TOKEN_RE.findall(text.lower()):
+        if '가' <= word[0] <= '힣':
+            if len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+            if _SEPARATOR_RE.search(word):
+                tokens.extend(part for part in _SEPARATOR_RE.split(word) if part)
+    return tokens
+
+
+class LexicalIndex:
+    """BM25 역색인
+
+    청크 id(chunks.id) 기준으로 term별 빈도(postings), 문서 빈도(terms), 청크 길이(chunk_terms)를
+    저장한다. 청크 추가/삭제와 같은 연결, 같은 트랜잭션에서 갱신되므로 FAISS 인덱스와 함께
+    커밋되고, 검색은 질의 term의 postings만 읽어 SQL로 점수를 합산한다.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, k1: float = 1.2, b: float = 0.75):
+        self.conn = conn
+        self.k1 = k1
+        self.b = b
+        conn.executescript(_SCHEMA)
+        self.load_stats()
+
+    def load_stats(self):
+        """커밋된 청크 수/전체 길이 다시 읽기 (BM25 통계)"""
+        self._docs, self._total_length = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM chunk_terms"
+        ).fetchone()
+
+    def __len__(self) -> int:
+        return self._docs
+
+    def add(self, chunk_id: int, text: str):
+        """청크 색인 (커밋은 호출자가 함)"""
+        counts = Counter(tokenize(text))
+        length = sum(counts.values())
+        self.conn.executemany(
+            "INSERT INTO postings (term, chunk_id, tf) VALUES (?, ?, ?)",
+            [(term, chunk_id, tf) for term, tf in counts.items()],
+        )
+        self.conn.executemany(
+            "INSERT INTO terms (term, df) VALUES (?, 1) "
+            "ON CONFLICT(term) DO UPDATE SET df = df + 1",
+            [(term,) for term in counts],
+        )
+        self.conn.execute(
+            "INSERT INTO chunk_terms (chunk_id, length) VALUES (?, ?)", (chunk_id, length)
+        )
+        self._docs += 1
+        self._total_length += length
+
+    def remove(self, chunk_ids: Iterable[int]):
+        """청크 색인 삭제 (커밋은 호출자가 함)"""
+        conn = self.conn
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS removed_chunks (id INTEGER PRIMARY KEY)")
+        conn.execute("DELETE FROM removed_chunks")
+        conn.executemany(
+            "INSERT OR IGNORE INTO removed_chunks (id) VALUES (?)", [(int(i),) for i in chunk_ids]
+        )
+
+        removed = "SELECT id FROM removed_chunks"
+        docs, length = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(length), 0) FROM chunk_terms "
+            f"WHERE chunk_id IN ({removed})"
+        ).fetchone()
+        # term별 감소량을 postings 한 번 훑어 구한 뒤 한꺼번에 반영 (삭제한 posting 수에 비례)
+        decrements = conn.execute(
+            f"SELECT COUNT(*), term FROM postings WHERE chunk_id IN ({removed}) GROUP BY term"
+        ).fetchall()
+        conn.executemany("UPDATE terms SET df = df - ? WHERE term = ?", decrements)
+        conn.executemany(
+            "DELETE FROM terms WHERE term = ? AND df <= 0", [(term,) for _, term in decrements]
+        )
+        conn.execute(f"DELETE FROM postings WHERE chunk_id IN ({removed})")
+        conn.execute(f"DELETE FROM chunk_terms WHERE chunk_id IN ({removed})")
+        conn.execute("DELETE FROM removed_chunks")
+        self._docs -= docs
+        self._total_length -= length
+
+    def clear(self):
+        for table in ('terms', 'postings', 'chunk_terms'):
+            self.conn.execute(f"DELETE FROM {table}")
+        self._docs = 0
+        self._total_length = 0
+
+    def search(
+        self, query: str, k: int = 10, restrict: Optional[Tuple[str, list]] = None
+    ) -> List[Tuple[int, float]]:
+        """BM25 상위 k개 (chunk_id, score)
+
+        Args:
+            restrict: (청크 id를 반환하는 SELECT 문, 파라미터). 지정하면 이 청크들 안에서만 순위를 매긴다.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._docs:
+            return []
+
+        placeholders = ','.join('?' * len(terms))
+        df = dict(
+            self.conn.execute(f"SELECT term, df FROM terms WHERE term IN ({placeholders})", terms)
+        )
+        weights = [
+            (term, math.log(1 + (self._docs - df[term] + 0.5) / (df[term] + 0.5)))
+            for term in terms
+            if term in df
+        ]
+        if not weights:
+            return []
+
+        avg_length = self._total_length / self._docs or 1.0
+        values = ','.join(['(?, ?)'] * len(weights))
+        params = [value for pair in weights for value in pair] + [
+            self.k1,
+            self.k1,
+            self.b,
+            self.b,
+            avg_length,
+        ]
+        where = ""
+        if restrict is not None:
+            where = f"WHERE p.chunk_id IN ({restrict[0]}) "
+            params += list(restrict[1])
+        return self.conn.execute(
+            f"WITH q(term, idf) AS (VALUES {values}) "
+            f"SELECT p.chunk_id, "
+            f"SUM(q.idf * p.tf * (? + 1) / (p.tf + ? * (1 - ? + ? * l.length / ?))) AS score "
+            f"FROM q JOIN postings p ON p.term = q.term "
+            f"JOIN chunk_terms l ON l.chunk_id = p.chunk_id "
+            f"{where}GROUP BY p.chunk_id ORDER BY score DESC, p.chunk_id LIMIT ?",
+            params + [k],
+        ).fetchall()
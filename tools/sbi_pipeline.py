@@ -3,34 +3,79 @@
 SBI (SHawn Bio-Intelligence) Knowledge Pipeline
 FAISS 기반 벡터 검색 및 OneDrive 문서 인덱싱
 """
+
 import os
+import re
+import sys
 import glob
+import fnmatch
+import time
+import hashlib
+import importlib
+import importlib.util
 import pickle
+import threading
 import numpy as np
-from typing import List, Dict, Optional
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Hashable, List, Optional, Tuple, Union
 from loguru import logger
 
-# 선택적 임포트 (의존성 없을 때 graceful degradation)
-try:
-    import faiss
-    FAISS_AVAILABLE = True
-except ImportError:
-    FAISS_AVAILABLE = False
+from sbi_cache import LRUCache
+from sbi_filter import FileAttrs, SearchFilter
+from sbi_lexical import estimate_tokens
+from sbi_registry import default_db_path, models
+from sbi_store import ChunkStore, RawVectorStore, durable_replace
+from sbi_sync import RWLock
+
+
+class _LazyModule:
+    """처음 속성에 접근할 때 실제로 임포트하는 모듈 대리 객체
+
+    faiss, langchain, sentence-transformers(torch)는 임포트만으로 수 초가 걸리므로 설치 여부는
+    find_spec으로만 확인하고, 실제 임포트는 인덱스/모델을 처음 사용할 때 한다.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+def _installed(*names: str) -> bool:
+    """임포트하지 않고 패키지 설치 여부 확인"""
+    for name in names:
+        if name in sys.modules:
+            continue
+        try:
+            if importlib.util.find_spec(name) is None:
+                return False
+        except (ImportError, ValueError):
+            return False
+    return True
+
+
+# 선택적 의존성 (없을 때 graceful degradation, 설치되어 있어도 처음 사용할 때 임포트)
+faiss = _LazyModule('faiss')
+FAISS_AVAILABLE = _installed('faiss')
+if not FAISS_AVAILABLE:
     logger.warning("FAISS not installed. Run: pip install faiss-cpu")
 
-try:
-    from langchain_community.document_loaders import PyPDFLoader, TextLoader
-    from langchain_text_splitters import RecursiveCharacterTextSplitter
-    LANGCHAIN_AVAILABLE = True
-except ImportError:
-    LANGCHAIN_AVAILABLE = False
+_document_loaders = _LazyModule('langchain_community.document_loaders')
+_text_splitters = _LazyModule('langchain_text_splitters')
+LANGCHAIN_AVAILABLE = _installed('langchain_community', 'langchain_text_splitters')
+if not LANGCHAIN_AVAILABLE:
     logger.warning("LangChain not installed. Run: pip install langchain langchain-community")
 
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
+_sentence_transformers = _LazyModule('sentence_transformers')
+SENTENCE_TRANSFORMERS_AVAILABLE = _installed('sentence_transformers')
+if not SENTENCE_TRANSFORMERS_AVAILABLE:
     logger.warning("Sentence Transformers not installed. Run: pip install sentence-transformers")
 
 
@@ -70,43 +115,433 @@ def get_onedrive_path() -> str:
     return os.path.join(home, 'OneDrive')
 
 
+def _hash_file(file_path: str, block_size: int = 1 << 20) -> str:
+    """파일 내용의 SHA-256 해시 (블록 단위로 읽어 메모리 사용 제한)"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _default_workers() -> int:
+    """파싱 워커 수 기본값 (SBI_MAX_WORKERS 또는 CPU 코어 수 - 1)"""
+    env_workers = os.environ.get('SBI_MAX_WORKERS')
+    if env_workers:
+        try:
+            return max(1, int(env_workers))
+        except ValueError:
+            logger.warning(f"Invalid SBI_MAX_WORKERS: {env_workers}")
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+def _env_threads(name: str) -> Optional[int]:
+    """환경 변수의 스레드 수 (없거나 잘못된 값이면 None: OpenMP 기본값)"""
+    value = os.environ.get(name)
+    if value:
+        try:
+            return max(1, int(value))
+        except ValueError:
+            logger.warning(f"Invalid {name}: {value}")
+    return None
+
+
+_omp_local = threading.local()
+
+
+def _limit_faiss_threads(n: Optional[int]):
+    """현재 스레드에서 FAISS가 쓰는 OpenMP 스레드 수 설정
+
+    OpenMP 스레드 수는 호출한 스레드에만 적용되므로 (다른 스레드는 OMP_NUM_THREADS 기본값 유지)
+    검색/인덱싱 스레드마다 처음 한 번 설정한다.
+    """
+    if n and getattr(_omp_local, 'threads', None) != n:
+        faiss.omp_set_num_threads(n)
+        _omp_local.threads = n
+
+
+_SPLITTERS = {}
+
+
+def _load_and_split(
+    file_path: str, chunk_size: int, chunk_overlap: int
+) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """파일 로드 및 청크 분할 (프로세스 풀 워커에서 실행)
+
+    Returns:
+        (본문, 페이지 번호, 페이지 내 시작 오프셋) 목록
+    """
+    key = (chunk_size, chunk_overlap)
+    if key not in _SPLITTERS:
+        _SPLITTERS[key] = _text_splitters.RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap, add_start_index=True
+        )
+
+    if file_path.endswith('.pdf'):
+        loader = _document_loaders.PyPDFLoader(file_path)
+    else:
+        loader = _document_loaders.TextLoader(file_path)
+
+    documents = loader.load()
+    chunks = _SPLITTERS[key].split_documents(documents)
+    return [
+        (chunk.page_content, chunk.metadata.get('page'), chunk.metadata.get('start_index'))
+        for chunk in chunks
+    ]
+
+
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2 output dimension
+
+# 인덱스 종류: flat(전수 탐색), ivf(IVFFlat), hnsw(그래프), ivfpq(IVF + Product Quantization), auto
+INDEX_TYPES = ('flat', 'ivf', 'hnsw', 'ivfpq', 'auto')
+
+# 벡터 압축: fp16/sq8(스칼라 양자화, 2/4배 압축), pq(Product Quantization, pq_m 바이트/벡터)
+COMPRESSION_TYPES = ('fp16', 'sq8', 'pq')
+
+# 검색 방식: dense(벡터), hybrid(벡터 + BM25, RRF 결합), lexical(BM25만, 임베딩 불필요)
+SEARCH_MODES = ('dense', 'hybrid', 'lexical')
+# 기본은 dense: 결과 형식({content, source, page, distance})이 기존과 같고, hybrid/lexical은 선택해서 사용
+DEFAULT_SEARCH_MODE = 'dense'
+RRF_K = 60  # Reciprocal Rank Fusion 상수
+
+# 필터에 맞는 벡터가 이 개수 이하이면 인덱스 대신 원본 벡터로 정확히 검색 (선택적인 필터)
+EXACT_FILTER_LIMIT = 20_000
+# IVF/HNSW가 필터 안에서 k개를 채우지 못할 때 k와 nprobe/efSearch를 두 배씩 넓혀 다시 찾는 최대 배율
+FILTER_WIDEN_LIMIT = 64
+
+# 인덱스 세대별로 평가해 둔 필터 (허용 파일/청크 id) 캐시 항목 수
+FILTER_CACHE_SIZE = 256
+
+# 다른 프로세스의 커밋과 겹쳐 로드가 실패했을 때 다시 시도하는 횟수
+LOAD_ATTEMPTS = 3
+
+# auto 모드 전환 기준 (청크 수): 5만 미만 flat, 100만 미만 ivf, 그 이상 ivfpq
+AUTO_INDEX_THRESHOLDS = ((50_000, 'flat'), (1_000_000, 'ivf'))
+
+
+def _nlist_for(n: int) -> int:
+    """IVF 클러스터 수 (경험적으로 4 * sqrt(N), 64 ~ 65536)"""
+    return int(min(65536, max(64, 4 * np.sqrt(max(n, 1)))))
+
+
+def _min_train_points(kind: str, n: int, compression: Optional[str] = None) -> int:
+    """인덱스 학습에 필요한 최소 벡터 수 (IVF는 클러스터당 39개, PQ는 코드북당 39 * 256개 권장)"""
+    points = 0
+    if kind in ('ivf', 'ivfpq'):
+        points = 39 * _nlist_for(n)
+    if kind == 'ivfpq' or compression == 'pq':
+        points = max(points, 39 * 256)
+    elif compression == 'sq8':
+        points = max(points, 1000)
+    return points
+
+
+def _train_points(kind: str, n: int, compression: Optional[str] = None) -> int:
+    """학습 샘플 수 상한 (PQ는 코드북당 256개, IVF는 클러스터당 39개, SQ8은 값 범위만 추정)
+
+    PQ 학습은 pq_m개 부분공간마다 256개 중심으로 k-means를 돌리므로 비용이 샘플 수에 비례한다.
+    faiss도 k-means 샘플을 중심당 256개에서 자르므로 그 이상은 학습 품질을 높이지 않는다.
+    """
+    points = 0
+    if kind in ('ivf', 'ivfpq'):
+        points = 39 * _nlist_for(n)
+    if kind == 'ivfpq' or compression == 'pq':
+        points = max(points, 256 * 256)
+    elif compression == 'sq8':
+        points = max(points, 1000)
+    return points
+
+
+def _storage_string(compression: Optional[str], pq_m: int = 48) -> str:
+    """벡터 저장 방식 (index_factory 표기)"""
+    if compression == 'fp16':
+        return "SQfp16"
+    if compression == 'sq8':
+        return "SQ8"
+    if compression == 'pq':
+        return f"PQ{pq_m}"
+    return "Flat"
+
+
+def _factory_string(
+    kind: str, n: int, hnsw_m: int = 32, pq_m: int = 48, compression: Optional[str] = None
+) -> str:
+    """인덱스 종류, 압축 방식, 코퍼스 크기로 faiss.index_factory 문자열 생성"""
+    storage = _storage_string(compression, pq_m)
+    if kind == 'ivf':
+        return f"IVF{_nlist_for(n)},{storage}"
+    if kind == 'hnsw':
+        return f"HNSW{hnsw_m}" if storage == "Flat" else f"HNSW{hnsw_m},{storage}"
+    if kind == 'ivfpq':
+        return f"IVF{_nlist_for(n)},PQ{pq_m}"
+    return storage
+
+
+class _EmbeddingBatch:
+    """파일 경계를 넘어 청크를 모으는 임베딩 배치 버퍼
+
+    files에는 마지막 청크가 현재 버퍼에 들어 있는(또는 청크가 없는) 파일이 쌓이며,
+    버퍼를 임베딩하면 해당 파일들의 모든 청크가 임베딩된 것이 보장된다.
+    """
+
+    def __init__(self, batch_size: int, max_tokens: int, token_cap: int):
+        self.batch_size = batch_size
+        self.max_tokens = max_tokens
+        self.token_cap = token_cap
+        self.contents = []
+        self.metadata = []
+        self.files = []
+        self.tokens = 0
+
+    def add(self, content: str, meta: Dict) -> bool:
+        """청크 추가. 배치가 가득 차면 True 반환"""
+        self.contents.append(content)
+        self.metadata.append(meta)
+        # 모델 최대 길이를 넘는 부분은 잘리므로 실제 연산량은 token_cap까지만 반영
+        self.tokens += min(estimate_tokens(content), self.token_cap)
+        return len(self.contents) >= self.batch_size or self.tokens >= self.max_tokens
+
+    def clear(self):
+        self.contents = []
+        self.metadata = []
+        self.files = []
+        self.tokens = 0
+
+
+def _hit(chunk: Dict, distance: Optional[float], score: Optional[float] = None) -> Dict:
+    """검색 결과 항목 (score는 hybrid/lexical 검색에서만 포함)"""
+    hit = {
+        "content": chunk['content'],
+        "source": chunk['source'],
+        "page": chunk['page'],
+        "distance": distance,
+    }
+    if score is not None:
+        hit["score"] = float(score)
+    return hit
+
+
+def merge_hits(
+    dense: List[Tuple[Dict, float]],
+    lexical: List[Tuple[Dict, float]],
+    n: int,
+    mode: str,
+    key: Callable[[Dict], Hashable] = lambda chunk: chunk['id'],
+) -> List[Dict]:
+    """후보 목록을 상위 n개 검색 결과로 변환
+
+    dense는 거리 오름차순, lexical은 BM25 점수 내림차순으로 정렬되어 있어야 한다. hybrid는 양쪽
+    순위를 RRF로 합치며, key로 같은 청크를 식별한다 (여러 샤드를 합칠 때는 샤드마다 id가 겹치므로
+    경로를 포함한 key를 넘긴다).
+    """
+    if mode == 'dense':
+        return [_hit(chunk, distance) for chunk, distance in dense[:n]]
+    if mode == 'lexical':
+        return [_hit(chunk, None, score) for chunk, score in lexical[:n]]
+
+    fused = {}
+    for rank, (chunk, distance) in enumerate(dense):
+        fused[key(chunk)] = [chunk, distance, 1.0 / (RRF_K + rank + 1)]
+    for rank, (chunk, _) in enumerate(lexical):
+        entry = fused.setdefault(key(chunk), [chunk, None, 0.0])
+        entry[2] += 1.0 / (RRF_K + rank + 1)
+    ranked = sorted(fused.values(), key=lambda entry: entry[2], reverse=True)[:n]
+    return [_hit(chunk, distance, score) for chunk, distance, score in ranked]
+
+
+def candidate_depth(n_results: int, mode: str) -> int:
+    """검색 방식별로 뽑을 후보 수 (hybrid는 RRF로 합치기 위해 양쪽에서 넉넉히 뽑음)"""
+    return max(n_results * 4, 20) if mode == 'hybrid' else n_results
+
+
 class SBIPipeline:
-    """SHawn Bio-Intelligence (SBI) Knowledge Pipeline (FAISS Edition)"""
+    """SHawn Bio-Intelligence (SBI) Knowledge Pipeline (FAISS Edition)
+
+    동시성 모델:
+        - 검색(search/search_many)은 여러 스레드에서 동시에 호출할 수 있다. 질의 임베딩은 잠금 없이 하고,
+          인덱스/청크 메타데이터/manifest 조회는 읽기 잠금(공유) 안에서 하므로 한 호출은 항상 하나의
+          일관된 세대를 본다 (벡터는 있는데 메타데이터가 없는 청크, 반쯤 추가된 파일을 보지 않는다).
+        - 쓰기(load_and_index, update_source, remove_source, compact)는 _write_lock으로 한 번에 하나만
+          진행한다. 파싱/임베딩/인덱스 학습/스냅샷 저장은 검색과 동시에 하고, 인덱스와 메타데이터를
+          바꾸는 반영 단계만 배타 잠금 안에서 짧게 한다. 배타 잠금을 기다리는 동안 새 검색은 대기하므로
+          반영이 밀리지 않는다.
+        - 여러 호출에 걸쳐 같은 세대를 봐야 하면 reading() 안에서 호출한다.
+        - FAISS 내부 병렬화(OpenMP) 스레드 수는 search_threads/index_threads로 정한다. 여러 사용자의
+          검색을 스레드로 동시에 처리할 때는 search_threads=1로 두어 코어를 호출 스레드끼리 나눠 쓰게 한다.
+    """
 
-    def __init__(self,
-                 onedrive_path: Optional[str] = None,
-                 db_path: Optional[str] = None):
+    def __init__(
+        self,
+        onedrive_path: Optional[str] = None,
+        db_path: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        save_every: int = 10,
+        batch_size: int = 64,
+        max_batch_tokens: int = 8192,
+        index_type: Optional[str] = None,
+        nprobe: int = 16,
+        ef_search: int = 64,
+        hnsw_m: int = 32,
+        pq_m: int = 48,
+        train_sample: int = 200_000,
+        compression: Optional[str] = None,
+        rerank_factor: int = 4,
+        mmap: bool = True,
+        max_segments: int = 16,
+        snapshot_ratio: float = 0.5,
+        tombstone_ratio: float = 0.2,
+        cache_size: int = 1024,
+        cache_ttl: Optional[float] = 3600,
+        search_mode: Optional[str] = None,
+        domain_rules: Optional[Dict[str, str]] = None,
+        scope: Optional[str] = None,
+        embedding_cache: Optional[LRUCache] = None,
+        search_threads: Optional[int] = None,
+        index_threads: Optional[int] = None,
+    ):
+        """
+        Args:
+            onedrive_path: 인덱싱할 문서 루트 (기본: get_onedrive_path())
+            db_path: 인덱스 저장 경로 (기본: sbi_registry.default_db_path, manifest.yaml의
+                paths.knowledge)
+            max_workers: PDF/텍스트 파싱 프로세스 수. CPU 사용량 상한으로 사용 (기본: SBI_MAX_WORKERS
+                또는 코어 수 - 1, 1이면 풀 없이 순차 처리)
+            save_every: 인덱싱 중 체크포인트 저장 간격 (파일 수). 저장은 새 벡터만 덧붙이므로 짧게 잡아도
+                된다. 중단되면 마지막 체크포인트 이후의 파일만 다시 인덱싱한다.
+            batch_size: 한 번의 encode 호출에 넣는 최대 청크 수 (여러 파일의 청크를 합쳐서 채움)
+            max_batch_tokens: 한 번의 encode 호출에 넣는 최대 토큰 수 (추정치, 메모리 상한)
+            index_type: 'flat' | 'ivf' | 'hnsw' | 'ivfpq' | 'auto' (기본: SBI_INDEX_TYPE 또는 'flat').
+                학습이 필요한 인덱스는 충분한 벡터가 모일 때까지 flat으로 유지한 뒤 전환하며,
+                auto는 청크 수가 AUTO_INDEX_THRESHOLDS를 넘을 때마다 인덱스를 재구성한다.
+            nprobe: IVF 계열 검색 시 탐색할 클러스터 수 (정확도/속도 조절)
+            ef_search: HNSW 검색 시 후보 리스트 크기 (정확도/속도 조절)
+            hnsw_m: HNSW 그래프 이웃 수
+            pq_m: IVF-PQ 서브 양자화기 수 (벡터당 pq_m 바이트)
+            train_sample: IVF/PQ/SQ 학습 샘플 수 상한 (_train_points()보다 작을 때 적용)
+            compression: 벡터 압축 방식 'fp16' | 'sq8' | 'pq' (기본: SBI_COMPRESSION 또는 압축 없음).
+                손실 압축 인덱스는 rerank_factor배의 후보를 뽑은 뒤 원본 벡터로 정확한 거리를 다시 계산한다.
+                설정별 recall/메모리는 evaluate_compression()으로 확인할 수 있다.
+            rerank_factor: 손실 압축 인덱스에서 재정렬할 후보 배수 (1이면 재정렬 안 함)
+            mmap: True이면 저장된 인덱스를 memory-map으로 열어 콜드 스타트를 줄이고 여러 프로세스가
+                페이지 캐시를 공유한다. 인덱스를 수정하거나 스냅샷 이후 벡터를 다시 추가해야 할 때는
+                전체를 메모리로 읽는다 (compact()로 재생할 벡터를 없앨 수 있음).
+            max_segments: 원본 벡터 세그먼트가 이 개수를 넘으면 백그라운드에서 병합한다.
+            snapshot_ratio: 마지막 인덱스 스냅샷 이후 추가된 벡터가 스냅샷의 이 비율을 넘을 때만
+                FAISS 인덱스 전체를 새 스냅샷으로 쓴다 (그 전까지는 로드 시 세그먼트에서 다시 추가).
+            tombstone_ratio: 삭제된(tombstone) 청크가 살아 있는 청크의 이 비율을 넘으면 인덱스와 원본
+                벡터에서 실제로 제거한다. 그 전까지는 검색에서만 제외하므로 삭제 비용은 삭제한 청크 수에
+                비례하고, 인덱스 크기는 살아 있는 코퍼스의 (1 + tombstone_ratio)배 이내로 유지된다.
+            cache_size: 질의 임베딩/검색 결과 캐시의 최대 항목 수 (0이면 캐시 안 함)
+            cache_ttl: 캐시 항목 유효 시간 (초, None이면 무제한). 검색 결과는 인덱스 세대(generation)를
+                키에 포함하므로 인덱스가 바뀌면 TTL과 무관하게 다시 검색한다.
+            search_mode: 기본 검색 방식 'dense' | 'hybrid' | 'lexical' (기본: SBI_SEARCH_MODE 또는 'dense').
+                hybrid는 벡터 검색과 BM25 결과를 RRF로 합치고, lexical은 임베딩 모델 없이 BM25만 사용한다.
+                hybrid/lexical 결과에는 score가 추가되고 distance가 None일 수 있다.
+            domain_rules: 필터 검색용 도메인 태그 규칙 {OneDrive 기준 상대 경로 glob: 태그} (순서대로 첫 일치).
+                일치하는 규칙이 없으면 최상위 폴더명이 도메인이 된다.
+            scope: onedrive_path 아래에서 인덱싱할 범위 (샤드용). 최상위 폴더명이면 그 폴더 아래 전체,
+                '.'이면 루트에 바로 놓인 파일만, None이면 전체. 필터의 상대 경로는 항상 onedrive_path 기준이다.
+            embedding_cache: 질의 임베딩 캐시를 다른 파이프라인과 공유할 때 전달 (기본: 새로 만듦)
+            search_threads: 검색 한 번에 FAISS가 쓰는 OpenMP 스레드 수 (기본: SBI_SEARCH_THREADS 또는
+                OpenMP 기본값). 동시 검색이 많으면 1이 처리량이 가장 높다.
+            index_threads: 인덱스 학습/추가에 쓰는 OpenMP 스레드 수 (기본: SBI_INDEX_THREADS 또는 OpenMP
+                기본값). 인덱싱 중에도 검색에 코어를 남기려면 줄인다.
+        """
 
         # OneDrive 경로 설정
         self.onedrive_path = onedrive_path or get_onedrive_path()
 
         # 프로젝트 루트 기준으로 db_path 설정
-        if db_path is None:
-            curr_dir = os.path.dirname(os.path.abspath(__file__))
-            self.db_path = os.path.join(os.path.dirname(curr_dir), "knowledge_base")
-        else:
-            self.db_path = db_path
+        self.db_path = db_path if db_path is not None else default_db_path()
+        # 이전 버전 인덱스/상태 파일 (마이그레이션용)
         self.index_file = os.path.join(self.db_path, "faiss_index.bin")
         self.data_file = os.path.join(self.db_path, "knowledge_data.pkl")
+        self.segment_dir = os.path.join(self.db_path, "segments")
+        self.store_file = os.path.join(self.db_path, "knowledge.db")
+        self.mmap = mmap
 
         # 의존성 체크
         self._check_dependencies()
 
-        # 임베딩 모델 로드
-        if SENTENCE_TRANSFORMERS_AVAILABLE:
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        else:
-            self.model = None
+        # 임베딩 모델은 처음 필요할 때 로드 (lexical 검색만 하는 경우 로드하지 않음)
+        self._model = None
+        self._model_lock = threading.Lock()
 
-        if LANGCHAIN_AVAILABLE:
-            self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-        else:
-            self.text_splitter = None
+        # 인덱싱 동시성 예산 (고정 sleep 대신 워커 수로 CPU 사용량 제한)
+        self.max_workers = max_workers or _default_workers()
+        self.save_every = max(1, save_every)
+        self.max_segments = max(2, max_segments)
+        self.snapshot_ratio = snapshot_ratio
+        self.tombstone_ratio = tombstone_ratio
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+
+        # ANN 인덱스 설정
+        self.index_type = (index_type or os.environ.get('SBI_INDEX_TYPE') or 'flat').lower()
+        if self.index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index_type '{self.index_type}'. Choose from {INDEX_TYPES}")
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.hnsw_m = hnsw_m
+        self.pq_m = pq_m
+        self.train_sample = train_sample
+        self.compression = (compression or os.environ.get('SBI_COMPRESSION') or '').lower() or None
+        if self.compression not in (None,) + COMPRESSION_TYPES:
+            raise ValueError(
+                f"Unknown compression '{self.compression}'. Choose from {COMPRESSION_TYPES}"
+            )
+        self.rerank_factor = max(1, rerank_factor)
+        self.search_threads = search_threads or _env_threads('SBI_SEARCH_THREADS')
+        self.index_threads = index_threads or _env_threads('SBI_INDEX_THREADS')
+        self.search_mode = (
+            search_mode or os.environ.get('SBI_SEARCH_MODE') or DEFAULT_SEARCH_MODE
+        ).lower()
+        if self.search_mode not in SEARCH_MODES:
+            raise ValueError(
+                f"Unknown search_mode '{self.search_mode}'. Choose from {SEARCH_MODES}"
+            )
+        self.domain_rules = dict(domain_rules or {})
+        self.scope = scope
+
+        self.chunk_size = 1000
+        self.chunk_overlap = 100
+        self._text_splitter = None
 
         # 인덱스 및 데이터 초기화
         self.index = None
-        self.metadata = []  # List of {content, source}
+        self._index_mmapped = False  # 읽기 전용 memory-map 상태 여부
+        self.index_kind = 'flat'  # 현재 실제로 사용 중인 인덱스 종류
+        self.index_compression = None  # 현재 실제로 사용 중인 압축 방식
+        self.index_trained_on = 0  # IVF 계열 학습 당시 벡터 수
+        # 재정렬/재구성용 원본 벡터 (세그먼트)
+        self.vectors = RawVectorStore(self.segment_dir, EMBEDDING_DIM)
+        self.snapshot = None  # 커밋된 인덱스 스냅샷 파일명
+        # 스냅샷이 반영한 원본 벡터 행 수 (이후 행은 로드 시 세그먼트에서 다시 추가)
+        self.snapshot_rows = 0
+        self.snapshot_size = 0  # 스냅샷 인덱스의 벡터 수 (tombstone 포함, 로드 시 검증용)
+        self._snapshot_stale = False  # 인덱스가 추가 외의 방식으로 바뀌어 새 스냅샷이 필요한지 여부
+        self._write_lock = threading.RLock()  # 인덱싱/저장/세그먼트 병합 반영 직렬화
+        self._rw = RWLock()  # 검색(reader)과 인덱스/메타데이터 반영(writer) 분리
+        self._compactor: Optional[threading.Thread] = None
+        self._merged = None  # 아직 반영하지 못한 백그라운드 병합 결과 (names, merged)
+        self.generation = 0  # 인덱스 내용/검색 파라미터가 바뀔 때마다 증가 (결과 캐시 키)
+        # 질의 -> 임베딩
+        self._embedding_cache = (
+            embedding_cache if embedding_cache is not None else LRUCache(cache_size, cache_ttl)
+        )
+        # (generation, 질의, n_results) -> 결과
+        self._result_cache = LRUCache(cache_size, cache_ttl)
+        # (generation, 필터) -> [허용 파일, 허용 청크 id]
+        self._filter_cache = LRUCache(FILTER_CACHE_SIZE)
+        # path -> 필터 평가용 속성 (relpath, 확장자, 도메인)
+        self._file_attrs: Dict[str, FileAttrs] = {}
+        # 청크 메타데이터 + manifest (SQLite), 청크 id = FAISS id
+        self.store = ChunkStore(self.store_file)
         self.indexed_files = set()
+        self.manifest = {}  # path -> {size, mtime_ns, sha256, chunks}
+        self._manifest_dirty = False
+        self._load_error: Optional[Exception] = None  # 로드 실패 원인 (있으면 쓰기 거부)
 
         if FAISS_AVAILABLE:
             self.load_index()
@@ -125,54 +560,781 @@ class SBIPipeline:
 
         if missing:
             logger.warning(f"Missing dependencies: {', '.join(missing)}")
-            logger.warning("Some features may be unavailable. Run: pip install " + ' '.join(missing))
+            logger.warning(
+                "Some features may be unavailable. Run: pip install " + ' '.join(missing)
+            )
+
+    @property
+    def model(self):
+        """임베딩 모델 (처음 접근할 때 로드, 같은 프로세스의 다른 파이프라인과 공유)"""
+        if self._model is None and SENTENCE_TRANSFORMERS_AVAILABLE:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = models.acquire(
+                        EMBEDDING_MODEL,
+                        lambda: _sentence_transformers.SentenceTransformer(EMBEDDING_MODEL),
+                    )
+        return self._model
+
+    @property
+    def text_splitter(self):
+        """청크 분할기 (처음 접근할 때 생성, LangChain이 없으면 None)"""
+        if self._text_splitter is None and LANGCHAIN_AVAILABLE:
+            self._text_splitter = _text_splitters.RecursiveCharacterTextSplitter(
+                chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap
+            )
+        return self._text_splitter
+
+    def warmup(self, embed: bool = True):
+        """무거운 의존성과 임베딩 모델을 미리 로드 (서버 시작 시 첫 요청 지연 제거)
+
+        Args:
+            embed: True면 더미 문장을 한 번 임베딩하여 모델 초기화까지 끝낸다.
+        """
+        started = time.perf_counter()
+        if FAISS_AVAILABLE:
+            faiss.load()
+        if LANGCHAIN_AVAILABLE:
+            _document_loaders.load()
+            _text_splitters.load()
+        if self.model is not None and embed:
+            self.model.encode(["warmup"])
+        logger.info(f"SBI pipeline warmed up in {time.perf_counter() - started:.2f}s")
+
+    @property
+    def metadata(self) -> ChunkStore:
+        """청크 메타데이터 (원본 벡터 행으로 조회하는 list 형태 인터페이스, 청크 id는 FAISS id)"""
+        return self.store
 
     def load_index(self):
-        """저장된 인덱스와 메타데이터 로드"""
+        """저장된 인덱스와 메타데이터 로드
+
+        SQLite에 커밋된 storage 상태(세그먼트 목록, 인덱스 스냅샷, 스냅샷이 반영한 행 수)가 유일한
+        기준이다. 스냅샷 이후 커밋된 살아 있는 청크의 벡터는 세그먼트에서 읽어 청크 id로 인덱스에 다시
+        추가하고, 커밋되지 않은 파일은 무시한다 (다음 인덱싱 때 정리). 따라서 중단 시점과 무관하게
+        마지막 체크포인트 상태로 열린다. 위치 기반 id를 쓰던 이전 버전 인덱스는 청크 id로 재구성한다.
+
+        로드에 실패해도 디스크의 상태는 지우지 않는다. 다른 프로세스의 커밋과 겹친 경우를 위해 몇 번
+        다시 시도한 뒤, 빈 인메모리 인덱스로 시작하고 쓰기를 거부한다 (복구하려면 reset_index()).
+        """
         if not FAISS_AVAILABLE:
             return
+        if not (os.path.exists(self.store_file) or os.path.exists(self.data_file)):
+            self._create_new_index()
+            return
 
-        if os.path.exists(self.index_file) and os.path.exists(self.data_file):
+        for attempt in range(1, LOAD_ATTEMPTS + 1):
             try:
-                self.index = faiss.read_index(self.index_file)
-                with open(self.data_file, 'rb') as f:
-                    save_data = pickle.load(f)
-                    self.metadata = save_data['metadata']
-                    self.indexed_files = save_data['indexed_files']
-                logger.info(f"Loaded existing index with {len(self.metadata)} chunks.")
+                self._load_committed()
+                return
             except Exception as e:
-                logger.error(f"Failed to load index: {e}")
+                self._load_error = e
+                logger.warning(f"Failed to load index (attempt {attempt}/{LOAD_ATTEMPTS}): {e}")
+                if attempt < LOAD_ATTEMPTS:
+                    time.sleep(0.1 * attempt)
+
+        logger.error(
+            f"Failed to load index from {self.db_path}: {self._load_error}. Starting with an "
+            f"empty in-memory index; files on disk are left untouched "
+            f"(reset_index() rebuilds from scratch)."
+        )
+        self._create_new_index()
+
+    def _load_committed(self):
+        """마지막으로 커밋된 체크포인트 로드 (실패하면 예외, 디스크는 바꾸지 않음)"""
+        self._load_error = None
+        if os.path.exists(self.data_file):
+            self._migrate_legacy_state()
+        if self.store.get_state('storage') is None:
+            self._migrate_legacy_storage()
+
+        # storage 상태와 청크 수/next_pos/manifest를 같은 커밋 기준으로 읽는다
+        with self.store.read_snapshot():
+            storage = self.store.get_state('storage')
+            if storage is None:
+                if len(self.store):
+                    raise ValueError(
+                        f"chunk store has {len(self.store)} chunks but no committed storage state"
+                    )
                 self._create_new_index()
+                return
+            index_config = self.store.get_state('index_config', {})
+            self.index_kind = index_config.get('kind', 'flat')
+            self.index_compression = index_config.get('compression')
+            self.index_trained_on = index_config.get('trained_on', 0)
+            self.manifest = self.store.load_manifest()
+            self.indexed_files = set(self.manifest)
+            self.vectors.open(storage['segments'])
+            self.snapshot = storage['snapshot']
+            self.snapshot_rows = storage['snapshot_rows']
+            self.snapshot_size = storage.get('snapshot_size', self.snapshot_rows)
+
+            total = len(self.store)
+            if len(self.vectors) != self.store.next_pos:
+                raise ValueError(
+                    f"chunk store has {self.store.next_pos} rows, "
+                    f"vector segments have {len(self.vectors)}"
+                )
+            chunk_ids = storage.get('ids') == 'chunk'
+            replay_ids, replay_rows = self.store.live_rows(self.snapshot_rows)
+            replay = self.vectors.get(replay_rows) if len(replay_rows) else None
+
+        if self.snapshot is None:
+            self.index = self._new_flat_index()
         else:
-            self._create_new_index()
+            self.index = self._read_index(self.mmap and chunk_ids and replay is None)
+        if self.index.ntotal != self.snapshot_size:
+            raise ValueError(
+                f"snapshot has {self.index.ntotal} vectors, expected {self.snapshot_size}"
+            )
+        if self.snapshot is not None and not chunk_ids:
+            logger.info("Migrating positional index ids to stable chunk ids...")
+            self._rebuild_index(self.index_kind, self.index_compression)
+            self.save_index()
+        elif replay is not None:
+            logger.info(
+                f"Replaying {len(replay_rows)} vectors committed after the last index snapshot..."
+            )
+            self.index.add_with_ids(replay, replay_ids)
+        self._apply_search_params()
+        backfilled = self.store.ensure_lexical()
+        if backfilled:
+            self.store.flush()
+            logger.info(f"Built lexical index for {backfilled} existing chunks.")
+        logger.info(f"Loaded existing {self.index_kind} index with {total} chunks.")
+
+    def _migrate_legacy_storage(self) -> Optional[Dict]:
+        """이전 버전의 단일 인덱스 파일(faiss_index.bin)을 스냅샷 + 원본 벡터 세그먼트 구성으로 이전
+
+        이전 인덱스는 위치 기반 id의 IndexFlatL2이므로 원본 벡터를 인덱스에서 복원해 세그먼트로 쓰고,
+        인덱스 파일은 첫 스냅샷으로 채택한다 (청크 id로의 재구성은 로드에서 이어서 한다).
+        """
+        if not os.path.exists(self.index_file):
+            return None
+
+        self.index = faiss.read_index(self.index_file)
+        self.vectors.open([])
+        self.vectors.rewrite(self._reconstruct_all())
+        snapshot_rows = self.index.ntotal
+        self.index = None
+
+        storage = {
+            'segments': list(self.vectors.segments),
+            'snapshot': os.path.basename(self.index_file),
+            'snapshot_rows': snapshot_rows,
+        }
+        self.store.set_state('storage', storage)
+        self.store.flush()
+        self.vectors.release()
+        logger.info(f"Migrated {snapshot_rows} vectors to segmented storage in {self.segment_dir}.")
+        return storage
+
+    def _migrate_legacy_state(self):
+        """이전 버전의 pickle 상태(knowledge_data.pkl)를 SQLite 저장소로 이전"""
+        with open(self.data_file, 'rb') as f:
+            save_data = pickle.load(f)
+
+        items = save_data.get('metadata') or []
+        self.indexed_files = save_data['indexed_files']
+        manifest = self._legacy_manifest(items)
+        self.store.rewrite(items)
+        self.store.save_manifest(manifest)
+        self.store.flush()
+
+        os.remove(self.data_file)
+        logger.info(f"Migrated {len(items)} chunks and {len(manifest)} files to {self.store_file}.")
 
     def _create_new_index(self):
-        """새 FAISS 인덱스 생성"""
+        """빈 FAISS 인덱스로 시작 (메모리만 초기화, 디스크의 파일은 건드리지 않음)"""
         if not FAISS_AVAILABLE:
             return
 
-        dimension = 384  # all-MiniLM-L6-v2 output dimension
-        self.index = faiss.IndexFlatL2(dimension)
-        self.metadata = []
+        self.index = self._new_flat_index()
+        self.index_kind = 'flat'
+        self.index_compression = None
+        self.index_trained_on = 0
+        self._index_mmapped = False
+        self.vectors.open([])
+        self.snapshot = None
+        self.snapshot_rows = 0
+        self.snapshot_size = 0
+        self._snapshot_stale = False
         self.indexed_files = set()
+        self.manifest = {}
+        self._file_attrs = {}
+        self._invalidate()
         logger.info("Created fresh FAISS index.")
 
+    def reset_index(self):
+        """디스크의 청크/manifest/세그먼트/스냅샷을 모두 지우고 빈 인덱스로 시작
+
+        로드에 실패한 저장소를 버리고 다시 인덱싱할 때만 명시적으로 호출한다 (다음 load_and_index에서
+        모든 파일을 새로 인덱싱).
+        """
+        if not FAISS_AVAILABLE:
+            return
+        with self._write_lock, self._rw.write():
+            self.store.clear()
+            self.vectors.clear()
+            self._remove_snapshots(keep=None)
+            self._load_error = None
+            self._create_new_index()
+
+    def _check_loaded(self):
+        """로드에 실패한 저장소를 빈 인덱스로 덮어쓰지 않도록 쓰기 거부"""
+        if self._load_error is not None:
+            raise RuntimeError(
+                f"Index at {self.db_path} failed to load ({self._load_error}); refusing to "
+                f"write. Fix the storage or call reset_index() to rebuild from scratch."
+            )
+
+    @staticmethod
+    def _id_mapped(index):
+        """청크 id로 추가/삭제할 수 있는 인덱스로 감쌈 (IVF 계열은 id를 직접 저장하므로 그대로)"""
+        if faiss.try_extract_index_ivf(index) is not None:
+            return index
+        return faiss.IndexIDMap(index)
+
+    def _new_flat_index(self):
+        return self._id_mapped(faiss.IndexFlatL2(EMBEDDING_DIM))
+
+    def _base_index(self):
+        """IndexIDMap 안쪽의 실제 인덱스 (HNSW 파라미터 설정 등)"""
+        if isinstance(self.index, faiss.IndexIDMap):
+            return faiss.downcast_index(self.index.index)
+        return self.index
+
+    def _snapshot_path(self, name: Optional[str] = None) -> str:
+        return os.path.join(self.db_path, name or self.snapshot)
+
+    def _read_index(self, mmap: bool = False):
+        """스냅샷 파일 읽기. mmap이면 읽기 전용으로 매핑 (IVF는 inverted list, 나머지는 코드 배열)"""
+        self._index_mmapped = False
+        path = self._snapshot_path()
+        if mmap:
+            if self.index_kind in ('ivf', 'ivfpq'):
+                flags = faiss.IO_FLAG_MMAP
+            else:
+                flags = getattr(faiss, 'IO_FLAG_MMAP_IFC', faiss.IO_FLAG_MMAP)
+            try:
+                index = faiss.read_index(path, flags | faiss.IO_FLAG_READ_ONLY)
+                self._index_mmapped = True
+                return index
+            except RuntimeError as e:
+                logger.warning(
+                    f"Memory-mapped load not supported for this index, reading fully: {e}"
+                )
+        return faiss.read_index(path)
+
+    def _ensure_writable(self):
+        """memory-map으로 연 인덱스는 수정할 수 없으므로 수정 전에 전체를 메모리로 다시 읽음"""
+        self._check_loaded()
+        if self._index_mmapped:
+            logger.info("Reloading memory-mapped index for writing...")
+            index = self._read_index(mmap=False)
+            with self._rw.write():
+                self.index = index
+                self._apply_search_params()
+
+    def _target_index_config(self, n: int):
+        """현재 설정과 청크 수로 사용할 (인덱스 종류, 압축 방식) 결정"""
+        kind = self.index_type
+        if kind == 'auto':
+            kind = 'ivfpq'
+            for limit, candidate in AUTO_INDEX_THRESHOLDS:
+                if n < limit:
+                    kind = candidate
+                    break
+        compression = None if kind == 'ivfpq' else self.compression
+        # 학습 데이터가 부족하면 압축 없는 flat으로 모아 두었다가 나중에 전환
+        if n < _min_train_points(kind, n, compression):
+            return 'flat', None
+        return kind, compression
+
+    def _is_lossy(self) -> bool:
+        """현재 인덱스가 손실 압축(SQ/PQ) 벡터를 저장하는지 여부"""
+        return self.index_kind == 'ivfpq' or self.index_compression is not None
+
+    def _maybe_migrate_index(self):
+        """청크 수가 기준을 넘으면 인덱스 종류를 전환 (IVF 계열은 학습 시점의 4배를 넘으면 재학습)"""
+        n = len(self.store)
+        target = self._target_index_config(n)
+        retrain = (
+            target[0] in ('ivf', 'ivfpq')
+            and target[0] == self.index_kind
+            and n > 4 * self.index_trained_on
+        )
+        if target != (self.index_kind, self.index_compression) or retrain:
+            self._rebuild_index(*target)
+
+    def _reconstruct_all(self) -> np.ndarray:
+        """인덱스에 저장된 전체 벡터 복원 (IVF-PQ는 근사값)"""
+        ivf = faiss.try_extract_index_ivf(self.index)
+        if ivf is not None:
+            ivf.make_direct_map()
+        if self.index.ntotal == 0:
+            return np.zeros((0, EMBEDDING_DIM), dtype='float32')
+        return self.index.reconstruct_n(0, self.index.ntotal)
+
+    def _build_index(self, kind: str, vectors: np.ndarray, compression: Optional[str] = None):
+        """지정한 종류/압축 방식의 인덱스 생성 (필요하면 샘플로 학습, 벡터는 추가하지 않음)
+
+        학습 샘플은 _train_points()와 train_sample 중 작은 값으로 제한한다. PQ 학습은 샘플 수에 비례해
+        오래 걸리므로 (384차원 PQ48, 1만 개 전체 학습 시 단일 스레드로 2분 이상) 코퍼스가 커져도 학습
+        시간이 늘지 않게 하기 위함이다.
+        """
+        n = len(vectors)
+        index = faiss.index_factory(
+            EMBEDDING_DIM, _factory_string(kind, n, self.hnsw_m, self.pq_m, compression)
+        )
+        if not index.is_trained:
+            sample = vectors
+            size = min(self.train_sample, _train_points(kind, n, compression))
+            if n > size:
+                rng = np.random.default_rng(0)
+                sample = vectors[rng.choice(n, size, replace=False)]
+            logger.info(
+                f"Training {kind} index ({compression or 'no compression'}) "
+                f"on {len(sample)} vectors..."
+            )
+            index.train(sample)
+        return index
+
+    def _index_from(
+        self, kind: str, compression: Optional[str], vectors: np.ndarray, ids: np.ndarray
+    ):
+        """벡터를 청크 id로 담은 새 인덱스 (현재 인덱스는 건드리지 않음)"""
+        index = self._id_mapped(self._build_index(kind, vectors, compression))
+        if len(vectors):
+            index.add_with_ids(vectors, ids)
+        return index
+
+    def _rebuild_index(self, kind: str, compression: Optional[str] = None):
+        """살아 있는 청크의 원본 벡터로 지정한 종류의 인덱스 재구성 (샘플 학습 후 청크 id로 추가)
+
+        학습과 추가는 기존 인덱스로 검색이 계속되는 동안 하고, 교체만 배타 잠금 안에서 한다.
+        """
+        _limit_faiss_threads(self.index_threads)
+        ids, rows = self.store.live_rows()
+        vectors = self.vectors.get(rows)
+        index = self._index_from(kind, compression, vectors, ids)
+
+        logger.info(
+            f"Rebuilt FAISS index: {self.index_kind}/{self.index_compression or 'none'} -> "
+            f"{kind}/{compression or 'none'} ({len(vectors)} vectors)"
+        )
+        with self._rw.write():
+            self.index = index
+            self._index_mmapped = False
+            self.index_kind = kind
+            self.index_compression = compression
+            self.index_trained_on = len(vectors) if kind in ('ivf', 'ivfpq') else 0
+            self._snapshot_stale = True
+            self._apply_search_params()
+
+    def _invalidate(self):
+        """인덱스가 바뀌었음을 표시 (이전 세대의 캐시된 검색 결과는 더 이상 조회되지 않음)"""
+        self.generation += 1
+
+    def _apply_search_params(self):
+        """nprobe / efSearch 검색 파라미터 적용"""
+        self._invalidate()
+        if self.index is None:
+            return
+        ivf = faiss.try_extract_index_ivf(self.index)
+        if ivf is not None:
+            ivf.nprobe = self.nprobe
+        base = self._base_index()
+        if hasattr(base, 'hnsw'):
+            base.hnsw.efSearch = self.ef_search
+
+    def set_search_params(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+        """검색 정확도/속도 파라미터 조정 (재구성 없이 즉시 적용, 진행 중인 검색이 끝난 뒤 반영)"""
+        with self._rw.write():
+            if nprobe is not None:
+                self.nprobe = nprobe
+            if ef_search is not None:
+                self.ef_search = ef_search
+            self._apply_search_params()
+
+    def _legacy_manifest(self, items: List[Dict]) -> Dict[str, Dict]:
+        """manifest 도입 이전 데이터 변환
+
+        기존 청크에는 파일명(source)만 저장되어 있으므로, 파일명이 유일한 경우 전체 경로를
+        복원한다. 해시가 없는 항목은 다음 스캔에서 현재 상태로 채택(adopt)된다.
+        """
+        by_name = {}
+        for path in self.indexed_files:
+            by_name.setdefault(os.path.basename(path), []).append(path)
+
+        manifest = {
+            path: {"size": None, "mtime_ns": None, "sha256": None, "chunks": 0}
+            for path in self.indexed_files
+        }
+        for item in items:
+            if 'path' in item:
+                continue
+            candidates = by_name.get(item['source'], [])
+            if len(candidates) == 1:
+                item['path'] = candidates[0]
+                manifest[candidates[0]]['chunks'] += 1
+
+        logger.info(f"Migrated legacy index state ({len(manifest)} files) to manifest format.")
+        return manifest
+
     def save_index(self):
-        """인덱스와 메타데이터 파일로 저장"""
+        """체크포인트 저장 (append-only)
+
+        1. 새 벡터를 새 세그먼트 파일로 쓰고 fsync (기존 파일은 그대로)
+        2. 스냅샷 이후 추가분이 snapshot_ratio를 넘었거나 인덱스가 재구성/tombstone 정리로 바뀐 경우에만
+           FAISS 인덱스를 새 세대 스냅샷 파일로 쓰고 fsync
+        3. 청크/manifest/인덱스 설정과 함께 storage 상태(세그먼트 목록, 스냅샷)를 한 트랜잭션으로 커밋.
+           이 커밋이 원자적인 manifest 교체 지점이며, 그 전에 중단되면 이전 체크포인트가 그대로 유효하다.
+        4. 커밋 후 더 이상 참조되지 않는 세그먼트/스냅샷 파일 삭제
+
+        스냅샷은 크기가 기하급수적으로 커질 때만 새로 쓰므로 전체 쓰기량은 코퍼스 크기에 선형이다.
+        """
         if not FAISS_AVAILABLE or self.index is None:
             return
+        self._check_loaded()
+
+        with self._write_lock:
+            os.makedirs(self.db_path, exist_ok=True)
+            self.vectors.flush()
+            self._apply_merged()
+
+            replay = len(self.vectors) - self.snapshot_rows
+            if self._snapshot_stale or replay > self.snapshot_ratio * self.snapshot_rows:
+                self._write_snapshot()
+
+            # 청크 메타데이터는 추가 시점에 INSERT되어 있으므로 바뀐 manifest 항목과 함께 커밋만 한다
+            self.store.save_manifest(self.manifest)
+            self.store.set_state(
+                'index_config',
+                {
+                    'kind': self.index_kind,
+                    'compression': self.index_compression,
+                    'trained_on': self.index_trained_on,
+                },
+            )
+            self.store.set_state('storage', self._storage_state())
+            self.store.flush()
 
-        os.makedirs(self.db_path, exist_ok=True)
-        faiss.write_index(self.index, self.index_file)
-        with open(self.data_file, 'wb') as f:
-            pickle.dump({
-                'metadata': self.metadata,
-                'indexed_files': self.indexed_files
-            }, f)
+            self.vectors.release()
+            self._remove_snapshots(keep=self.snapshot)
         logger.success("FAISS index and metadata saved.")
+        self._maybe_compact()
+
+    def _storage_state(self) -> Dict:
+        return {
+            'segments': list(self.vectors.segments),
+            'snapshot': self.snapshot,
+            'snapshot_rows': self.snapshot_rows,
+            'snapshot_size': self.snapshot_size,
+            'ids': 'chunk',
+        }
+
+    def _write_snapshot(self):
+        """현재 인덱스를 다음 세대 스냅샷 파일로 저장 (커밋 전까지는 이전 스냅샷이 유효)"""
+        generation = 0
+        if self.snapshot:
+            match = re.match(r'faiss_index\.(\d+)\.bin$', self.snapshot)
+            generation = int(match.group(1)) + 1 if match else 1
+        name = f"faiss_index.{generation:06d}.bin"
+        tmp_path = self._snapshot_path(name) + '.tmp'
+        faiss.write_index(self.index, tmp_path)
+        durable_replace(tmp_path, self._snapshot_path(name))
+        self.snapshot = name
+        self.snapshot_rows = len(self.vectors)
+        self.snapshot_size = self.index.ntotal
+        self._snapshot_stale = False
+
+    def _remove_snapshots(self, keep: Optional[str]):
+        """keep 이외의 스냅샷 파일 삭제 (이전 세대, 커밋되지 않은 임시 파일)"""
+        pattern = os.path.join(glob.escape(self.db_path), "faiss_index*.bin*")
+        for path in glob.glob(pattern):
+            if os.path.basename(path) != keep:
+                os.remove(path)
+
+    def _remove_orphans(self):
+        """커밋되지 않은 세그먼트/스냅샷 파일 정리 (쓰기 시작 전에만 호출, 읽기 전용 프로세스는 건드리지 않음)"""
+        if (self._compactor is not None and self._compactor.is_alive()) or self._merged is not None:
+            # 병합 중이거나 반영을 기다리는 세그먼트도 목록 밖에 있으므로 이번에는 정리하지 않음
+            self._remove_snapshots(keep=self.snapshot)
+            return
+        self.vectors.remove_orphans()
+        self._remove_snapshots(keep=self.snapshot)
+
+    def _maybe_compact(self):
+        """세그먼트 수가 max_segments를 넘으면 백그라운드 스레드에서 병합
+
+        뒤쪽 세그먼트들을 합친 크기가 바로 앞 세그먼트 이상이 되는 가장 긴 구간을 합쳐서
+        세그먼트 크기가 대략 기하급수적으로 줄어들게 유지한다 (각 벡터는 로그 횟수만 다시 쓰인다).
+        """
+        segments = list(self.vectors.segments)
+        if len(segments) <= self.max_segments or (self._compactor and self._compactor.is_alive()):
+            return
+
+        rows = self.vectors.segment_rows
+        start = next(
+            (i for i in range(len(rows) - 1) if rows[i] <= sum(rows[i + 1 :])), len(rows) - 2
+        )
+        self._compactor = threading.Thread(
+            target=self._compact_segments,
+            args=(segments[start:],),
+            name="sbi-compaction",
+            daemon=True,
+        )
+        self._compactor.start()
+
+    def _compact_segments(self, names: List[str]):
+        """세그먼트 병합 (백그라운드). 쓰기 작업 중이면 결과를 다음 save_index()에서 반영한다."""
+        try:
+            merged = self.vectors.merge(names)
+        except Exception as e:
+            logger.error(f"Segment compaction failed: {e}")
+            return
+
+        self._merged = (names, merged)
+        if not self._write_lock.acquire(blocking=False):
+            return
+        try:
+            # 커밋되지 않은 청크가 있으면 (인덱싱 중) 함께 커밋되지 않도록 다음 체크포인트로 미룸
+            if not self.store.in_transaction and self._apply_merged():
+                self.store.set_state('storage', self._storage_state())
+                self.store.flush()
+                self.vectors.release()
+        finally:
+            self._write_lock.release()
+
+    def _apply_merged(self) -> bool:
+        """백그라운드 병합 결과를 세그먼트 목록에 반영 (반영했으면 True)"""
+        if self._merged is None:
+            return False
+        names, merged = self._merged
+        self._merged = None
+        if self.vectors.replace(names, merged):
+            logger.info(f"Compacted {len(names)} vector segments into {merged}.")
+            return True
+        self.vectors.discard(merged)  # 그사이 삭제로 세그먼트가 교체됨
+        return False
+
+    def compact(self):
+        """tombstone을 정리하고 모든 세그먼트를 하나로 합친 뒤 새 인덱스 스냅샷을 써서 로드 시 재생할 벡터를 없앰"""
+        if not FAISS_AVAILABLE or self.index is None:
+            return
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._write_lock:
+            self._purge_tombstones()
+            self.vectors.flush()
+            self._apply_merged()
+            if len(self.vectors.segments) > 1:
+                self._merged = (
+                    list(self.vectors.segments),
+                    self.vectors.merge(self.vectors.segments),
+                )
+            if self.snapshot_rows != len(self.vectors):
+                self._snapshot_stale = True
+            self.save_index()
+
+    def close(self):
+        """백그라운드 병합을 기다리고 저장소와 공유 모델 참조를 정리 (저장하지 않은 변경은 버림)"""
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._write_lock, self._rw.write():
+            self.store.close()
+            if self._model is not None:
+                self._model = None
+                models.release(EMBEDDING_MODEL)
+
+    def _scan_files(self) -> List[str]:
+        """인덱싱 대상 파일 목록 (PDF, TXT, scope가 있으면 그 범위 안에서만)"""
+        root, pattern = self.onedrive_path, "**"
+        if self.scope == '.':
+            pattern = ""
+        elif self.scope is not None:
+            root = os.path.join(self.onedrive_path, self.scope)
+        files = glob.glob(os.path.join(root, pattern, "*.pdf"), recursive=True) + glob.glob(
+            os.path.join(root, pattern, "*.txt"), recursive=True
+        )
+        return sorted(files)
+
+    def _detect_changes(self, files: List[str], force: bool = False):
+        """manifest와 비교하여 신규/변경/삭제 파일 분류
+
+        size와 mtime이 그대로인 파일은 stat 한 번으로 건너뛰고, 둘 중 하나라도 바뀐 파일만
+        내용 해시를 계산한다. 해시가 같으면 (touch, 동기화 재다운로드 등) 재인덱싱하지 않는다.
+
+        Returns:
+            (changed, deleted): 재인덱싱할 (path, entry) 목록과 삭제된 경로 목록
+        """
+        current = set(files)
+        deleted = [path for path in self.manifest if path not in current]
+        changed = []
+
+        for path in files:
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                logger.warning(f"Cannot stat {path}: {e}")
+                continue
+
+            entry = self.manifest.get(path)
+            if (
+                not force
+                and entry
+                and entry['size'] == st.st_size
+                and entry['mtime_ns'] == st.st_mtime_ns
+            ):
+                continue
+
+            try:
+                digest = _hash_file(path)
+            except OSError as e:
+                logger.warning(f"Cannot read {path}: {e}")
+                continue
+
+            new_entry = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "sha256": digest,
+                "chunks": 0,
+                "indexed_at": time.time(),
+            }
+            if not force and entry and entry['sha256'] in (None, digest):
+                # 내용 동일 (또는 legacy 항목 채택): 메타정보만 갱신
+                new_entry['chunks'] = entry['chunks']
+                new_entry['indexed_at'] = entry.get('indexed_at') or new_entry['indexed_at']
+                if new_entry['indexed_at'] != entry.get('indexed_at'):
+                    self._invalidate()  # 날짜 필터 결과가 바뀜
+                self.manifest[path] = new_entry
+                self._manifest_dirty = True
+                continue
+
+            changed.append((path, new_entry))
+
+        return changed, deleted
+
+    def _remove_sources(self, paths) -> int:
+        """지정한 파일들의 청크를 메타데이터에서 삭제하고 벡터는 tombstone으로 표시 (배타 잠금 안에서 호출,
+        삭제한 청크 수 반환)"""
+        paths = set(paths)
+        removed = self.store.remove_paths(paths)
+        if removed:
+            self._invalidate()
+
+        for path in paths:
+            self.manifest.pop(path, None)
+            self.indexed_files.discard(path)
+            self._file_attrs.pop(path, None)
+        return len(removed)
+
+    def _maybe_purge(self):
+        """tombstone이 tombstone_ratio를 넘으면 정리 (쓰기 잠금 안, 배타 잠금 밖에서 호출)"""
+        if self.store.tombstones > self.tombstone_ratio * max(len(self.store), 1):
+            self._purge_tombstones()
+
+    def _purge_tombstones(self):
+        """tombstone 정리: 삭제된 청크의 벡터를 인덱스와 원본 벡터 세그먼트에서 실제로 제거
+
+        살아 있는 행만 새 세그먼트로 다시 쓰고 pos를 0부터 다시 매기므로 전체 크기에 비례하는 비용이
+        들지만, tombstone이 tombstone_ratio를 넘을 때만 하므로 삭제 한 건당 비용은 상수로 분할된다.
+        새 세그먼트, pos 재부여, 정리된 인덱스(복사본에서 삭제, HNSW는 재구성)는 모두 기존 인덱스로
+        검색이 계속되는 동안 만들고, 배타 잠금 안에서는 참조 교체와 세대 증가만 한다. 그동안 검색은
+        이전 인덱스, 원본 벡터, id 매핑, tombstone 목록을 함께 보므로 결과가 바뀌지 않는다.
+        """
+        with self._write_lock:
+            dead = self.store.tombstone_ids()
+            if not len(dead):
+                return
+            self._check_loaded()
+            if self._compactor is not None:
+                self._compactor.join()  # 교체될 세그먼트를 읽는 중일 수 있음
+            _limit_faiss_threads(self.index_threads)
+
+            self.store.id_map()  # 검색이 갱신 중인 pos를 SQLite에서 읽지 않도록 현재 매핑을 고정
+            ids, rows = self.store.live_rows()
+            vectors = self.vectors.get(rows)
+            if hasattr(self._base_index(), 'hnsw'):
+                # HNSW는 삭제를 지원하지 않으므로 살아 있는 벡터로 다시 구성
+                index = self._index_from(self.index_kind, self.index_compression, vectors, ids)
+            else:
+                if self._index_mmapped:  # 매핑된 인덱스는 읽기 전용이므로 스냅샷을 새로 읽음
+                    index = faiss.read_index(self._snapshot_path())
+                else:
+                    index = faiss.clone_index(self.index)
+                index.remove_ids(faiss.IDSelectorBatch(len(dead), faiss.swig_ptr(dead)))
+            segments = self.vectors.stage(vectors)
+            id_map = self.store.renumber(ids, rows)
+
+            with self._rw.write():
+                self.index = index
+                self._index_mmapped = False
+                self._apply_search_params()
+                self.vectors.swap(segments)
+                self.store.adopt_renumbered(id_map)
+                self._snapshot_stale = True
+                self._invalidate()
+        logger.info(f"Purged {len(dead)} deleted chunks; {len(ids)} live vectors remain.")
+
+    def remove_source(self, path: str) -> int:
+        """파일 하나를 인덱스에서 제거하고 저장 (삭제한 청크 수 반환)
+
+        청크는 즉시 검색 대상에서 빠진다. 벡터는 tombstone으로 표시했다가 tombstone_ratio를 넘으면
+        인덱스와 원본 벡터에서 한꺼번에 정리한다.
+        """
+        if not FAISS_AVAILABLE or self.index is None:
+            return 0
+        self._check_loaded()
+        with self._write_lock:
+            known = path in self.manifest
+            with self._rw.write():
+                removed = self._remove_sources([path])
+            self._maybe_purge()
+            self._maybe_migrate_index()
+            if known:
+                self.save_index()
+        if known:
+            logger.info(f"Removed {removed} chunks of {os.path.basename(path)}")
+        return removed
+
+    def update_source(self, path: str) -> int:
+        """파일 하나를 다시 인덱싱하고 저장 (기존 청크는 새 청크로 교체, 추가한 청크 수 반환)
+
+        manifest와 무관하게 항상 다시 인덱싱한다. 파일이 없으면 remove_source()와 같다.
+        """
+        if not os.path.exists(path):
+            self.remove_source(path)
+            return 0
+        if not all([FAISS_AVAILABLE, LANGCHAIN_AVAILABLE, SENTENCE_TRANSFORMERS_AVAILABLE]):
+            logger.error("Cannot index: missing required dependencies")
+            return 0
+
+        st = os.stat(path)
+        entry = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": _hash_file(path),
+            "chunks": 0,
+            "indexed_at": time.time(),
+        }
+        chunks = _load_and_split(path, self.chunk_size, self.chunk_overlap)
+        entry['chunks'] = len(chunks)
+        parts = self._encode_chunks(path, chunks)
+        with self._write_lock:
+            self._ensure_writable()
+            self._publish([(path, entry)], parts)
+            self.save_index()
+        logger.success(f"Updated {os.path.basename(path)} ({len(chunks)} chunks)")
+        return len(chunks)
 
     def load_and_index(self, force: bool = False):
-        """원드라이브 폴더 스캔 및 신규 파일 인덱싱 (부하 방지 배치 처리 적용)"""
+        """원드라이브 폴더 스캔 및 추가/변경/삭제 파일 증분 인덱싱 (병렬 파싱 파이프라인)
+
+        Args:
+            force: True이면 manifest와 무관하게 모든 파일을 다시 인덱싱 (기존 청크는 교체)
+        """
         if not all([FAISS_AVAILABLE, LANGCHAIN_AVAILABLE, SENTENCE_TRANSFORMERS_AVAILABLE]):
             logger.error("Cannot index: missing required dependencies")
             return
@@ -182,83 +1344,625 @@ class SBIPipeline:
             logger.info("Set ONEDRIVE_PATH environment variable or create .env file")
             return
 
-        import time
-        files = glob.glob(os.path.join(self.onedrive_path, "**/*.pdf"), recursive=True) + \
-                glob.glob(os.path.join(self.onedrive_path, "**/*.txt"), recursive=True)
+        self._check_loaded()
+        with self._write_lock:
+            self._manifest_dirty = False
+            changed, deleted = self._detect_changes(self._scan_files(), force=force)
 
-        new_files = [f for f in files if f not in self.indexed_files or force]
-        if not new_files:
-            logger.info("No new files found in OneDrive.")
-            return
+            if not changed and not deleted:
+                if self._manifest_dirty:
+                    self.save_index()
+                logger.info("No new or modified files found in OneDrive.")
+                return
 
-        logger.info(f"Found {len(new_files)} new files to index. Starting throttled indexing...")
+            self._ensure_writable()
+            self._remove_orphans()
 
-        batch_size = 10
-        for i in range(0, len(new_files), batch_size):
-            batch = new_files[i:i + batch_size]
-            logger.info(f"Processing Batch {i//batch_size + 1}/{(len(new_files)-1)//batch_size + 1} ({len(batch)} files)...")
+            # 삭제된 파일은 바로 검색에서 제외. 변경된 파일의 기존 청크는 새 청크와 함께 교체한다 (_publish)
+            if deleted:
+                with self._rw.write():
+                    removed = self._remove_sources(deleted)
+                self._maybe_purge()
+                self._maybe_migrate_index()
+                logger.info(f"Removed {removed} chunks of {len(deleted)} deleted files.")
 
-            for file_path in batch:
-                try:
-                    self._index_file(file_path)
-                    self.indexed_files.add(file_path)
-                    # 파일 간 짧은 지연 (CPU 쿨링)
-                    time.sleep(1)
-                except Exception as e:
-                    logger.error(f"Failed to index {file_path}: {e}")
+            if not changed:
+                self.save_index()
+                return
+
+            logger.info(
+                f"Found {len(changed)} new/modified files to index "
+                f"({self.max_workers} parser workers)..."
+            )
 
-            # 배치 간 중간 지연 (메모리 정리 유도)
+            # 파싱/청크 분할은 프로세스 풀, 임베딩은 이 스레드 하나에서 검색을 막지 않고 수행.
+            # 여러 파일의 청크를 고정 크기 배치로 묶어 encode 호출당 처리량을 일정하게 유지하고,
+            # save_every개 파일마다 임베딩이 끝난 파일들을 한 번에 검색에 반영한 뒤 체크포인트를 저장한다.
+            start = time.perf_counter()
+            token_cap = getattr(self.model, 'max_seq_length', None) or 256
+            batch = _EmbeddingBatch(self.batch_size, self.max_batch_tokens, token_cap)
+            files, parts = [], []  # 반영 대기 중인 (path, entry), (임베딩, 청크 메타데이터)
+            indexed = added = 0
+
+            for file_path, entry, contents, error in self._parse_files(changed):
+                if error is not None:
+                    logger.error(f"Failed to index {file_path}: {error}")
+                    continue
+
+                file_name = os.path.basename(file_path)
+                entry['chunks'] = len(contents)
+                added += len(contents)
+                for content, page, offset in contents:
+                    meta = {
+                        "content": content,
+                        "source": file_name,
+                        "path": file_path,
+                        "page": page,
+                        "start_offset": offset,
+                    }
+                    if batch.add(content, meta):
+                        self._encode_batch(batch, files, parts)
+                batch.files.append((file_path, entry))
+
+                if len(files) + len(batch.files) >= self.save_every:
+                    # 파일 경계에서만 반영하므로 반쯤 인덱싱된 파일은 검색되거나 저장되지 않는다
+                    self._encode_batch(batch, files, parts)
+                    indexed += self._publish(files, parts)
+                    files, parts = [], []
+                    logger.info(f"Indexed {indexed}/{len(changed)} files. Saving checkpoint...")
+                    self.save_index()
+
+            self._encode_batch(batch, files, parts)
+            indexed += self._publish(files, parts)
             self.save_index()
-            if i + batch_size < len(new_files):
-                logger.info("Batch completed. Cooling down for 3 seconds...")
-                time.sleep(3)
 
-    def _index_file(self, file_path: str):
-        """단일 파일 파싱 및 벡터화"""
-        if not LANGCHAIN_AVAILABLE or not self.model:
+            elapsed = time.perf_counter() - start
+            logger.success(
+                f"Indexing finished: {indexed}/{len(changed)} files, {added} chunks "
+                f"in {elapsed:.1f}s ({added / max(elapsed, 1e-9):.1f} chunks/s), "
+                f"{len(self.store)} chunks total."
+            )
+
+    def _encode_batch(
+        self,
+        batch: _EmbeddingBatch,
+        files: List[Tuple[str, Dict]],
+        parts: List[Tuple[np.ndarray, List[Dict]]],
+    ):
+        """배치를 임베딩하여 반영 대기 목록에 옮기고, 청크가 모두 임베딩된 파일도 함께 옮김"""
+        if batch.contents:
+            embeddings = self.model.encode(batch.contents, batch_size=self.batch_size).astype(
+                'float32'
+            )
+            parts.append((embeddings, batch.metadata))
+        files.extend(batch.files)
+        batch.clear()
+
+    def _publish(
+        self, files: List[Tuple[str, Dict]], parts: List[Tuple[np.ndarray, List[Dict]]]
+    ) -> int:
+        """임베딩을 마친 파일들을 한 번에 검색에 반영 (쓰기 잠금 안에서 호출, 반영한 파일 수 반환)
+
+        파일의 기존 청크 삭제, 새 청크 추가, manifest 갱신을 배타 잠금 한 번 안에서 하므로 검색은 각 파일의
+        이전 내용과 새 내용 중 하나만 보고 반쯤 추가된 파일은 보지 못한다. 배타 구간에서는 메모리 내
+        인덱스 추가와 SQLite INSERT만 하며, tombstone 정리와 인덱스 종류 전환은 그 뒤 검색을 막지 않고 한다.
+        """
+        if not files and not parts:
+            return 0
+        _limit_faiss_threads(self.index_threads)
+        with self._rw.write():
+            self._remove_sources([path for path, _ in files])
+            for embeddings, items in parts:
+                self._add_chunks(embeddings, items)
+            for file_path, entry in files:
+                self.manifest[file_path] = entry
+                self.indexed_files.add(file_path)
+                self._attrs_of(file_path)
+            self._invalidate()
+        self._maybe_purge()
+        self._maybe_migrate_index()
+        return len(files)
+
+    def _add_chunks(self, embeddings: np.ndarray, items: List[Dict]):
+        """청크 추가: 메타데이터에 기록해 받은 청크 id로 벡터를 인덱스에 추가 (원본 벡터 행 = pos)"""
+        ids = self.store.extend(items)
+        self.vectors.append(embeddings)
+        self.index.add_with_ids(embeddings, np.asarray(ids, dtype='int64'))
+
+    def _parse_files(self, files):
+        """파싱 단계 (producer)
+
+        파일을 프로세스 풀에 제출하고 완료되는 순서대로 (path, entry, contents, error)를 내보낸다.
+        동시에 대기 중인 작업은 워커 수의 2배로 제한하여 파싱 결과가 메모리에 쌓이지 않게 한다.
+        """
+        if self.max_workers <= 1:
+            for file_path, entry in files:
+                try:
+                    yield file_path, entry, _load_and_split(
+                        file_path, self.chunk_size, self.chunk_overlap
+                    ), None
+                except Exception as e:
+                    yield file_path, entry, None, e
             return
 
+        todo = iter(files)
+        pending = {}
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+
+            def submit_next():
+                for file_path, entry in todo:
+                    future = executor.submit(
+                        _load_and_split, file_path, self.chunk_size, self.chunk_overlap
+                    )
+                    pending[future] = (file_path, entry)
+                    return
+
+            for _ in range(self.max_workers * 2):
+                submit_next()
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path, entry = pending.pop(future)
+                    submit_next()
+                    try:
+                        yield file_path, entry, future.result(), None
+                    except Exception as e:
+                        yield file_path, entry, None, e
+
+    def _encode_chunks(
+        self, file_path: str, chunks: List[Tuple[str, Optional[int], Optional[int]]]
+    ) -> List[Tuple[np.ndarray, List[Dict]]]:
+        """파싱된 파일 하나의 청크를 배치 단위로 임베딩 (인덱스에는 _publish에서 추가)"""
         file_name = os.path.basename(file_path)
-        logger.info(f"Processing {file_name}...")
+        parts = []
+        for i in range(0, len(chunks), self.batch_size):
+            batch = chunks[i : i + self.batch_size]
+            embeddings = self.model.encode(
+                [content for content, _, _ in batch], batch_size=self.batch_size
+            ).astype('float32')
+            parts.append(
+                (
+                    embeddings,
+                    [
+                        {
+                            "content": content,
+                            "source": file_name,
+                            "path": file_path,
+                            "page": page,
+                            "start_offset": start,
+                        }
+                        for content, page, start in batch
+                    ],
+                )
+            )
+        return parts
+
+    def reading(self):
+        """읽기 잠금 context manager: 안에서 한 검색/조회는 모두 같은 세대를 본다 (반영은 끝날 때까지 대기)
+
+        예: with pipeline.reading(): hits = pipeline.search(q); total = len(pipeline.store)
+        """
+        return self._rw.read()
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 3,
+        mode: Optional[str] = None,
+        filters: Union[None, Dict, SearchFilter] = None,
+    ) -> List[Dict]:
+        """지식 검색
+
+        Args:
+            mode: 'dense' | 'hybrid' | 'lexical' (기본: search_mode). lexical은 임베딩 모델을
+                로드하지 않고 BM25 역색인만으로 답하므로 유전자/마커 토큰 조회에 적합하다.
+            filters: 검색 대상 제한 (SearchFilter 또는 같은 키의 dict, 예: {"source": "*organoid*",
+                "file_types": ("pdf",), "indexed_after": date(2024, 1, 1), "domain": "Papers"}).
+                조건은 인덱스 검색 안에서 적용되므로 결과 수가 n_results보다 줄지 않는다.
+        """
+        return self.search_many([query], n_results, mode, filters)[0]
+
+    def search_many(
+        self,
+        queries: List[str],
+        n_results: int = 3,
+        mode: Optional[str] = None,
+        filters: Union[None, Dict, SearchFilter] = None,
+    ) -> List[List[Dict]]:
+        """여러 질의를 한 번에 검색
+
+        질의 전체를 한 번의 encode 호출로 임베딩하고, 질의 행렬로 index.search를 한 번만 호출한다.
+        결과 청크도 모든 질의에 대해 한 번에 조회한다. 같은 인덱스 세대에서 이미 검색한 질의는
+        결과 캐시에서, 이미 임베딩한 질의는 임베딩 캐시에서 가져오고 나머지만 계산한다.
+        임베딩은 잠금 밖에서 하고, 인덱스/메타데이터 조회는 읽기 잠금 안에서 하므로 한 호출은 항상
+        반영이 끝난 하나의 인덱스 세대만 본다 (인덱싱 중인 파일의 일부만 보이는 일이 없다).
+
+        Returns:
+            질의 순서대로 search()와 같은 형태의 결과 목록. dense 결과는 {content, source, page, distance},
+            hybrid/lexical 결과는 여기에 score(RRF 또는 BM25 점수)가 추가되고 벡터 후보가 아니면 distance는 None.
+        """
+        queries = list(queries)
+        filters = SearchFilter.coerce(filters)
+        mode = (mode or self.search_mode).lower()
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}'. Choose from {SEARCH_MODES}")
+        if not queries or len(self.store) == 0 or self._load_error is not None:
+            return [[] for _ in queries]  # 로드 실패 시에는 빈 인덱스로 응답
 
-        if file_path.endswith('.pdf'):
-            loader = PyPDFLoader(file_path)
+        if mode != 'lexical' and not (FAISS_AVAILABLE and self.index is not None and self.model):
+            if mode == 'dense':
+                logger.warning("Embedding model not available for search")
+                return [[] for _ in queries]
+            mode = 'lexical'  # 임베딩을 쓸 수 없으면 hybrid는 BM25 결과만 반환
+
+        vectors = None
+        if mode != 'lexical':
+            unique = list(dict.fromkeys(queries))
+            vectors = dict(zip(unique, self._embed_queries(unique)))
+        with self._rw.read():
+            generation = self.generation
+            results = [
+                self._result_cache.get((generation, mode, filters, query, n_results))
+                for query in queries
+            ]
+            misses = list(dict.fromkeys(q for q, hits in zip(queries, results) if hits is None))
+            if misses:
+                query_vectors = (
+                    np.vstack([vectors[q] for q in misses]) if vectors is not None else None
+                )
+                found = dict(
+                    zip(
+                        misses,
+                        self._search_uncached(misses, n_results, mode, filters, query_vectors),
+                    )
+                )
+                for query in misses:
+                    self._result_cache.put(
+                        (generation, mode, filters, query, n_results), found[query]
+                    )
+                results = [found[q] if hits is None else hits for q, hits in zip(queries, results)]
+        # 호출자가 결과를 수정해도 캐시가 바뀌지 않도록 복사본 반환
+        return [[dict(hit) for hit in hits] for hits in results]
+
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """질의 임베딩 (캐시에 없는 질의만 한 번에 encode)"""
+        cached = [self._embedding_cache.get(query) for query in queries]
+        missing = [query for query, vector in zip(queries, cached) if vector is None]
+        if missing:
+            encoded = dict(
+                zip(
+                    missing,
+                    self.model.encode(missing, batch_size=self.batch_size).astype('float32'),
+                )
+            )
+            for query, vector in encoded.items():
+                self._embedding_cache.put(query, vector)
+            cached = [
+                encoded[q] if vector is None else vector for q, vector in zip(queries, cached)
+            ]
+        return np.vstack(cached).astype('float32', copy=False)
+
+    def _search_uncached(
+        self,
+        queries: List[str],
+        n_results: int,
+        mode: str,
+        filters: Optional[SearchFilter] = None,
+        query_vectors: Optional[np.ndarray] = None,
+    ) -> List[List[Dict]]:
+        """캐시를 거치지 않는 검색 (질의는 중복 없음, 읽기 잠금 안에서 호출)"""
+        candidates = self._candidates(
+            queries, candidate_depth(n_results, mode), mode, filters, query_vectors
+        )
+        return [merge_hits(dense, lexical, n_results, mode) for dense, lexical in candidates]
+
+    def _candidates(
+        self,
+        queries: List[str],
+        k: int,
+        mode: str,
+        filters: Optional[SearchFilter] = None,
+        query_vectors: Optional[np.ndarray] = None,
+    ) -> List[Tuple[List, List]]:
+        """질의별 (벡터 검색 (청크, 거리) 목록, BM25 (청크, 점수) 목록). mode에서 쓰지 않는 쪽은 빈 목록
+
+        query_vectors는 queries의 임베딩 (없으면 여기서 임베딩). 읽기 잠금 안에서 호출한다.
+        """
+        paths = allowed = None
+        if filters is not None:
+            paths, allowed = self._filter_scope(filters, with_ids=mode != 'lexical')
+            if not paths:
+                return [([], []) for _ in queries]
+
+        dense = (
+            self._dense_search(queries, k, allowed, query_vectors)
+            if mode != 'lexical'
+            else [[] for _ in queries]
+        )
+        lexical = (
+            [self.store.lexical_search(query, k, paths) for query in queries]
+            if mode != 'dense'
+            else [[] for _ in queries]
+        )
+        return list(zip(dense, lexical))
+
+    def _dense_search(
+        self,
+        queries: List[str],
+        k: int,
+        allowed: Optional[np.ndarray] = None,
+        query_vectors: Optional[np.ndarray] = None,
+    ) -> List[List[Tuple[Dict, float]]]:
+        """벡터 검색 (질의별 (청크, L2 거리) 목록)
+
+        allowed(허용된 청크 id 배열)가 있으면 그 벡터만 검색한다. 허용된 벡터가 적으면 원본 벡터로
+        정확히 계산하고(인덱스 전체 탐색보다 저렴), 많으면 id selector로 인덱스 탐색 중에 걸러낸다.
+        아직 정리되지 않은 tombstone은 tombstone id를 뺀 selector로 같은 인덱스 탐색에서 제외한다.
+        IVF/HNSW가 탐색 범위 안에서 k개를 채우지 못하면 _selected_search()가 탐색 범위를 넓혀 보충한다.
+        """
+        if query_vectors is None:
+            query_vectors = self._embed_queries(queries)
+        _limit_faiss_threads(self.search_threads)
+        if allowed is None:
+            dead = self.store.tombstone_ids()
+            if not len(dead):
+                distances, indices = self._index_search(query_vectors, k)
+            else:
+                selector = faiss.IDSelectorNot(
+                    faiss.IDSelectorBatch(len(dead), faiss.swig_ptr(dead))
+                )
+                distances, indices = self._selected_search(
+                    query_vectors, k, selector, len(self.store), self.store.id_map().live_ids
+                )
+        elif len(allowed) <= EXACT_FILTER_LIMIT:
+            distances, indices = self._exact_search(query_vectors, allowed, k)
         else:
-            loader = TextLoader(file_path)
+            distances, indices = self._selected_search(
+                query_vectors, k, self._id_selector(allowed), len(allowed), lambda: allowed
+            )
+
+        chunks = {
+            chunk['id']: chunk for chunk in self.store.get_by_ids(np.unique(indices[indices >= 0]))
+        }
+        return [
+            [
+                (chunks[idx], float(distance))
+                for distance, idx in zip(row_distances, row_indices)
+                if idx in chunks
+            ]
+            for row_distances, row_indices in zip(distances, indices)
+        ]
 
-        documents = loader.load()
-        chunks = self.text_splitter.split_documents(documents)
+    @staticmethod
+    def _id_selector(ids: np.ndarray):
+        """허용된 청크 id(오름차순)의 selector
 
-        contents = [chunk.page_content for chunk in chunks]
-        embeddings = self.model.encode(contents).astype('float32')
+        id가 촘촘하면 id 범위 크기의 비트맵(조회가 가장 빠름)을, 삭제가 쌓여 id 범위에 비해 드문드문하면
+        허용된 id 수에 비례하는 해시 집합을 쓴다.
+        """
+        if ids[-1] < 64 * len(ids):
+            mask = np.zeros(ids[-1] + 1, dtype=bool)
+            mask[ids] = True
+            bitmap = np.packbits(mask, bitorder='little')
+            selector = faiss.IDSelectorBitmap(len(bitmap), faiss.swig_ptr(bitmap))
+        else:
+            ids = np.ascontiguousarray(ids, dtype='int64')
+            selector = faiss.IDSelectorBatch(len(ids), faiss.swig_ptr(ids))
+            bitmap = None
+        selector.referenced_objects = [bitmap]  # 검색이 끝날 때까지 비트맵 유지
+        return selector
 
-        self.index.add(embeddings)
-        for content in contents:
-            self.metadata.append({"content": content, "source": file_name})
+    def _selected_search(
+        self,
+        query_vectors: np.ndarray,
+        k: int,
+        selector,
+        candidates: int,
+        candidate_ids: Callable[[], np.ndarray],
+    ):
+        """selector를 통과한 벡터만 인덱스에서 검색 (candidates: 통과하는 벡터 수)
 
-        logger.success(f"Added {len(chunks)} chunks from {file_name}")
+        IVF/HNSW는 nprobe/efSearch 범위 안에서 selector를 통과한 벡터만 결과에 넣으므로 k개를 채우지
+        못할 수 있다. 그런 질의만 골라 후보가 EXACT_FILTER_LIMIT 이하이면 candidate_ids()로 정확히
+        검색하고, 많으면 k와 nprobe/efSearch를 두 배씩(최대 FILTER_WIDEN_LIMIT배) 넓혀 다시 찾는다.
+        후보 전체를 원본 벡터로 훑는 비용이 필터 크기에 비례해 커지지 않도록 하기 위함이다.
+        """
+        distances, indices = self._index_search(query_vectors, k, self._search_params(selector))
+        want = min(k, candidates)
+        widen = 1
+        short = (indices[:, :want] < 0).any(axis=1)
+        while short.any():
+            if candidates <= EXACT_FILTER_LIMIT:
+                found = self._exact_search(query_vectors[short], candidate_ids(), k)
+                distances[short], indices[short] = found
+                break
+            if widen >= FILTER_WIDEN_LIMIT:
+                break
+            widen *= 2
+            found = self._index_search(
+                query_vectors[short], k * widen, self._search_params(selector, widen)
+            )
+            distances[short], indices[short] = (result[:, :k] for result in found)
+            short = (indices[:, :want] < 0).any(axis=1)
+        return distances, indices
 
-    def search(self, query: str, n_results: int = 3) -> List[Dict]:
-        """지식 검색"""
-        if not FAISS_AVAILABLE or self.index is None or len(self.metadata) == 0:
-            return []
+    def _index_search(self, query_vectors: np.ndarray, k: int, params=None):
+        """FAISS 인덱스 검색 (손실 압축 인덱스는 후보를 넉넉히 뽑아 원본 벡터로 재정렬)"""
+        if self._is_lossy() and self.rerank_factor > 1:
+            _, candidates = self.index.search(query_vectors, k * self.rerank_factor, params=params)
+            return self._rerank(query_vectors, candidates, k)
+        return self.index.search(query_vectors, k, params=params)
+
+    def _search_params(self, selector, widen: int = 1):
+        """id selector를 담은 검색 파라미터 (인덱스 종류별 nprobe/efSearch를 widen배로)"""
+        ivf = faiss.try_extract_index_ivf(self.index)
+        if ivf is not None:
+            return faiss.SearchParametersIVF(
+                sel=selector, nprobe=min(self.nprobe * widen, ivf.nlist)
+            )
+        if hasattr(self._base_index(), 'hnsw'):
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=self.ef_search * widen)
+        return faiss.SearchParameters(sel=selector)
+
+    def _exact_search(self, query_vectors: np.ndarray, ids: np.ndarray, k: int):
+        """지정한 id의 원본 벡터만으로 정확한 L2 검색 (index.search와 같은 형태로 반환)"""
+        distances = np.full((len(query_vectors), k), np.inf, dtype='float32')
+        indices = np.full((len(query_vectors), k), -1, dtype='int64')
+        if len(ids) == 0:
+            return distances, indices
+        vectors = self.vectors.get(self.store.id_map().rows(ids))
+        exact = ((query_vectors**2).sum(axis=1)[:, None] - 2 * query_vectors @ vectors.T) + (
+            vectors**2
+        ).sum(axis=1)[None, :]
+        top = min(k, len(ids))
+        order = np.argpartition(exact, top - 1, axis=1)[:, :top]
+        order = np.take_along_axis(
+            order, np.argsort(np.take_along_axis(exact, order, axis=1), axis=1), axis=1
+        )
+        distances[:, :top] = np.maximum(np.take_along_axis(exact, order, axis=1), 0)
+        indices[:, :top] = ids[order]
+        return distances, indices
+
+    def _relpath(self, path: str) -> str:
+        return os.path.relpath(path, self.onedrive_path).replace(os.sep, '/')
 
-        if not self.model:
-            logger.warning("Embedding model not available for search")
+    def domain_of(self, path: str) -> Optional[str]:
+        """파일의 도메인 태그 (domain_rules의 첫 일치 규칙, 없으면 OneDrive 기준 최상위 폴더명)"""
+        relpath = self._relpath(path)
+        for pattern, tag in self.domain_rules.items():
+            if fnmatch.fnmatch(relpath, pattern):
+                return tag
+        head, sep, _ = relpath.partition('/')
+        return head if sep and head != '..' else None
+
+    def _attrs_of(self, path: str) -> FileAttrs:
+        """파일의 필터 평가용 속성 (인덱싱할 때 계산해 두고, 없으면 여기서 계산)"""
+        attrs = self._file_attrs.get(path)
+        if attrs is None:
+            attrs = self._file_attrs[path] = FileAttrs.of(self._relpath(path), self.domain_of(path))
+        return attrs
+
+    def _filter_scope(
+        self, filters: SearchFilter, with_ids: bool = False
+    ) -> Tuple[List[str], Optional[np.ndarray]]:
+        """필터를 만족하는 (파일 경로 목록, 청크 id 배열). 읽기 잠금 안에서 호출
+
+        결과는 인덱스 세대별로 캐시하므로 같은 필터의 질의가 반복되면 manifest를 다시 훑지 않는다.
+        청크 id는 with_ids일 때만 처음 한 번 펼친다.
+        """
+        key = (self.generation, filters)
+        scope = self._filter_cache.get(key)
+        if scope is None:
+            scope = [
+                [
+                    path
+                    for path, entry in self.manifest.items()
+                    if filters.matches_file(self._attrs_of(path), entry.get('indexed_at'))
+                ],
+                None,
+            ]
+            self._filter_cache.put(key, scope)
+        if with_ids and scope[0] and scope[1] is None:
+            scope[1] = self.store.id_map().ids(scope[0])
+        return scope[0], scope[1] if with_ids else None
+
+    def cache_stats(self) -> Dict[str, Dict]:
+        """질의 임베딩/검색 결과 캐시 통계 (적중률 등)와 현재 인덱스 세대"""
+        return {
+            "embeddings": self._embedding_cache.stats(),
+            "results": self._result_cache.stats(),
+            "generation": self.generation,
+        }
+
+    def _rerank(self, query_vectors: np.ndarray, candidates: np.ndarray, k: int):
+        """질의별 후보를 원본 벡터와의 정확한 L2 거리로 재정렬 (index.search와 같은 형태로 반환)
+
+        여러 질의의 후보 원본 벡터는 중복을 제거해 한 번에 읽는다.
+        """
+        valid = candidates >= 0
+        ids, inverse = np.unique(np.where(valid, candidates, 0), return_inverse=True)
+        rows = self.store.id_map().rows(ids)
+        inverse = inverse.reshape(candidates.shape)
+        valid &= (rows >= 0)[inverse]  # 삭제된 청크
+        vectors = self.vectors.get(np.maximum(rows, 0))[inverse]
+        exact = ((vectors - query_vectors[:, None, :]) ** 2).sum(axis=2)
+        exact[~valid] = np.inf
+
+        order = np.argsort(exact, axis=1)[:, :k]
+        distances = np.take_along_axis(exact, order, axis=1)
+        indices = np.where(np.isinf(distances), -1, np.take_along_axis(candidates, order, axis=1))
+        return distances, indices
+
+    def evaluate_compression(
+        self,
+        k: int = 10,
+        n_queries: int = 200,
+        sample_size: int = 100_000,
+        settings=(None,) + COMPRESSION_TYPES,
+    ) -> List[Dict]:
+        """압축 방식별 recall@k 및 메모리 사용량 측정
+
+        저장된 원본 벡터에서 표본을 뽑아 압축 방식별 flat 인덱스를 만들고, 표본에 포함되지 않은
+        벡터를 질의로 사용해 정확한 검색(IndexFlatL2) 결과 대비 recall@k를 계산한다.
+
+        Returns:
+            설정별 {compression, bytes_per_vector, index_mb, recall, recall_reranked} 목록
+        """
+        if not FAISS_AVAILABLE or len(self.vectors) < k + 1:
             return []
 
-        query_vector = self.model.encode([query]).astype('float32')
-        distances, indices = self.index.search(query_vector, n_results)
-
-        hits = []
-        for i, idx in enumerate(indices[0]):
-            if idx != -1 and idx < len(self.metadata):
-                hits.append({
-                    "content": self.metadata[idx]['content'],
-                    "source": self.metadata[idx]['source'],
-                    "distance": float(distances[0][i])
-                })
-        return hits
+        vectors = self.vectors.get(self.store.live_rows()[1])
+        rng = np.random.default_rng(0)
+        order = rng.permutation(len(vectors))
+        n_queries = min(n_queries, max(1, len(vectors) // 10))
+        queries = vectors[order[:n_queries]]
+        base = vectors[order[n_queries : n_queries + sample_size]]
+
+        exact = faiss.IndexFlatL2(EMBEDDING_DIM)
+        exact.add(base)
+        _, truth = exact.search(queries, k)
+
+        def recall(found) -> float:
+            return float(np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)]))
+
+        report = []
+        for compression in settings:
+            if len(base) < _min_train_points('flat', len(base), compression):
+                logger.warning(f"Skipping {compression}: not enough vectors to train")
+                continue
+            index = self._build_index('flat', base, compression)
+            index.add(base)
+            _, found = index.search(queries, k)
+            _, candidates = index.search(queries, k * self.rerank_factor)
+            reranked = [
+                ((base[c[c >= 0]] - q) ** 2).sum(axis=1).argsort()[:k]
+                for q, c in zip(queries, candidates)
+            ]
+            reranked = [c[c >= 0][r] for c, r in zip(candidates, reranked)]
+
+            bytes_per_vector = index.code_size
+            report.append(
+                {
+                    "compression": compression or "none",
+                    "bytes_per_vector": bytes_per_vector,
+                    "index_mb": bytes_per_vector * max(self.index.ntotal, len(vectors)) / 1024**2,
+                    "recall": recall(found),
+                    "recall_reranked": recall(reranked),
+                }
+            )
+
+        logger.info(
+            f"Compression trade-off (recall@{k}, {len(base)} vectors, {n_queries} queries, "
+            f"rerank x{self.rerank_factor}):"
+        )
+        for row in report:
+            logger.info(
+                f"  {row['compression']:>5}: {row['bytes_per_vector']:>5} B/vec, "
+                f"{row['index_mb']:8.1f} MB, recall {row['recall']:.3f}, "
+                f"reranked {row['recall_reranked']:.3f}"
+            )
+        return report
 
 
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+# tools/sbi_registry.py
+"""
+SBI Registry - 프로세스 전역 공유 인스턴스 관리
+임베딩 모델과 SBIPipeline(FAISS 인덱스 + 청크 저장소)을 키별로 한 번만 로드하고 참조 카운트로 공유
+"""
+
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Optional
+from loguru import logger
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_PATH = os.path.join(PROJECT_ROOT, "manifest.yaml")
+LEGACY_DB_DIR = "knowledge_base"  # paths.knowledge 이전의 기본 인덱스 경로
+_INDEX_FILES = ("knowledge.db", "knowledge_data.pkl", "faiss_index.bin")  # 현재/이전 버전 인덱스
+
+
+def _has_index(path: str) -> bool:
+    return any(os.path.exists(os.path.join(path, name)) for name in _INDEX_FILES)
+
+
+@lru_cache(maxsize=None)
+def default_db_path() -> str:
+    """프로세스 공통 인덱스 경로 (SBIPipeline, ResearchEngine, BioMemory, verify_brain이 모두 사용)
+
+    manifest.yaml의 paths.knowledge (프로젝트 루트 기준)를 쓴다. 그 경로에 아직 인덱스가 없고 이전 기본
+    경로(knowledge_base)에 있으면 기존 인덱스를 계속 쓴다. PyYAML이 없거나 manifest를 읽을 수 없으면
+    knowledge_base. 프로세스 안에서는 처음 결정한 경로를 유지한다 (공유 파이프라인 키).
+    """
+    legacy = os.path.join(PROJECT_ROOT, LEGACY_DB_DIR)
+    try:
+        import yaml
+
+        with open(MANIFEST_PATH, encoding="utf-8") as f:
+            knowledge = ((yaml.safe_load(f) or {}).get("paths") or {}).get("knowledge")
+    except ImportError:
+        logger.debug("PyYAML not installed; using the default index path")
+        return legacy
+    except Exception as e:
+        logger.warning(f"Failed to read {MANIFEST_PATH}: {e}")
+        return legacy
+    if not knowledge:
+        return legacy
+    path = os.path.join(PROJECT_ROOT, knowledge)
+    if not _has_index(path) and _has_index(legacy):
+        logger.info(f"Using existing index in {legacy} (manifest paths.knowledge: {knowledge})")
+        return legacy
+    return path
+
+
+class SharedRegistry:
+    """키별 공유 인스턴스 (참조 카운트)
+
+    acquire()는 키의 인스턴스가 없으면 factory로 만들고, 있으면 같은 인스턴스를 돌려준다.
+    생성은 키별 잠금 안에서 하므로 여러 스레드가 동시에 요청해도 한 번만 로드되며, 다른 키의
+    생성은 기다리지 않는다. 마지막 참조가 release()되면 on_close를 호출하고 목록에서 제거한다.
+    """
+
+    def __init__(self, name: str, on_close: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.on_close = on_close
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, list] = {}  # key -> [instance, refcount, 생성 잠금]
+
+    def acquire(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = [None, 0, threading.Lock()]
+            entry[1] += 1
+
+        try:
+            with entry[2]:
+                if entry[0] is None:
+                    entry[0] = factory()
+                    logger.info(f"Shared {self.name} loaded: {key}")
+        except BaseException:
+            self._drop(key, entry)
+            raise
+        return entry[0]
+
+    def release(self, key: Hashable) -> bool:
+        """참조 해제 (마지막 참조였으면 인스턴스를 닫고 True 반환)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+        return self._drop(key, entry)
+
+    def _drop(self, key: Hashable, entry: list) -> bool:
+        with self._lock:
+            entry[1] -= 1
+            if entry[1] > 0:
+                return False
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+        if entry[0] is not None and self.on_close:
+            self.on_close(entry[0])
+        return True
+
+    def key_of(self, instance: Any) -> Optional[Hashable]:
+        with self._lock:
+            return next((key for key, entry in self._entries.items() if entry[0] is instance), None)
+
+    def stats(self) -> Dict[str, int]:
+        """키별 참조 수"""
+        with self._lock:
+            return {str(key): entry[1] for key, entry in self._entries.items()}
+
+
+def _close_pipeline(pipeline):
+    pipeline.close()
+
+
+models = SharedRegistry("model")
+pipelines = SharedRegistry("pipeline", on_close=_close_pipeline)
+
+
+def acquire_pipeline(db_path: Optional[str] = None, **kwargs):
+    """공유 SBIPipeline 가져오기 (사용이 끝나면 release_pipeline)
+
+    같은 임베딩 모델과 db_path의 파이프라인은 프로세스에서 하나만 만든다. kwargs는 처음
+    생성할 때만 적용되므로 설정이 다른 파이프라인이 필요하면 SBIPipeline을 직접 생성한다.
+    """
+    from sbi_pipeline import EMBEDDING_MODEL, SBIPipeline
+
+    db_path = os.path.abspath(db_path or default_db_path())
+    return pipelines.acquire(
+        (EMBEDDING_MODEL, db_path), lambda: SBIPipeline(db_path=db_path, **kwargs)
+    )
+
+
+def release_pipeline(pipeline) -> bool:
+    """acquire_pipeline으로 받은 파이프라인 반환 (마지막 참조면 닫음)"""
+    key = pipelines.key_of(pipeline)
+    return pipelines.release(key) if key is not None else False
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    """공유 중인 모델/파이프라인과 참조 수"""
+    return {"models": models.stats(), "pipelines": pipelines.stats()}
@@ -0,0 +1,403 @@
+# tools/sbi_shards.py
+"""
+SBI Sharded Pipeline
+OneDrive 최상위 폴더별 SBIPipeline 샤드를 독립적으로 로드/재구성/저장하고, 검색은 스레드 풀로 분산하여 전역 상위 k개로 병합
+"""
+
+import os
+import json
+import heapq
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+from loguru import logger
+
+from sbi_cache import LRUCache
+from sbi_filter import SearchFilter
+from sbi_pipeline import (
+    DEFAULT_SEARCH_MODE,
+    FAISS_AVAILABLE,
+    SEARCH_MODES,
+    SBIPipeline,
+    candidate_depth,
+    default_db_path,
+    get_onedrive_path,
+    merge_hits,
+)
+from sbi_store import durable_replace
+
+ROOT_SHARD = '.'  # OneDrive 루트에 바로 놓인 파일의 샤드
+
+
+def _chunk_key(chunk: Dict):
+    """샤드를 합친 결과에서 청크 식별자 (청크 id는 샤드마다 따로 매겨지고, 파일은 한 샤드에만 속함)"""
+    return chunk['path'], chunk['id']
+
+
+class ShardedPipeline:
+    """폴더별 샤드로 나눈 지식 베이스
+
+    OneDrive 최상위 폴더마다(루트에 바로 놓인 파일은 ROOT_SHARD) 독립된 SBIPipeline(FAISS 인덱스 +
+    knowledge.db)을 두므로, 한 연구 분야를 다시 인덱싱해도 다른 샤드의 인덱스는 읽거나 쓰지 않는다.
+    임베딩 모델은 레지스트리로, 질의 임베딩 캐시는 직접 공유한다.
+
+    검색은 질의를 한 번만 임베딩한 뒤 샤드별 후보 검색을 스레드 풀에서 동시에 실행하고(FAISS 검색과
+    numpy 연산은 GIL을 놓으므로 코어를 나눠 쓴다), 벡터 후보는 거리, BM25 후보는 점수 기준으로 전역
+    상위 k개를 고른다. hybrid는 병합된 전역 순위로 RRF를 계산한다. 각 샤드의 후보는 그 샤드의 읽기
+    잠금 안에서 뽑으므로 인덱싱 중인 샤드도 반영이 끝난 세대로만 답한다.
+
+    샤드 이름 -> 디렉터리 매핑은 <db_path>/shards.json에 원자적으로 기록한다. rebuild_shard()는 새
+    디렉터리에 인덱스를 만든 뒤 매핑을 교체하므로 재구성 중에도 기존 샤드로 검색이 계속된다.
+    """
+
+    def __init__(
+        self,
+        onedrive_path: Optional[str] = None,
+        db_path: Optional[str] = None,
+        search_workers: Optional[int] = None,
+        cache_size: int = 1024,
+        cache_ttl: Optional[float] = 3600,
+        search_mode: Optional[str] = None,
+        **pipeline_kwargs,
+    ):
+        """
+        Args:
+            onedrive_path: 인덱싱할 문서 루트 (기본: get_onedrive_path())
+            db_path: 샤드 저장 경로 (기본: sbi_registry.default_db_path). 샤드는 <db_path>/shards/ 아래에 둔다.
+            search_workers: 샤드 검색 스레드 수 (기본: 코어 수)
+            cache_size: 질의 임베딩/검색 결과 캐시의 최대 항목 수 (0이면 캐시 안 함)
+            cache_ttl: 캐시 항목 유효 시간 (초, None이면 무제한)
+            search_mode: 기본 검색 방식 'dense' | 'hybrid' | 'lexical' (기본: SBI_SEARCH_MODE 또는 'dense')
+            pipeline_kwargs: 샤드마다 SBIPipeline에 그대로 전달할 설정 (index_type, compression 등)
+        """
+        self.onedrive_path = onedrive_path or get_onedrive_path()
+        self.db_path = db_path if db_path is not None else default_db_path()
+        self.shard_dir = os.path.join(self.db_path, "shards")
+        self.layout_file = os.path.join(self.db_path, "shards.json")
+        self.search_mode = (
+            search_mode or os.environ.get('SBI_SEARCH_MODE') or DEFAULT_SEARCH_MODE
+        ).lower()
+        if self.search_mode not in SEARCH_MODES:
+            raise ValueError(
+                f"Unknown search_mode '{self.search_mode}'. Choose from {SEARCH_MODES}"
+            )
+        self.pipeline_kwargs = dict(
+            pipeline_kwargs,
+            cache_size=cache_size,
+            cache_ttl=cache_ttl,
+            search_mode=self.search_mode,
+        )
+
+        self._embedding_cache = LRUCache(cache_size, cache_ttl)  # 모든 샤드가 공유
+        self._result_cache = LRUCache(cache_size, cache_ttl)  # (샤드 세대, 질의, n_results) -> 결과
+        self._pool = ThreadPoolExecutor(
+            max_workers=search_workers or os.cpu_count() or 4, thread_name_prefix="sbi-shard"
+        )
+        self._lock = threading.Lock()  # 샤드 목록 교체, 진행 중인 검색 수
+        self._active = 0  # 진행 중인 검색 수 (교체된 샤드는 0일 때 닫음)
+        self._retired: List[Tuple[SBIPipeline, str]] = []
+
+        layout = self._load_layout()
+        self._directories: Dict[str, str] = layout.get('shards', {})
+        self._next_dir = layout.get('next', len(self._directories))
+        self._remove_orphans()
+        names = sorted(self._directories)
+        self.shards: Dict[str, SBIPipeline] = dict(
+            zip(names, self._pool.map(self._open_shard, names))
+        )
+        logger.info(
+            f"SBI sharded pipeline initialized with {len(self.shards)} shards. "
+            f"Monitoring: {self.onedrive_path}"
+        )
+
+    def _load_layout(self) -> Dict:
+        if not os.path.exists(self.layout_file):
+            return {}
+        with open(self.layout_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_layout(self):
+        """샤드 매핑을 임시 파일에 쓰고 fsync 후 교체"""
+        os.makedirs(self.db_path, exist_ok=True)
+        tmp_path = self.layout_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(
+                {'shards': self._directories, 'next': self._next_dir},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        durable_replace(tmp_path, self.layout_file)
+
+    def _remove_orphans(self):
+        """매핑에 없는 샤드 디렉터리 삭제 (매핑을 커밋하기 전에 중단된 생성/재구성의 잔여물)"""
+        if not os.path.isdir(self.shard_dir):
+            return
+        live = set(self._directories.values())
+        for name in os.listdir(self.shard_dir):
+            if name not in live:
+                shutil.rmtree(os.path.join(self.shard_dir, name), ignore_errors=True)
+
+    def _new_directory(self) -> str:
+        name = f"shard-{self._next_dir:04d}"
+        self._next_dir += 1
+        return name
+
+    def _open_shard(self, name: str, directory: Optional[str] = None) -> SBIPipeline:
+        directory = directory or self._directories[name]
+        return SBIPipeline(
+            self.onedrive_path,
+            os.path.join(self.shard_dir, directory),
+            scope=name,
+            embedding_cache=self._embedding_cache,
+            **self.pipeline_kwargs,
+        )
+
+    def shard_of(self, path: str) -> str:
+        """파일이 속한 샤드 이름 (OneDrive 기준 최상위 폴더명, 루트의 파일은 ROOT_SHARD)"""
+        relpath = os.path.relpath(path, self.onedrive_path).replace(os.sep, '/')
+        head, sep, _ = relpath.partition('/')
+        return head if sep and head != '..' else ROOT_SHARD
+
+    def discover_shards(self) -> List[str]:
+        """현재 OneDrive 구조의 샤드 이름 목록 (최상위 폴더, 루트에 문서가 있으면 ROOT_SHARD)"""
+        if not os.path.isdir(self.onedrive_path):
+            return []
+        names = []
+        for entry in sorted(os.scandir(self.onedrive_path), key=lambda e: e.name):
+            if entry.is_dir() and not entry.name.startswith('.'):
+                names.append(entry.name)
+            elif (
+                entry.is_file()
+                and entry.name.lower().endswith(('.pdf', '.txt'))
+                and ROOT_SHARD not in names
+            ):
+                names.append(ROOT_SHARD)
+        return names
+
+    def load_and_index(self, force: bool = False, shards: Optional[List[str]] = None):
+        """샤드별 증분 인덱싱 (새 폴더는 샤드를 만들고, 사라진 폴더의 샤드는 삭제)
+
+        샤드는 하나씩 인덱싱한다 (각 샤드가 파싱 프로세스 풀로 CPU 예산을 이미 사용함).
+        인덱싱 중인 샤드 외의 샤드는 전혀 건드리지 않는다.
+
+        Args:
+            force: True이면 manifest와 무관하게 다시 인덱싱
+            shards: 지정하면 이 샤드들만 인덱싱 (기본: 전체)
+        """
+        current = self.discover_shards()
+        if not current and not os.path.isdir(self.onedrive_path):
+            logger.warning(f"OneDrive path not found: {self.onedrive_path}")
+            return
+
+        for name in [
+            name
+            for name in self.shards
+            if name not in current and (shards is None or name in shards)
+        ]:
+            self._drop_shard(name)
+
+        for name in current:
+            if shards is not None and name not in shards:
+                continue
+            shard = self.shards.get(name)
+            if shard is None:
+                directory = self._new_directory()
+                shard = self._open_shard(name, directory)
+                with self._lock:
+                    self._directories[name] = directory
+                    self.shards = dict(self.shards, **{name: shard})
+                self._save_layout()
+                logger.info(f"Created shard '{name}' in {directory}")
+            shard.load_and_index(force=force)
+
+    def rebuild_shard(self, name: str):
+        """샤드 하나를 새 디렉터리에 처음부터 다시 만든 뒤 교체 (그동안 기존 샤드로 계속 검색)"""
+        directory = self._new_directory()
+        shard = self._open_shard(name, directory)
+        shard.load_and_index()
+
+        with self._lock:
+            old = self.shards.get(name)
+            old_directory = self._directories.get(name)
+            self._directories[name] = directory
+            self.shards = dict(self.shards, **{name: shard})
+        self._save_layout()
+        logger.success(f"Rebuilt shard '{name}' ({len(shard.store)} chunks)")
+        if old is not None:
+            self._retire(old, old_directory)
+
+    def _drop_shard(self, name: str):
+        """폴더가 사라진 샤드 제거"""
+        with self._lock:
+            shards = dict(self.shards)
+            old = shards.pop(name)
+            old_directory = self._directories.pop(name)
+            self.shards = shards
+        self._save_layout()
+        logger.info(f"Removed shard '{name}' (folder no longer exists)")
+        self._retire(old, old_directory)
+
+    def _retire(self, shard: SBIPipeline, directory: str):
+        """교체된 샤드를 진행 중인 검색이 끝난 뒤 닫고 디렉터리 삭제"""
+        with self._lock:
+            self._retired.append((shard, directory))
+        self._release_retired()
+
+    def _release_retired(self):
+        with self._lock:
+            if self._active or not self._retired:
+                return
+            retired, self._retired = self._retired, []
+        for shard, directory in retired:
+            shard.close()
+            shutil.rmtree(os.path.join(self.shard_dir, directory), ignore_errors=True)
+
+    def remove_source(self, path: str) -> int:
+        """파일 하나를 해당 샤드에서 제거 (삭제한 청크 수 반환)"""
+        shard = self.shards.get(self.shard_of(path))
+        return shard.remove_source(path) if shard is not None else 0
+
+    def update_source(self, path: str) -> int:
+        """파일 하나를 해당 샤드에서 다시 인덱싱 (샤드가 없으면 만든 뒤 추가, 추가한 청크 수 반환)"""
+        name = self.shard_of(path)
+        if name not in self.shards:
+            if not os.path.exists(path):
+                return 0
+            self.load_and_index(shards=[name])
+            return self.shards[name].manifest.get(path, {}).get('chunks', 0)
+        return self.shards[name].update_source(path)
+
+    def __len__(self) -> int:
+        return sum(len(shard.store) for shard in self.shards.values())
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 3,
+        mode: Optional[str] = None,
+        filters: Union[None, Dict, SearchFilter] = None,
+    ) -> List[Dict]:
+        """지식 검색 (SBIPipeline.search와 같은 인자/결과)"""
+        return self.search_many([query], n_results, mode, filters)[0]
+
+    def search_many(
+        self,
+        queries: List[str],
+        n_results: int = 3,
+        mode: Optional[str] = None,
+        filters: Union[None, Dict, SearchFilter] = None,
+    ) -> List[List[Dict]]:
+        """여러 질의를 모든 샤드에서 검색하여 전역 상위 n_results개로 병합 (SBIPipeline.search_many와 같은 형태)"""
+        queries = list(queries)
+        filters = SearchFilter.coerce(filters)
+        mode = (mode or self.search_mode).lower()
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}'. Choose from {SEARCH_MODES}")
+
+        with self._lock:
+            self._active += 1
+            shards = [shard for shard in self.shards.values() if len(shard.store)]
+        try:
+            if not queries or not shards:
+                return [[] for _ in queries]
+            if mode != 'lexical' and not (FAISS_AVAILABLE and shards[0].model):
+                if mode == 'dense':
+                    logger.warning("Embedding model not available for search")
+                    return [[] for _ in queries]
+                mode = 'lexical'
+
+            # 샤드 교체/갱신 시 세대가 바뀌므로 이전 결과는 조회되지 않음
+            generation = tuple((id(shard), shard.generation) for shard in shards)
+            results = [
+                self._result_cache.get((generation, mode, filters, query, n_results))
+                for query in queries
+            ]
+            misses = list(dict.fromkeys(q for q, hits in zip(queries, results) if hits is None))
+            if misses:
+                found = dict(
+                    zip(misses, self._search_uncached(shards, misses, n_results, mode, filters))
+                )
+                for query in misses:
+                    self._result_cache.put(
+                        (generation, mode, filters, query, n_results), found[query]
+                    )
+                results = [found[q] if hits is None else hits for q, hits in zip(queries, results)]
+            return [[dict(hit) for hit in hits] for hits in results]
+        finally:
+            with self._lock:
+                self._active -= 1
+            self._release_retired()
+
+    def _search_uncached(
+        self,
+        shards: List[SBIPipeline],
+        queries: List[str],
+        n_results: int,
+        mode: str,
+        filters: Optional[SearchFilter],
+    ) -> List[List[Dict]]:
+        """샤드별 후보를 병렬로 뽑아 전역 순위로 병합"""
+        depth = candidate_depth(n_results, mode)
+        # 질의는 한 번만 임베딩하고, 각 샤드는 자기 읽기 잠금 안에서 반영이 끝난 세대만 검색한다
+        query_vectors = shards[0]._embed_queries(queries) if mode != 'lexical' else None
+
+        def candidates(shard: SBIPipeline):
+            with shard._rw.read():
+                return shard._candidates(queries, depth, mode, filters, query_vectors)
+
+        per_shard = (
+            [candidates(shards[0])]
+            if len(shards) == 1
+            else list(self._pool.map(candidates, shards))
+        )
+        results = []
+        for i in range(len(queries)):
+            dense = heapq.nsmallest(
+                depth, (hit for found in per_shard for hit in found[i][0]), key=lambda h: h[1]
+            )
+            lexical = heapq.nlargest(
+                depth, (hit for found in per_shard for hit in found[i][1]), key=lambda h: h[1]
+            )
+            results.append(merge_hits(dense, lexical, n_results, mode, key=_chunk_key))
+        return results
+
+    def warmup(self, embed: bool = True):
+        """임베딩 모델과 의존성 미리 로드 (모델은 샤드가 공유하므로 한 번만)"""
+        if self.shards:
+            next(iter(self.shards.values())).warmup(embed)
+
+    def cache_stats(self) -> Dict[str, Dict]:
+        return {"embeddings": self._embedding_cache.stats(), "results": self._result_cache.stats()}
+
+    def stats(self) -> Dict[str, Dict]:
+        """샤드별 청크/파일 수와 인덱스 종류"""
+        return {
+            name: {
+                "chunks": len(shard.store),
+                "files": len(shard.manifest),
+                "index": shard.index_kind,
+                "directory": self._directories.get(name),
+            }
+            for name, shard in self.shards.items()
+        }
+
+    def close(self):
+        """검색 스레드 풀과 모든 샤드 정리"""
+        self._pool.shutdown(wait=True)
+        for shard in self.shards.values():
+            shard.close()
+        self._release_retired()
+
+
+if __name__ == "__main__":
+    pipeline = ShardedPipeline()
+    pipeline.load_and_index()
+    for name, info in pipeline.stats().items():
+        print(f"- {name}: {info['files']} files, {info['chunks']} chunks ({info['index']})")
+
+    test_query = "오가노이드"
+    print(f"\nSearch Results for '{test_query}':")
+    for hit in pipeline.search(test_query):
+        print(f"- [{hit['source']}] {hit['content'][:150]}...")
@@ -0,0 +1,696 @@
+# tools/sbi_store.py
+"""
+SBI Knowledge Store
+SBIPipeline의 디스크 저장소 구성 요소 (원본 벡터 세그먼트, 청크 메타데이터)
+"""
+
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import itertools
+import numpy as np
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sbi_filter import ChunkIdMap
+from sbi_lexical import LexicalIndex
+
+
+def durable_replace(tmp_path: str, path: str):
+    """임시 파일을 fsync한 뒤 원자적으로 교체하고 디렉터리 엔트리까지 fsync (전원 차단에도 유지)"""
+    with open(tmp_path, 'rb') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    try:
+        fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY)
+    except OSError:
+        return  # 디렉터리를 열 수 없는 플랫폼 (Windows)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+_SEGMENT_RE = re.compile(r'^seg-(\d{8})\.f32$')
+
+
+class RawVectorStore:
+    """원본(float32) 임베딩 저장소 (append-only 세그먼트)
+
+    FAISS 인덱스가 압축(SQ/PQ)되어 있어도 정확한 거리 재계산(re-ranking)과 인덱스 재구성에
+    쓸 수 있도록 원본 벡터를 별도 파일에 보관한다. 아직 저장되지 않은 벡터는 메모리에 두었다가
+    flush()에서 새 세그먼트 파일(seg-XXXXXXXX.f32) 하나로 써서 fsync하므로, 이미 쓴 파일은
+    다시 쓰지 않는다. 어떤 세그먼트가 유효한지는 호출자가 SQLite 상태로 커밋하며, 교체된
+    세그먼트는 커밋 후 release()에서 지운다. 세그먼트는 np.memmap으로 열어 필요한 행만 읽는다.
+    행 번호(세그먼트 순서대로 이어 붙인 위치)는 ChunkStore의 pos이다.
+    조회용 상태(세그먼트 memmap, 누적 위치, 미저장 벡터)는 튜플 하나로 교체하므로 쓰기 스레드가
+    append/flush/병합하는 동안에도 다른 스레드의 get()은 잠금 없이 일관된 상태를 읽는다.
+    """
+
+    def __init__(self, directory: str, dim: int):
+        self.directory = directory
+        self.dim = dim
+        self._row_bytes = dim * 4
+        self.segments: List[str] = []
+        # (세그먼트 memmap 목록, 누적 시작 위치, 미저장 벡터)
+        self._view = ([], np.zeros(1, dtype='int64'), ())
+        self._pending = []
+        self._pending_rows = 0
+        self._garbage: List[str] = []
+        self._seq = itertools.count()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def open(self, names: Iterable[str]):
+        """커밋된 세그먼트 목록으로 열기"""
+        self.segments = list(names)
+        self._pending = []
+        self._pending_rows = 0
+        self._garbage = []
+        existing = os.listdir(self.directory) if os.path.isdir(self.directory) else []
+        seqs = [int(m.group(1)) for m in map(_SEGMENT_RE.match, existing + self.segments) if m]
+        self._seq = itertools.count(max(seqs, default=-1) + 1)
+        self._remap()
+
+    def _remap(self):
+        maps, offsets = [], [0]
+        for name in self.segments:
+            rows = os.path.getsize(self._path(name)) // self._row_bytes
+            maps.append(
+                np.memmap(self._path(name), dtype='float32', mode='r', shape=(rows, self.dim))
+                if rows
+                else None
+            )
+            offsets.append(offsets[-1] + rows)
+        # 검색 스레드가 중간 상태를 보지 않도록 한 번에 교체
+        self._view = (maps, np.array(offsets, dtype='int64'), tuple(self._pending))
+
+    @property
+    def disk_rows(self) -> int:
+        return int(self._view[1][-1])
+
+    @property
+    def segment_rows(self) -> List[int]:
+        return np.diff(self._view[1]).tolist()
+
+    def __len__(self) -> int:
+        return self.disk_rows + self._pending_rows
+
+    def append(self, vectors: np.ndarray):
+        """벡터 추가 (flush 전까지 메모리에 보관)"""
+        vectors = np.ascontiguousarray(vectors, dtype='float32').reshape(-1, self.dim)
+        if len(vectors):
+            self._pending.append(vectors)
+            self._pending_rows += len(vectors)
+            self._view = self._view[:2] + (tuple(self._pending),)
+
+    def get(self, positions) -> np.ndarray:
+        """지정한 위치의 벡터 조회"""
+        maps, offsets, pending = self._view
+        disk_rows = int(offsets[-1])
+        positions = np.asarray(positions, dtype='int64')
+        out = np.empty((len(positions), self.dim), dtype='float32')
+        on_disk = positions < disk_rows
+        if on_disk.any():
+            rows = positions[on_disk]
+            segments = np.searchsorted(offsets, rows, side='right') - 1
+            found = np.empty((len(rows), self.dim), dtype='float32')
+            for seg in np.unique(segments):
+                mask = segments == seg
+                found[mask] = maps[seg][rows[mask] - offsets[seg]]
+            out[on_disk] = found
+        if (~on_disk).any():
+            out[~on_disk] = np.concatenate(pending)[positions[~on_disk] - disk_rows]
+        return out
+
+    def all(self) -> np.ndarray:
+        """전체 벡터 (재구성/평가용, 전부 메모리로 읽음)"""
+        parts = [np.asarray(m) for m in self._view[0] if m is not None] + list(self._view[2])
+        if not parts:
+            return np.zeros((0, self.dim), dtype='float32')
+        return np.concatenate(parts)
+
+    def _write_segment(self, parts: Iterable[np.ndarray]) -> str:
+        """새 세그먼트 파일 작성 (임시 파일에 쓰고 fsync 후 교체)"""
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"seg-{next(self._seq):08d}.f32"
+        tmp_path = self._path(name) + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            for part in parts:
+                f.write(np.ascontiguousarray(part, dtype='float32').tobytes())
+        durable_replace(tmp_path, self._path(name))
+        return name
+
+    def flush(self) -> Optional[str]:
+        """메모리에 보관 중인 벡터를 새 세그먼트로 기록 (세그먼트 이름 반환, 목록 커밋은 호출자 몫)"""
+        if not self._pending:
+            return None
+        name = self._write_segment(self._pending)
+        self.segments.append(name)
+        self._pending = []
+        self._pending_rows = 0
+        self._remap()
+        return name
+
+    def rewrite(self, vectors: np.ndarray):
+        """전체 내용을 새 세그먼트 하나로 교체 (stage() + swap()). 기존 세그먼트는 release()에서 삭제"""
+        self.swap(self.stage(vectors))
+
+    def stage(self, vectors: np.ndarray) -> List[str]:
+        """벡터를 새 세그먼트 파일로 쓰기만 함 (목록은 바꾸지 않으므로 검색과 동시에 가능, 반영은 swap())"""
+        vectors = np.ascontiguousarray(vectors, dtype='float32').reshape(-1, self.dim)
+        return [self._write_segment([vectors])] if len(vectors) else []
+
+    def swap(self, names: List[str]):
+        """stage()로 쓴 세그먼트로 전체 목록 교체 (미저장 벡터 포함). 기존 세그먼트는 release()에서 삭제"""
+        self._garbage.extend(self.segments)
+        self.segments = list(names)
+        self._pending = []
+        self._pending_rows = 0
+        self._remap()
+
+    def merge(self, names: List[str]) -> str:
+        """연속한 세그먼트들을 합친 새 세그먼트 파일 작성 (목록은 바꾸지 않으므로 백그라운드에서 호출 가능)
+
+        세그먼트 파일은 쓴 뒤 바뀌지 않으므로 잠금 없이 읽는다. 반영은 replace()로 한다.
+        """
+
+        def parts(block_rows: int = 65536):
+            for name in names:
+                rows = os.path.getsize(self._path(name)) // self._row_bytes
+                if not rows:
+                    continue
+                data = np.memmap(
+                    self._path(name), dtype='float32', mode='r', shape=(rows, self.dim)
+                )
+                for i in range(0, rows, block_rows):
+                    yield data[i : i + block_rows]
+
+        return self._write_segment(parts())
+
+    def replace(self, names: List[str], merged: str) -> bool:
+        """merge() 결과를 목록에 반영 (그사이 해당 세그먼트가 교체되었으면 False)"""
+        if not names or names[0] not in self.segments:
+            return False
+        start = self.segments.index(names[0])
+        if self.segments[start : start + len(names)] != names:
+            return False
+        self.segments[start : start + len(names)] = [merged]
+        self._garbage.extend(names)
+        self._remap()
+        return True
+
+    def discard(self, name: str):
+        """목록에 반영하지 못한 세그먼트 파일 삭제"""
+        if os.path.exists(self._path(name)):
+            os.remove(self._path(name))
+
+    def release(self):
+        """커밋 이후 더 이상 참조되지 않는 세그먼트 파일 삭제"""
+        for name in self._garbage:
+            self.discard(name)
+        self._garbage = []
+
+    def remove_orphans(self):
+        """커밋된 목록에 없는 세그먼트 파일 삭제 (커밋 전에 중단된 flush/merge의 잔여물)"""
+        if not os.path.isdir(self.directory):
+            return
+        live = set(self.segments)
+        for name in os.listdir(self.directory):
+            if name not in live and (name.endswith('.tmp') or _SEGMENT_RE.match(name)):
+                os.remove(self._path(name))
+
+    def clear(self):
+        """저장소 비우기 (모든 세그먼트 삭제)"""
+        self._garbage.extend(self.segments)
+        self.segments = []
+        self._pending = []
+        self._pending_rows = 0
+        self._remap()
+        self.release()
+        self.remove_orphans()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contents (
+    hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    refs INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pos INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    source TEXT NOT NULL,
+    page INTEGER,
+    start_offset INTEGER,
+    end_offset INTEGER,
+    content_hash TEXT NOT NULL REFERENCES contents(hash)
+);
+CREATE INDEX IF NOT EXISTS idx_chunks_pos ON chunks(pos);
+CREATE INDEX IF NOT EXISTS idx_chunks_path ON chunks(path);
+CREATE INDEX IF NOT EXISTS idx_chunks_content ON chunks(content_hash);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime_ns INTEGER,
+    sha256 TEXT,
+    chunks INTEGER NOT NULL DEFAULT 0,
+    indexed_at REAL
+);
+CREATE TABLE IF NOT EXISTS tombstones (
+    id INTEGER PRIMARY KEY,
+    pos INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_CHUNK_COLUMNS = (
+    "c.id, c.pos, c.path, c.source, c.page, c.start_offset, c.end_offset, c.content_hash, t.text"
+)
+
+
+def content_hash(text: str) -> str:
+    """청크 본문 해시 (중복 본문을 한 번만 저장하기 위한 키)"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _row_to_chunk(row) -> Dict:
+    return {
+        "id": row[0],
+        "pos": row[1],
+        "path": row[2],
+        "source": row[3],
+        "page": row[4],
+        "start_offset": row[5],
+        "end_offset": row[6],
+        "content_hash": row[7],
+        "content": row[8],
+    }
+
+
+class ChunkStore:
+    """청크 메타데이터 저장소 (SQLite)
+
+    청크마다 id, 원본 벡터 행(pos), 원본 경로, 페이지, 본문 내 오프셋, 본문 해시를 chunks 테이블에
+    기록하고, 본문은 contents 테이블에 해시 기준으로 한 번만 저장한다 (참조 카운트로 정리).
+    id는 삭제/재구성과 무관하게 바뀌지 않는 64비트 정수로 FAISS 인덱스의 id로 쓰인다. pos는
+    RawVectorStore의 행 번호이며 삭제해도 당기지 않고, 삭제된 청크의 (id, pos)는 tombstones에
+    남겨 두었다가 renumber()로 원본 벡터를 정리할 때 지운다.
+    검색 결과에 필요한 청크만 id로 조회하므로 로드 비용이 청크 수와 무관하며, 추가는
+    트랜잭션 안에서 INSERT만 하고 flush()에서 커밋하므로 저장 비용이 새 청크 수에 비례한다.
+    파일 manifest(files)와 인덱스 설정(state)도 같은 DB에 보관하며, 본문 BM25 역색인(lexical)도
+    같은 트랜잭션에서 함께 갱신한다. 청크 id -> 파일/원본 벡터 행 매핑(id_map)은 처음 요청할 때
+    만들고 이후 추가분은 메모리에서 이어 붙인다.
+    list처럼 len(), [pos], append(), extend()를 지원한다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self.lexical: Optional[LexicalIndex] = None
+        self._id_map: Optional[ChunkIdMap] = None
+        self._tombstone_ids: Optional[np.ndarray] = None
+        self._count = 0
+        self._next_pos = 0  # 다음 청크에 부여할 원본 벡터 행
+        self._tombstones = 0
+        self._saved_manifest: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            # 역색인 postings 삭제/추가는 B-tree 곳곳을 건드리므로 페이지 캐시를 넉넉히 (64MB)
+            self._conn.execute("PRAGMA cache_size=-65536")
+            self._conn.executescript(_SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(files)")}
+            if 'indexed_at' not in columns:  # 이전 버전 DB
+                self._conn.execute("ALTER TABLE files ADD COLUMN indexed_at REAL")
+                self._conn.commit()
+            self.lexical = LexicalIndex(self._conn)
+            self._load_counts()
+        return self._conn
+
+    def _load_counts(self):
+        conn = self._conn
+        self._count = conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        self._tombstones = conn.execute("SELECT COUNT(*) FROM tombstones").fetchone()[0]
+        self._next_pos = conn.execute(
+            "SELECT MAX(COALESCE((SELECT MAX(pos) FROM chunks), -1), "
+            "COALESCE((SELECT MAX(pos) FROM tombstones), -1)) + 1"
+        ).fetchone()[0]
+        self.lexical.load_stats()
+        self._id_map = None
+        self._tombstone_ids = None
+
+    @contextmanager
+    def read_snapshot(self):
+        """커밋된 상태를 한 읽기 트랜잭션 안에서 조회
+
+        안에서 청크 수/tombstone 수/next_pos/역색인 통계를 다시 읽으므로, 그사이 다른 프로세스가 커밋해도
+        storage 상태, manifest, 청크 행이 모두 같은 커밋 기준으로 맞는다.
+        """
+        conn = self._connect()
+        own = not conn.in_transaction
+        if own:
+            conn.execute("BEGIN")
+        try:
+            self._load_counts()
+            yield self
+        finally:
+            if own:
+                conn.commit()  # 읽기만 한 트랜잭션 종료
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def next_pos(self) -> int:
+        """원본 벡터 저장소의 행 수와 같아야 하는 다음 pos (삭제된 행 포함)"""
+        return self._next_pos
+
+    @property
+    def tombstones(self) -> int:
+        """삭제되었지만 원본 벡터/인덱스에서 아직 정리되지 않은 청크 수"""
+        return self._tombstones
+
+    def __getitem__(self, pos: int) -> Dict:
+        if pos < 0:
+            pos += self._next_pos
+        row = None
+        if self._conn is not None:
+            row = self._conn.execute(
+                f"SELECT {_CHUNK_COLUMNS} FROM chunks c JOIN contents t ON t.hash = c.content_hash "
+                f"WHERE c.pos = ?",
+                (int(pos),),
+            ).fetchone()
+        if row is None:
+            raise IndexError(pos)
+        return _row_to_chunk(row)
+
+    def __iter__(self) -> Iterator[Dict]:
+        if self._conn is None:
+            return
+        rows = self._conn.execute(
+            f"SELECT {_CHUNK_COLUMNS} FROM chunks c JOIN contents t ON t.hash = c.content_hash "
+            f"ORDER BY c.pos"
+        )
+        for row in rows:
+            yield _row_to_chunk(row)
+
+    def get_by_ids(self, ids: Iterable[int]) -> List[Dict]:
+        """청크 id 목록으로 청크 조회 (요청한 순서 유지, 없는 id는 생략)"""
+        ids = [int(i) for i in ids]
+        if not ids or self._conn is None:
+            return []
+        placeholders = ','.join('?' * len(ids))
+        rows = self._conn.execute(
+            f"SELECT {_CHUNK_COLUMNS} FROM chunks c JOIN contents t ON t.hash = c.content_hash "
+            f"WHERE c.id IN ({placeholders})",
+            ids,
+        ).fetchall()
+        by_id = {row[0]: _row_to_chunk(row) for row in rows}
+        return [by_id[i] for i in ids if i in by_id]
+
+    def lexical_search(
+        self, query: str, k: int = 10, paths: Optional[Iterable[str]] = None
+    ) -> List[Tuple[Dict, float]]:
+        """BM25 검색 (임베딩 없이 본문 토큰으로 조회, (청크, 점수) 목록)
+
+        Args:
+            paths: 지정하면 이 파일들의 청크만 점수를 매김 (필터 검색)
+        """
+        if self.lexical is None:
+            return []
+        restrict = None
+        if paths is not None:
+            restrict = (
+                "SELECT id FROM chunks WHERE path IN (SELECT value FROM json_each(?))",
+                [json.dumps(list(paths))],
+            )
+        scored = self.lexical.search(query, k, restrict)
+        chunks = {
+            chunk['id']: chunk for chunk in self.get_by_ids(chunk_id for chunk_id, _ in scored)
+        }
+        return [(chunks[chunk_id], score) for chunk_id, score in scored if chunk_id in chunks]
+
+    def ensure_lexical(self) -> int:
+        """역색인이 없는 이전 버전 DB의 청크를 색인 (색인한 청크 수 반환, flush()에서 커밋)"""
+        if self.lexical is None or len(self.lexical) or not self._count:
+            return 0
+        rows = self._conn.execute(
+            "SELECT c.id, t.text FROM chunks c JOIN contents t ON t.hash = c.content_hash"
+        ).fetchall()
+        for chunk_id, text in rows:
+            self.lexical.add(chunk_id, text)
+        return len(rows)
+
+    def append(self, item: Dict):
+        self.extend([item])
+
+    def extend(self, items: Iterable[Dict]) -> List[int]:
+        """청크 추가 (pos는 next_pos부터 순서대로 부여, flush()에서 커밋). 부여된 청크 id 반환"""
+        conn = self._connect()
+        ids = []
+        for item in items:
+            text = item['content']
+            digest = content_hash(text)
+            conn.execute(
+                "INSERT INTO contents (hash, text, refs) VALUES (?, ?, 1) "
+                "ON CONFLICT(hash) DO UPDATE SET refs = refs + 1",
+                (digest, text),
+            )
+            start = item.get('start_offset')
+            cursor = conn.execute(
+                "INSERT INTO chunks "
+                "(pos, path, source, page, start_offset, end_offset, content_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self._next_pos,
+                    item.get('path', ''),
+                    item['source'],
+                    item.get('page'),
+                    start,
+                    None if start is None else start + len(text),
+                    digest,
+                ),
+            )
+            chunk_id = cursor.lastrowid
+            self.lexical.add(chunk_id, text)
+            if self._id_map is not None:
+                self._id_map.add(chunk_id, item.get('path', ''), self._next_pos)
+            ids.append(chunk_id)
+            self._next_pos += 1
+            self._count += 1
+        return ids
+
+    def id_map(self) -> ChunkIdMap:
+        """청크 id -> 파일/원본 벡터 행 매핑 (필터 검색, 재정렬용)"""
+        if self._id_map is None:
+            id_map = ChunkIdMap()
+            if self._conn is not None:
+                for chunk_id, pos, path in self._conn.execute(
+                    "SELECT id, pos, path FROM chunks ORDER BY id"
+                ):
+                    id_map.add(chunk_id, path, pos)
+            self._id_map = id_map
+        return self._id_map
+
+    def live_rows(self, start_pos: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """start_pos 이후 살아 있는 청크의 (id 배열, pos 배열), pos 순서"""
+        rows = []
+        if self._conn is not None:
+            rows = self._conn.execute(
+                "SELECT id, pos FROM chunks WHERE pos >= ? ORDER BY pos", (start_pos,)
+            ).fetchall()
+        table = np.array(rows, dtype='int64').reshape(-1, 2)
+        return table[:, 0].copy(), table[:, 1].copy()
+
+    def tombstone_ids(self) -> np.ndarray:
+        """삭제 표시된 청크 id (오름차순, 바뀔 때까지 메모리에 유지)"""
+        if self._tombstone_ids is None:
+            rows = (
+                []
+                if self._conn is None
+                else self._conn.execute("SELECT id FROM tombstones ORDER BY id")
+            )
+            self._tombstone_ids = np.array([row[0] for row in rows], dtype='int64')
+        return self._tombstone_ids
+
+    def renumber(self, ids: np.ndarray, positions: np.ndarray) -> ChunkIdMap:
+        """원본 벡터를 살아 있는 행만으로 다시 쓴 뒤 pos를 0부터 다시 매기고 tombstone 삭제
+
+        ids, positions는 live_rows()의 결과다. 행이 바뀐 청크만 갱신한다 (flush()에서 커밋).
+        메모리의 id 매핑/tombstone 목록/next_pos는 그대로 두므로 그동안 검색은 이전 행 번호를 계속
+        쓴다. 반환한 새 id 매핑을 원본 벡터 교체와 함께 adopt_renumbered()로 반영한다.
+        """
+        conn = self._connect()
+        moved = np.flatnonzero(positions != np.arange(len(positions)))
+        conn.executemany(
+            "UPDATE chunks SET pos = ? WHERE id = ?",
+            [(int(new_pos), int(ids[new_pos])) for new_pos in moved],
+        )
+        conn.execute("DELETE FROM tombstones")
+        id_map = ChunkIdMap()
+        for chunk_id, pos, path in conn.execute("SELECT id, pos, path FROM chunks ORDER BY id"):
+            id_map.add(chunk_id, path, pos)
+        return id_map
+
+    def adopt_renumbered(self, id_map: ChunkIdMap):
+        """renumber() 결과를 메모리 상태에 반영 (원본 벡터 교체와 같은 배타 잠금 안에서 호출)"""
+        self._id_map = id_map
+        self._tombstone_ids = np.zeros(0, dtype='int64')
+        self._next_pos = len(id_map)
+        self._tombstones = 0
+
+    def remove_paths(self, paths: Iterable[str]) -> List[int]:
+        """지정한 파일들의 청크 삭제 (삭제된 청크 id 반환, flush()에서 커밋)
+
+        다른 청크의 id/pos는 바꾸지 않는다. 삭제된 청크의 (id, pos)는 tombstones에 기록하여
+        FAISS 인덱스와 원본 벡터에서 정리될 때까지 검색에서 제외하게 한다.
+        """
+        paths = list(paths)
+        if not paths or self._conn is None:
+            return []
+        conn = self._conn
+        placeholders = ','.join('?' * len(paths))
+        ids = [
+            row[0]
+            for row in conn.execute(
+                f"SELECT id FROM chunks WHERE path IN ({placeholders})", paths
+            ).fetchall()
+        ]
+        if not ids:
+            return []
+
+        self.lexical.remove(ids)
+        conn.execute(
+            f"INSERT OR REPLACE INTO tombstones (id, pos) "
+            f"SELECT id, pos FROM chunks WHERE path IN ({placeholders})",
+            paths,
+        )
+        # 본문별 참조 감소량을 한 번에 구해 반영 (삭제한 청크 수에 비례)
+        decrements = conn.execute(
+            f"SELECT COUNT(*), content_hash FROM chunks WHERE path IN ({placeholders}) "
+            f"GROUP BY content_hash",
+            paths,
+        ).fetchall()
+        conn.executemany("UPDATE contents SET refs = refs - ? WHERE hash = ?", decrements)
+        conn.executemany(
+            "DELETE FROM contents WHERE hash = ? AND refs <= 0",
+            [(digest,) for _, digest in decrements],
+        )
+        conn.execute(f"DELETE FROM chunks WHERE path IN ({placeholders})", paths)
+        self._count -= len(ids)
+        self._tombstones += len(ids)
+        if self._id_map is not None:
+            self._id_map.discard(ids)
+        self._tombstone_ids = None
+        return ids
+
+    def load_manifest(self) -> Dict[str, Dict]:
+        """파일 manifest 로드 (path -> {size, mtime_ns, sha256, chunks})"""
+        if self._conn is None:
+            return {}
+        rows = self._conn.execute(
+            "SELECT path, size, mtime_ns, sha256, chunks, indexed_at FROM files"
+        ).fetchall()
+        manifest = {
+            row[0]: {
+                "size": row[1],
+                "mtime_ns": row[2],
+                "sha256": row[3],
+                "chunks": row[4],
+                "indexed_at": row[5],
+            }
+            for row in rows
+        }
+        self._saved_manifest = {path: dict(entry) for path, entry in manifest.items()}
+        return manifest
+
+    def save_manifest(self, manifest: Dict[str, Dict]):
+        """마지막 저장 이후 바뀐 manifest 항목만 기록 (flush()에서 커밋)"""
+        conn = self._connect()
+        removed = [(path,) for path in self._saved_manifest if path not in manifest]
+        changed = [
+            (path, e['size'], e['mtime_ns'], e['sha256'], e['chunks'], e.get('indexed_at'))
+            for path, e in manifest.items()
+            if self._saved_manifest.get(path) != e
+        ]
+        conn.executemany("DELETE FROM files WHERE path = ?", removed)
+        conn.executemany(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256, chunks, indexed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            changed,
+        )
+        self._saved_manifest = {path: dict(entry) for path, entry in manifest.items()}
+
+    def get_state(self, key: str, default=None):
+        if self._conn is None:
+            return default
+        row = self._conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_state(self, key: str, value):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, json.dumps(value))
+        )
+
+    @property
+    def in_transaction(self) -> bool:
+        """커밋되지 않은 변경 사항이 있는지 여부"""
+        return self._conn is not None and self._conn.in_transaction
+
+    def flush(self):
+        """대기 중인 변경 사항 커밋"""
+        if self._conn is not None:
+            self._conn.commit()
+
+    def rewrite(self, items: Iterable[Dict]):
+        """청크 전체 교체 (마이그레이션 시)"""
+        conn = self._connect()
+        conn.execute("DELETE FROM chunks")
+        conn.execute("DELETE FROM contents")
+        conn.execute("DELETE FROM tombstones")
+        self.lexical.clear()
+        self._id_map = None
+        self._tombstone_ids = None
+        self._count = 0
+        self._next_pos = 0
+        self._tombstones = 0
+        self.extend(items)
+        self.flush()
+
+    def clear(self):
+        """청크/manifest/설정 전체 삭제"""
+        if self._conn is None:
+            return
+        for table in ('chunks', 'contents', 'tombstones', 'files', 'state'):
+            self._conn.execute(f"DELETE FROM {table}")
+        self.lexical.clear()
+        self._conn.commit()
+        self._id_map = None
+        self._tombstone_ids = None
+        self._count = 0
+        self._next_pos = 0
+        self._tombstones = 0
+        self._saved_manifest = {}
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            self.lexical = None
+
@@ -0,0 +1,74 @@
+# tools/sbi_sync.py
+"""
+SBI Sync
+검색(reader)과 인덱스 반영(writer)을 분리하는 읽기/쓰기 잠금
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+
+class RWLock:
+    """읽기/쓰기 잠금
+
+    reader는 여러 스레드가 동시에 잡을 수 있고, writer는 reader와 다른 writer가 모두 빠진 뒤 단독으로
+    잡는다. writer가 기다리는 동안 새 reader는 진입하지 않으므로 검색이 계속 들어와도 반영이 밀리지
+    않는다. 같은 스레드에서 read() 안의 read(), write() 안의 write()/read()는 다시 잡을 수 있지만,
+    read() 안에서 write()를 잡으면 교착되므로 금지한다.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._owner: Optional[int] = None  # writer 스레드
+        self._depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()  # 스레드별 read() 중첩 깊이
+
+    @contextmanager
+    def read(self):
+        depth = getattr(self._local, 'depth', 0)
+        if depth or self._owner == threading.get_ident():
+            # 이미 읽기(또는 쓰기) 잠금을 잡은 스레드: 대기 중인 writer 뒤에 서면 교착되므로 그대로 진행
+            self._local.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._local.depth = depth
+            return
+        with self._cond:
+            while self._owner is not None or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        self._local.depth = 1
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner != me:
+                self._waiting_writers += 1
+                try:
+                    while self._owner is not None or self._readers:
+                        self._cond.wait()
+                finally:
+                    self._waiting_writers -= 1
+                self._owner = me
+            self._depth += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._depth -= 1
+                if not self._depth:
+                    self._owner = None
+                    self._cond.notify_all()
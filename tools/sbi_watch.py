@@ -0,0 +1,247 @@
+# tools/sbi_watch.py
+"""
+SBI Watch
+OneDrive 폴더를 감시하여 변경이 잠잠해지면 백그라운드에서 증분 인덱싱 (그동안 검색은 직전 세대로 계속 응답)
+"""
+
+import os
+import sys
+import time
+import threading
+from typing import Dict, List, Optional, Set, Tuple, Union
+from loguru import logger
+
+from sbi_pipeline import SBIPipeline, _installed
+from sbi_shards import ShardedPipeline
+
+# 선택적 의존성: 있으면 파일 시스템 이벤트(inotify 등)로 폴링을 앞당김
+WATCHDOG_AVAILABLE = _installed('watchdog')
+
+_DOCUMENT_SUFFIXES = ('.pdf', '.txt')  # SBIPipeline._scan_files와 같은 대상
+
+Signature = Dict[str, Tuple[int, int]]  # path -> (size, mtime_ns)
+
+
+def scan_documents(root: str) -> Signature:
+    """root 아래 인덱싱 대상 문서의 {경로: (크기, mtime_ns)} (숨김 폴더/파일 제외)"""
+    found = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+        for name in filenames:
+            if name.startswith('.') or not name.endswith(_DOCUMENT_SUFFIXES):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # 스캔 중 삭제됨
+            found[path] = (st.st_size, st.st_mtime_ns)
+    return found
+
+
+def changed_paths(old: Signature, new: Signature) -> Set[str]:
+    """두 스캔 결과 사이에 추가/변경/삭제된 경로"""
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+class IndexWatcher:
+    """OneDrive 폴더 감시 인덱서
+
+    interval초마다 문서 파일의 (크기, mtime)을 훑어 바뀐 파일이 있으면, 변경이 debounce초 동안 잠잠해질
+    때까지(계속 바뀌더라도 처음 변경 후 max_delay초가 지나면) 기다렸다가 백그라운드 스레드에서 증분
+    인덱싱한다. 동기화 클라이언트가 파일을 나눠 쓰는 동안 반쯤 쓰인 파일을 인덱싱하지 않고, 여러 파일이
+    한꺼번에 바뀌어도 인덱싱은 한 번만 한다.
+
+    인덱싱은 파이프라인의 load_and_index()를 그대로 쓰므로 manifest 비교, 체크포인트, 원자적 커밋이
+    같다. 임베딩은 검색을 막지 않고 하고, 반영은 save_every개 파일 단위로 짧은 배타 구간 안에서 하므로
+    검색은 항상 반영이 끝난 세대만 본다. ShardedPipeline이면 바뀐 파일이 속한 샤드만 인덱싱한다.
+    """
+
+    def __init__(
+        self,
+        pipeline: Union[SBIPipeline, ShardedPipeline],
+        interval: float = 30.0,
+        debounce: float = 10.0,
+        max_delay: float = 300.0,
+        use_watchdog: bool = True,
+    ):
+        """
+        Args:
+            pipeline: 인덱싱할 SBIPipeline 또는 ShardedPipeline (검색에도 같은 인스턴스를 사용)
+            interval: 변경이 없을 때의 스캔 간격 (초)
+            debounce: 마지막 변경 후 이 시간 동안 더 바뀌지 않으면 인덱싱 (초)
+            max_delay: 변경이 계속되더라도 처음 변경 후 이 시간이 지나면 인덱싱 (초)
+            use_watchdog: watchdog이 설치되어 있으면 파일 시스템 이벤트로 다음 스캔을 앞당김
+                (변경 판단은 항상 스캔 결과로 하므로 이벤트가 누락되어도 interval 안에 반영된다)
+        """
+        self.pipeline = pipeline
+        self.root = pipeline.onedrive_path
+        self.interval = interval
+        self.debounce = debounce
+        self.max_delay = max(max_delay, debounce)
+        self.use_watchdog = use_watchdog and WATCHDOG_AVAILABLE
+
+        self._indexed: Optional[Signature] = None  # 마지막 인덱싱 직전 스캔 결과
+        self._seen: Optional[Signature] = None  # 마지막 스캔 결과
+        self._first_change: Optional[float] = None  # 반영 대기 중인 첫 변경 시각 (monotonic)
+        self._last_change: Optional[float] = None
+        self._poll_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+
+        self.runs = 0
+        self.last_run: Optional[float] = None  # 마지막 인덱싱 완료 시각 (epoch 초)
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def pending(self) -> bool:
+        """인덱싱을 기다리는 변경이 있는지 여부"""
+        return self._first_change is not None
+
+    def start(self) -> 'IndexWatcher':
+        """감시 스레드 시작 (시작하자마자 한 번 전체 증분 인덱싱으로 밀린 변경을 따라잡음)"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        if self.use_watchdog:
+            self._start_observer()
+        self._thread = threading.Thread(target=self._run, name="sbi-watch", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Watching {self.root} (interval {self.interval}s, debounce {self.debounce}s"
+            f"{', watchdog events' if self._observer else ''})"
+        )
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """감시 중지 (진행 중인 인덱싱은 끝까지 기다림, 체크포인트 단위로 저장되어 있음)"""
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout)
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _start_observer(self):
+        if not os.path.isdir(self.root):
+            return
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        watcher = self
+
+        class _Wake(FileSystemEventHandler):
+            def on_any_event(self, event):
+                # 대기 중인 변경이 있으면 debounce 주기로 이미 스캔하고 있으므로 깨우지 않음
+                if not watcher.pending:
+                    watcher._wake.set()
+
+        try:
+            observer = Observer()
+            observer.schedule(_Wake(), self.root, recursive=True)
+            observer.start()
+            self._observer = observer
+        except Exception as e:  # inotify 감시 개수 제한 등
+            logger.warning(f"File system events unavailable, polling only: {e}")
+
+    def _run(self):
+        force = True
+        while not self._stop.is_set():
+            try:
+                self.poll(force=force)
+                force = False
+            except Exception as e:
+                logger.exception(f"Watch poll failed: {e}")
+            self._wake.wait(self.debounce if self.pending else self.interval)
+            self._wake.clear()
+
+    def poll(self, force: bool = False) -> bool:
+        """한 번 스캔하고 변경이 잠잠해졌으면 인덱싱 (인덱싱했으면 True)
+
+        Args:
+            force: True이면 debounce를 기다리지 않고 바로 인덱싱 (변경이 없어도 전체 증분 인덱싱)
+        """
+        with self._poll_lock:
+            now = time.monotonic()
+            current = scan_documents(self.root)
+            if current != self._seen:
+                self._seen = current
+                self._last_change = now
+                if self._first_change is None:
+                    self._first_change = now
+
+            if not force:
+                if current == self._indexed:
+                    self._first_change = self._last_change = None  # 원래 상태로 돌아옴
+                    return False
+                if (
+                    now - self._last_change < self.debounce
+                    and now - self._first_change < self.max_delay
+                ):
+                    return False
+            return self._index(current)
+
+    def _affected_shards(self, current: Signature) -> Optional[List[str]]:
+        """다시 인덱싱할 샤드 (SBIPipeline이거나 첫 인덱싱이면 None: 전체)"""
+        if not isinstance(self.pipeline, ShardedPipeline) or self._indexed is None:
+            return None
+        return sorted(
+            {self.pipeline.shard_of(path) for path in changed_paths(self._indexed, current)}
+        )
+
+    def _index(self, current: Signature) -> bool:
+        shards = self._affected_shards(current)
+        started = time.perf_counter()
+        try:
+            if shards is None:
+                self.pipeline.load_and_index()
+            elif shards:
+                logger.info(f"Changes detected in shards: {', '.join(shards)}")
+                self.pipeline.load_and_index(shards=shards)
+        except Exception as e:
+            self.last_error = str(e)
+            logger.exception(f"Background indexing failed: {e}")
+            # debounce 뒤에 다시 시도
+            self._first_change = self._last_change = time.monotonic()
+            return False
+
+        # 인덱싱 중에 바뀐 파일은 다음 스캔에서 current와 달라지므로 다시 반영된다
+        self._indexed = current
+        self._first_change = self._last_change = None
+        self.runs += 1
+        self.last_run = time.time()
+        self.last_duration = time.perf_counter() - started
+        self.last_error = None
+        return True
+
+    def stats(self) -> Dict:
+        """감시 상태 (인덱싱 횟수, 마지막 인덱싱 시각/소요 시간, 대기 중인 변경 여부)"""
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "runs": self.runs,
+            "last_run": self.last_run,
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+            "pending": self.pending,
+            "watchdog": self._observer is not None,
+        }
+
+
+if __name__ == "__main__":
+    # python sbi_watch.py [--sharded]: 포그라운드에서 감시 (Ctrl+C로 종료)
+    pipeline = ShardedPipeline() if '--sharded' in sys.argv else SBIPipeline()
+    watcher = IndexWatcher(pipeline).start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+        pipeline.close()
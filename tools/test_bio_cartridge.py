@@ -0,0 +1,69 @@
+# tools/test_bio_cartridge.py
+"""bio_cartridge 지연 생성 테스트 (임포트만으로는 지식 폴더 생성/인덱스 확인을 하지 않음)"""
+
+import os
+import subprocess
+import sys
+from contextlib import closing
+
+import pytest
+
+from sbi_pipeline import SBIPipeline
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import bio_cartridge  # noqa: E402
+
+
+def test_import_has_no_side_effects(tmp_path):
+    """다른 작업 폴더에서 임포트해도 파일을 만들거나 SBI 모듈을 불러오지 않음 (별도 프로세스)"""
+    script = (
+        "import sys\n"
+        f"sys.path.insert(0, {PROJECT_ROOT!r})\n"
+        "import bio_cartridge\n"
+        "print(bio_cartridge.bio_cartridge.initialized, 'sbi_registry' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=str(tmp_path),
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["False", "False"]
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.fixture
+def cartridge(tmp_path, monkeypatch):
+    """지식 폴더를 tmp_path로 돌린 지연 카트리지"""
+    knowledge = tmp_path / "knowledge"
+    monkeypatch.setattr(bio_cartridge, 'resolve_knowledge_dir', lambda: knowledge)
+    lazy = bio_cartridge._LazyCartridge(bio_cartridge.BioCartridge)
+    yield lazy
+    if lazy.initialized:
+        lazy.memory.release()
+
+
+def test_cartridge_is_built_on_first_use(cartridge, tmp_path):
+    assert not cartridge.initialized
+    assert not (tmp_path / "knowledge").exists()
+
+    assert cartridge.activate()["status"] == "activated"
+    assert cartridge.initialized and cartridge.active
+    assert cartridge.memory.knowledge_dir == tmp_path / "knowledge"
+
+    cartridge.mode = "focused"  # 속성 설정도 실제 카트리지로 전달
+    assert cartridge._get().mode == "focused"
+
+
+def test_search_papers_uses_shared_index(cartridge, tmp_path, docs):
+    with closing(SBIPipeline(str(docs), str(tmp_path / "knowledge"), max_workers=1)) as pipeline:
+        pipeline.load_and_index()
+        query = next(chunk['content'] for chunk in pipeline.store if chunk['source'] == 'doc05.txt')
+
+    hits = cartridge.memory.search_papers(query, limit=3)
+    assert hits[0]['source'] == 'doc05.txt' and len(hits) == 3
+    assert cartridge.memory.indexed_chunks == 50
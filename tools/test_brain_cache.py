@@ -0,0 +1,56 @@
+# tools/test_brain_cache.py
+"""BrainCache 키 정규화, TTL 만료, 항목 수 제한 테스트"""
+
+import pytest
+
+import brain_cache
+from brain_cache import BrainCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(brain_cache.time, 'time', clock)
+    return clock
+
+
+def test_key_ignores_whitespace_but_not_task_or_brain():
+    key = BrainCache.make_key("KRT7  in\norganoids ", "analysis", "SHawnBrain")
+    assert key == BrainCache.make_key("KRT7 in organoids", "analysis", "SHawnBrain")
+    assert key != BrainCache.make_key("KRT7 in organoids", "debate", "SHawnBrain")
+    assert key != BrainCache.make_key("KRT7 in organoids", "analysis", "SHawnBrainV4")
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = BrainCache(str(tmp_path / "cache" / "brain_cache.db"), ttl=60)
+    cache.put("k", "answer")
+    clock.now += 59
+    assert cache.get("k") == "answer"  # 조회해도 생성 시각 기준 만료는 늦춰지지 않음
+    clock.now += 2
+    assert cache.get("k") is None
+    assert cache.stats()["entries"] == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = BrainCache(str(tmp_path / "brain_cache.db"), ttl=None, max_entries=2)
+    cache.put("a", "1")
+    clock.now += 1
+    cache.put("b", "2")
+    clock.now += 1
+    assert cache.get("a") == "1"
+    clock.now += 1
+    cache.put("c", "3")
+
+    assert [cache.get(key) for key in ("a", "b", "c")] == ["1", None, "3"]
+    assert cache.stats()["entries"] == 2
+    cache.close()
@@ -0,0 +1,43 @@
+# tools/test_context_packer.py
+"""pack_context 중복 제거, 소스별 상한, 토큰 예산 테스트"""
+
+from context_packer import pack_context, truncate_to_tokens
+from sbi_lexical import estimate_tokens
+
+
+def _words(prefix: str, count: int) -> str:
+    return " ".join(f"{prefix}{i}" for i in range(count))
+
+
+def test_ranks_across_sources_and_drops_near_duplicates():
+    items = [
+        {"origin": "OneDrive", "source": "a.pdf", "content": _words("alpha", 50), "rank": 0},
+        {"origin": "OneDrive", "source": "b.pdf", "content": _words("beta", 50), "rank": 1},
+        {"origin": "Local", "source": "note.md", "content": _words("gamma", 50), "rank": 0},
+        # 같은 문서가 다른 경로로 검색됨 (본문 거의 동일)
+        {"origin": "Local", "source": "copy.md", "content": _words("alpha", 49), "rank": 1},
+    ]
+    packed = pack_context(items, token_budget=10_000)
+    assert [item["source"] for item in packed] == ["a.pdf", "note.md", "b.pdf"]
+    assert packed[0]["origin"] == "OneDrive" and packed[0]["score"] == 1 / 61
+    assert packed[0]["tokens"] == estimate_tokens(packed[0]["content"])
+
+
+def test_per_source_cap_and_token_budget():
+    items = [
+        {"source": "a.pdf", "content": _words(f"a{rank}x", 200), "rank": rank} for rank in range(3)
+    ] + [{"source": "b.pdf", "content": _words("b", 200), "rank": 0}]
+    packed = pack_context(items, token_budget=10_000, per_source_cap=2)
+    assert [item["source"] for item in packed] == ["a.pdf", "b.pdf", "a.pdf"]
+
+    packed = pack_context(items, token_budget=500, max_item_tokens=300)
+    assert sum(item["tokens"] for item in packed) <= 500
+    assert max(item["tokens"] for item in packed) <= 300
+    assert packed[-1]["content"] != items[1]["content"]  # 마지막 항목은 남은 예산에 맞춰 잘림
+
+
+def test_truncate_to_tokens():
+    text = _words("token", 500)
+    assert truncate_to_tokens(text, 10_000) == text
+    cut = truncate_to_tokens(text, 100)
+    assert text.startswith(cut) and estimate_tokens(cut) <= 100
@@ -0,0 +1,51 @@
+# tools/test_lazy_loading.py
+"""무거운 의존성(faiss, LangChain, sentence-transformers)과 임베딩 모델의 지연 로드 테스트"""
+
+import os
+import subprocess
+import sys
+from contextlib import closing
+
+from sbi_pipeline import SBIPipeline
+
+HEAVY_MODULES = (
+    'faiss',
+    'langchain_community',
+    'langchain_text_splitters',
+    'sentence_transformers',
+)
+
+
+def test_import_does_not_load_heavy_dependencies(tmp_path):
+    """모듈 임포트와 ResearchEngine 생성만으로는 무거운 의존성을 임포트하지 않음 (별도 프로세스)"""
+    script = (
+        "import sys, research_engine, sbi_pipeline\n"
+        "engine = research_engine.ResearchEngine(knowledge_dir=sys.argv[1], response_cache=False)\n"
+        f"print('loaded:' + ','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n"
+        "engine.close()\n"
+    )
+    workdir = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, "-c", script, str(tmp_path / "knowledge")],
+        cwd=workdir,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "loaded:"
+
+
+def test_model_is_loaded_on_first_use_or_warmup(tmp_path, docs):
+    db = str(tmp_path / "db")
+    with closing(SBIPipeline(str(docs), db, max_workers=1)) as pipeline:
+        assert pipeline._model is None
+        pipeline.load_and_index()  # 인덱싱이 처음 임베딩할 때 로드
+        assert pipeline._model is not None
+
+    with closing(SBIPipeline(str(docs), db, max_workers=1)) as reopened:
+        assert reopened.search('doc0w1', mode='lexical')[0]['source'] == 'doc00.txt'
+        assert reopened._model is None and reopened._text_splitter is None
+
+        reopened.warmup()
+        assert reopened._model is not None
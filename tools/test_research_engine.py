@@ -0,0 +1,294 @@
+# tools/test_research_engine.py
+"""ResearchEngine 요청 병합(coalescing), 일괄 분석, 검색 시간 제한, 응답 캐시, 스트리밍 테스트
+
+pytest-asyncio 없이 asyncio.run으로 실행한다. Brain/Pipeline은 가짜 객체로 바꾸고, 엔진의 프로젝트
+루트를 tmp_path로 돌려 저장소에 파일을 만들지 않는다.
+"""
+
+import asyncio
+import contextlib
+import os
+import time
+
+import pytest
+
+import research_engine
+from research_engine import ResearchEngine
+
+
+class FakeBrain:
+    """호출 횟수를 세는 Brain (think()는 delay초 뒤 응답)"""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.prompts = []
+
+    async def think(self, prompt, task_type=None):
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.delay)
+        return f"analysis #{len(self.prompts)}", None
+
+
+class FakePipeline:
+    """warmup과 검색에 지정한 시간이 걸리는 Pipeline"""
+
+    def __init__(self, warmup_delay: float = 0.0, search_delay: float = 0.0):
+        self.warmup_delay = warmup_delay
+        self.search_delay = search_delay
+        self.warmups = 0
+
+    def warmup(self):
+        time.sleep(self.warmup_delay)
+        self.warmups += 1
+
+    def search_many(self, queries, n_results=3):
+        time.sleep(self.search_delay)
+        return [
+            [{"source": f"{query}.pdf", "content": f"evidence about {query}"}] for query in queries
+        ]
+
+
+@pytest.fixture
+def make_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(research_engine, 'root_dir', str(tmp_path))
+    engines = []
+
+    def make(pipeline=None, **kwargs):
+        kwargs.setdefault('knowledge_dir', str(tmp_path / "knowledge"))
+        kwargs.setdefault('response_cache', False)
+        engine = ResearchEngine(**kwargs)
+        engine.brain = FakeBrain()
+        engine.pipeline = pipeline or FakePipeline()
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.pipeline = None  # 가짜 Pipeline은 공유 레지스트리에 반환하지 않음
+        engine.close()
+
+
+def test_concurrent_requests_share_one_analysis(make_engine):
+    engine = make_engine()
+
+    async def scenario():
+        return await asyncio.gather(*(engine.meta_analyze("organoid") for _ in range(5)))
+
+    responses = asyncio.run(scenario())
+    assert responses == ["analysis #1"] * 5
+    assert len(engine.brain.prompts) == 1
+    assert engine._inflight == {}
+
+
+def test_bulk_analysis_deduplicates_topics(make_engine):
+    engine = make_engine()
+
+    async def scenario():
+        return [item async for item in engine.meta_analyze_many(["a", "b", "a"])]
+
+    results = asyncio.run(scenario())
+    assert sorted(topic for topic, _ in results) == ["a", "b"]
+    assert len(engine.brain.prompts) == 2
+
+
+def test_aborted_sweep_keeps_shared_analysis(make_engine):
+    """일괄 분석을 중단해도 같은 주제를 기다리던 meta_analyze는 결과를 받음"""
+    engine = make_engine(FakePipeline(search_delay=0.3))
+
+    async def scenario():
+        sweep = engine.meta_analyze_many(["organoid", "crispr"])
+        first = asyncio.ensure_future(sweep.__anext__())
+        await asyncio.sleep(0.05)  # 일괄 검색이 진행 중인 동안
+        shared = asyncio.ensure_future(engine.meta_analyze("organoid"))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await first
+        await sweep.aclose()
+        return await shared
+
+    response = asyncio.run(scenario())
+    assert response == "analysis #1"
+    assert len(engine.brain.prompts) == 1
+    assert "organoid" in engine.brain.prompts[0]
+
+
+def test_pipeline_warmup_is_not_counted_against_timeout(make_engine):
+    pipeline = FakePipeline(warmup_delay=0.4)
+    engine = make_engine(pipeline, retrieval_timeout=0.2)
+
+    async def scenario():
+        return await asyncio.gather(engine.retrieve("organoid"), engine.retrieve("crispr"))
+
+    organoid, crispr = asyncio.run(scenario())
+    assert [hit["source"] for hit in organoid] == ["organoid.pdf"]
+    assert [hit["source"] for hit in crispr] == ["crispr.pdf"]
+    assert pipeline.warmups == 1
+
+
+def test_slow_search_is_skipped_after_timeout(make_engine):
+    engine = make_engine(FakePipeline(search_delay=0.5), retrieval_timeout=0.1)
+
+    start = time.perf_counter()
+    evidence = asyncio.run(engine.retrieve("organoid"))
+    assert evidence == []
+    assert time.perf_counter() - start < 0.4
+
+
+def test_local_index_lives_in_shared_knowledge_dir(tmp_path, monkeypatch, make_engine):
+    """로컬 문서 인덱스는 프로젝트 루트의 knowledge_base가 아니라 공유 인덱스 폴더에 만듦"""
+    resolved = tmp_path / "resolved"
+    monkeypatch.setattr(research_engine, 'default_db_path', lambda: str(resolved))
+    notes = tmp_path / "02-Literature"
+    notes.mkdir()
+    (notes / "krt7.md").write_text("KRT7 staining in endometrial organoids", encoding="utf-8")
+
+    engine = make_engine(knowledge_dir=None)
+    assert engine.knowledge_dir == str(resolved)
+    assert os.path.exists(resolved / "local_docs.db")
+    assert not os.path.exists(tmp_path / "knowledge_base")
+
+    hits = engine._search_local(["krt7 organoids"])[0]
+    assert [hit["source"] for hit in hits] == ["02-Literature/krt7.md"]
+
+
+def test_response_cache_opens_on_first_use(tmp_path, make_engine):
+    engine = make_engine(response_cache=True)
+    cache_path = tmp_path / "knowledge" / "brain_cache.db"
+    assert not cache_path.exists()
+
+    async def scenario():
+        first = await engine.meta_analyze("organoid")
+        debate = await engine.meta_analyze("organoid", is_debate=True)
+        return first, debate, await engine.meta_analyze("organoid")
+
+    first, debate, again = asyncio.run(scenario())
+    assert cache_path.exists()
+    assert again == first == "analysis #1" and debate == "analysis #2"
+    assert len(engine.brain.prompts) == 2  # 토론은 캐시하지 않음
+
+
+def test_retrieval_runs_off_the_event_loop(make_engine):
+    """검색이 도는 동안에도 이벤트 루프의 다른 작업이 계속 실행됨"""
+    engine = make_engine(FakePipeline(search_delay=0.3))
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        background = asyncio.ensure_future(ticker())
+        evidence = await engine.retrieve("organoid")
+        background.cancel()
+        return evidence, ticks
+
+    evidence, ticks = asyncio.run(scenario())
+    assert [hit["source"] for hit in evidence] == ["organoid.pdf"]
+    assert ticks >= 10
+
+
+class CountingPipeline(FakePipeline):
+    """search_many 호출별 질의 수를 기록하는 Pipeline"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def search_many(self, queries, n_results=3):
+        self.batches.append(len(queries))
+        return super().search_many(queries, n_results)
+
+
+class ConcurrencyBrain(FakeBrain):
+    """동시에 진행 중인 think() 호출 수의 최댓값을 기록하는 Brain"""
+
+    def __init__(self):
+        super().__init__(delay=0.02)
+        self.active = self.peak = 0
+
+    async def think(self, prompt, task_type=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await super().think(prompt, task_type)
+        finally:
+            self.active -= 1
+
+
+def test_bulk_analysis_bounds_concurrency_and_batches_retrieval(make_engine):
+    engine = make_engine(CountingPipeline())
+    engine.brain = ConcurrencyBrain()
+    topics = [f"topic{i}" for i in range(10)]
+
+    async def scenario():
+        return [
+            item async for item in engine.meta_analyze_many(topics, concurrency=3, batch_size=4)
+        ]
+
+    results = asyncio.run(scenario())
+    assert sorted(topic for topic, _ in results) == sorted(topics)
+    assert engine.brain.peak == 3
+    assert engine.pipeline.batches == [4, 4, 2]
+
+
+class StreamingBrain(FakeBrain):
+    """think_stream()으로 응답을 조각내어 보내는 Brain"""
+
+    async def think_stream(self, prompt, task_type=None):
+        self.prompts.append(prompt)
+        for part in ("first ", "", "second"):
+            await asyncio.sleep(0)
+            yield part
+
+
+def _collect(engine, topic):
+    async def scenario():
+        return [event async for event in engine.meta_analyze_stream(topic)]
+
+    return asyncio.run(scenario())
+
+
+def test_stream_emits_progress_sources_chunks_done(make_engine):
+    engine = make_engine(response_cache=True)
+    engine.brain = StreamingBrain()
+
+    events = _collect(engine, "organoid")
+    assert [event["type"] for event in events] == [
+        "progress",
+        "sources",
+        "progress",
+        "chunk",
+        "chunk",
+        "done",
+    ]
+    assert [event["stage"] for event in events if event["type"] == "progress"] == [
+        "retrieval",
+        "generation",
+    ]
+    assert events[1]["sources"][0]["source"] == "organoid.pdf"
+    assert "".join(event["text"] for event in events if event["type"] == "chunk") == "first second"
+    assert events[-1]["info"]["cached"] is False
+
+    # 스트리밍으로 모은 응답이 캐시되어 다음 요청은 한 조각으로 바로 응답
+    cached = _collect(engine, "organoid")
+    assert [event["type"] for event in cached] == ["progress", "sources", "chunk", "done"]
+    assert cached[2]["text"] == "first second" and cached[-1]["info"]["cached"] is True
+    assert len(engine.brain.prompts) == 1
+
+
+def test_stream_without_think_stream_sends_whole_response(make_engine):
+    engine = make_engine()
+
+    events = _collect(engine, "organoid")
+    assert [event["type"] for event in events] == [
+        "progress",
+        "sources",
+        "progress",
+        "chunk",
+        "done",
+    ]
+    assert events[3]["text"] == "analysis #1"
@@ -0,0 +1,29 @@
+# tools/test_sbi_cache.py
+"""LRUCache 크기 제한, TTL 만료 테스트"""
+
+import sbi_cache
+from sbi_cache import LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    assert cache.get('b') is None and cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+    LRUCache(maxsize=0).put('a', 1)  # 크기 0이면 저장하지 않음
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(sbi_cache.time, 'monotonic', lambda: now[0])
+    cache = LRUCache(maxsize=4, ttl=10)
+    cache.put('a', 1)
+    now[0] += 10
+    assert cache.get('a') == 1
+    now[0] += 1
+    assert cache.get('a', 'expired') == 'expired'
+    assert len(cache) == 0 and cache.stats()['hit_rate'] == 0.5
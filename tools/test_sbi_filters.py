@@ -0,0 +1,112 @@
+# tools/test_sbi_filters.py
+"""메타데이터 필터 검색 테스트 (가짜 임베딩 모델, conftest.py 참고)"""
+
+import os
+from contextlib import closing
+
+import numpy as np
+import pytest
+
+import sbi_pipeline
+from conftest import write_docs
+from sbi_filter import SearchFilter
+from sbi_pipeline import SBIPipeline
+
+
+@pytest.fixture
+def short_first_pass(monkeypatch):
+    """첫 인덱스 검색(넓히기 전)이 k개를 채우지 못한 것처럼 마지막 결과를 비움 (IVF/HNSW 탐색 범위 부족)"""
+    index_search = SBIPipeline._index_search
+    calls = {'widened': 0, 'exact': 0}
+
+    def short_index_search(self, query_vectors, k, params=None):
+        distances, indices = index_search(self, query_vectors, k, params)
+        if params is not None and getattr(params, 'efSearch', self.ef_search) == self.ef_search:
+            indices[:, -1] = -1
+        elif params is not None:
+            calls['widened'] += 1
+        return distances, indices
+
+    exact_search = SBIPipeline._exact_search
+
+    def counted_exact_search(self, query_vectors, ids, k):
+        calls['exact'] += 1
+        return exact_search(self, query_vectors, ids, k)
+
+    monkeypatch.setattr(SBIPipeline, '_index_search', short_index_search)
+    monkeypatch.setattr(SBIPipeline, '_exact_search', counted_exact_search)
+    return calls
+
+
+def _first_chunk(pipeline, source: str) -> str:
+    return next(chunk['content'] for chunk in pipeline.store if chunk['source'] == source)
+
+
+def _sources(hits):
+    return [hit['source'] for hit in hits]
+
+
+@pytest.mark.parametrize('index_type', ['flat', 'hnsw'])
+def test_filtered_search(tmp_path, docs, index_type):
+    write_docs(docs, 3, prefix='org', folder='Papers')
+    with closing(
+        SBIPipeline(
+            str(docs),
+            str(tmp_path / "db"),
+            max_workers=1,
+            index_type=index_type,
+            domain_rules={'Papers/*': 'papers'},
+        )
+    ) as pipeline:
+        pipeline.load_and_index()
+        query = _first_chunk(pipeline, 'doc02.txt')
+
+        hits = pipeline.search(query, n_results=4, mode='dense', filters={'source': 'org*'})
+        assert len(hits) == 4 and all(s.startswith('org') for s in _sources(hits))
+        hits = pipeline.search(query, n_results=4, mode='dense', filters={'domain': 'papers'})
+        assert len(hits) == 4 and all(s.startswith('org') for s in _sources(hits))
+        assert pipeline.search(query, mode='dense', filters={'file_types': ('pdf',)}) == []
+        hits = pipeline.search(query, n_results=4, mode='dense', filters={'file_types': ('txt',)})
+        assert _sources(hits)[0] == 'doc02.txt'
+
+        # 새 세대에서는 같은 필터도 다시 평가되어 새 파일이 포함됨
+        write_docs(docs, 4, prefix='org', folder='Papers')
+        pipeline.load_and_index()
+        query = _first_chunk(pipeline, 'org03.txt')
+        hits = pipeline.search(query, n_results=4, mode='dense', filters={'source': 'org*'})
+        assert _sources(hits)[0] == 'org03.txt'
+
+
+def test_filter_scope_is_cached_per_generation(pipeline):
+    flt = SearchFilter(source='doc0*')
+    with pipeline.reading():
+        paths, ids = pipeline._filter_scope(flt, with_ids=True)
+        assert len(paths) == 10
+        assert pipeline._filter_scope(flt, with_ids=True)[1] is ids
+    np.testing.assert_array_equal(ids, pipeline.store.id_map().ids(paths))
+
+
+@pytest.mark.parametrize('exact_limit', [0, 20_000])
+def test_short_filtered_results_are_completed(
+    tmp_path, docs, monkeypatch, short_first_pass, exact_limit
+):
+    """후보가 EXACT_FILTER_LIMIT 이하이면 정확한 검색으로, 많으면 탐색 범위를 넓혀 보충"""
+    monkeypatch.setattr(sbi_pipeline, 'EXACT_FILTER_LIMIT', exact_limit)
+    pipeline = SBIPipeline(
+        str(docs), str(tmp_path / "db"), max_workers=1, index_type='hnsw', tombstone_ratio=1.0
+    )
+    try:
+        pipeline.load_and_index()
+        query = _first_chunk(pipeline, 'doc00.txt')
+        pipeline.remove_source(os.path.join(pipeline.onedrive_path, 'doc03.txt'))
+        hits = pipeline.search(query, n_results=20, mode='dense')
+        assert len(hits) == 20 and 'doc03.txt' not in [hit['source'] for hit in hits]
+        filtered = pipeline.search(query, n_results=6, mode='dense', filters={'source': 'doc1*'})
+        assert len(filtered) == 6 and all(hit['source'].startswith('doc1') for hit in filtered)
+    finally:
+        pipeline.close()
+
+    if exact_limit:
+        assert short_first_pass == {'widened': 0, 'exact': 2}
+    else:
+        assert short_first_pass == {'widened': 2, 'exact': 0}
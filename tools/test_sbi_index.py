@@ -0,0 +1,97 @@
+# tools/test_sbi_index.py
+"""인덱스 종류/압축 방식 선택과 학습 샘플 크기 테스트"""
+
+from contextlib import closing
+
+import numpy as np
+import pytest
+
+import sbi_pipeline
+from conftest import write_docs
+from sbi_pipeline import SBIPipeline, _factory_string, _min_train_points, _nlist_for, _train_points
+
+
+@pytest.mark.parametrize(
+    'kind, compression, expected',
+    [
+        ('flat', None, "Flat"),
+        ('flat', 'sq8', "SQ8"),
+        ('ivf', 'fp16', "IVF400,SQfp16"),
+        ('hnsw', None, "HNSW32"),
+        ('hnsw', 'pq', "HNSW32,PQ48"),
+        ('ivfpq', None, "IVF400,PQ48"),
+    ],
+)
+def test_factory_string(kind, compression, expected):
+    assert _nlist_for(10_000) == 400
+    assert _factory_string(kind, 10_000, compression=compression) == expected
+
+
+@pytest.mark.parametrize(
+    'index_type, compression, n, expected',
+    [
+        ('auto', None, 10_000, ('flat', None)),
+        ('auto', None, 100_000, ('ivf', None)),
+        ('auto', 'sq8', 2_000_000, ('ivfpq', None)),  # ivfpq는 자체 PQ 압축
+        ('ivf', None, 5_000, ('flat', None)),  # 학습 데이터 부족: flat으로 모아 둠
+        ('flat', 'pq', 5_000, ('flat', None)),
+        ('flat', 'pq', 20_000, ('flat', 'pq')),
+        ('hnsw', 'sq8', 500, ('flat', None)),
+        ('hnsw', 'sq8', 5_000, ('hnsw', 'sq8')),
+    ],
+)
+def test_target_index_config(pipeline, index_type, compression, n, expected):
+    pipeline.index_type = index_type
+    pipeline.compression = compression
+    assert pipeline._target_index_config(n) == expected
+
+
+def test_training_sample_is_bounded(pipeline, monkeypatch):
+    """학습 샘플은 코퍼스 크기가 아니라 인덱스 종류별 필요량으로 제한"""
+    assert _train_points('ivf', 1_000_000) == 39 * 4000
+    assert _train_points('flat', 1_000_000, 'pq') == 256 * 256
+    assert _train_points('ivfpq', 100_000_000) == 39 * 40_000
+    assert _train_points('flat', 10**6, 'sq8') == 1000 >= _min_train_points('flat', 10**6, 'sq8')
+
+    trained = []
+    index_factory = sbi_pipeline.faiss.index_factory
+
+    class RecordingIndex:
+        def __init__(self, index):
+            self.index = index
+            self.is_trained = index.is_trained
+
+        def train(self, sample):
+            trained.append(len(sample))
+            self.index.train(sample)
+
+    monkeypatch.setattr(
+        sbi_pipeline.faiss, 'index_factory', lambda *args: RecordingIndex(index_factory(*args))
+    )
+    vectors = np.random.default_rng(0).standard_normal((3000, 384)).astype('float32')
+    pipeline._build_index('flat', vectors, 'sq8')
+    pipeline.train_sample = 500
+    pipeline._build_index('flat', vectors, 'sq8')
+    assert trained == [1000, 500]
+
+
+def test_index_type_change_migrates_on_next_update(tmp_path, docs):
+    """설정한 인덱스 종류가 바뀌면 다음 갱신 때 살아 있는 벡터로 다시 만들고, 다시 열어도 유지"""
+    db = str(tmp_path / "db")
+    with closing(SBIPipeline(str(docs), db, max_workers=1)) as pipeline:
+        pipeline.load_and_index()
+        assert pipeline.index_kind == 'flat'
+        query = next(chunk['content'] for chunk in pipeline.store if chunk['source'] == 'doc07.txt')
+        expected = [hit['content'] for hit in pipeline.search(query, n_results=3, mode='dense')]
+
+    write_docs(docs, 1, prefix='late')
+    with closing(SBIPipeline(str(docs), db, max_workers=1, index_type='hnsw')) as pipeline:
+        pipeline.load_and_index()
+        assert pipeline.index_kind == 'hnsw'
+        assert pipeline.index.ntotal == len(pipeline.store)
+        hits = pipeline.search(query, n_results=3, mode='dense')
+        assert [hit['content'] for hit in hits] == expected
+
+    with closing(SBIPipeline(str(docs), db, max_workers=1, index_type='hnsw')) as reopened:
+        assert reopened.index_kind == 'hnsw'
+        assert reopened.search(query, n_results=3, mode='dense') == hits
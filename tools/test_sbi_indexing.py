@@ -0,0 +1,98 @@
+# tools/test_sbi_indexing.py
+"""SBIPipeline 인덱싱 테스트 (증분 스캔, 병렬 파싱 파이프라인, 파일 간 임베딩 배치)"""
+
+import os
+from contextlib import closing
+
+from conftest import FakeSentenceTransformer
+from sbi_pipeline import SBIPipeline
+
+
+def _chunks(pipeline):
+    return sorted(
+        (chunk['source'], chunk['start_offset'], chunk['content']) for chunk in pipeline.store
+    )
+
+
+def test_parallel_parsing_matches_sequential(tmp_path, docs):
+    with closing(SBIPipeline(str(docs), str(tmp_path / "seq"), max_workers=1)) as sequential:
+        sequential.load_and_index()
+        expected = _chunks(sequential)
+    with closing(SBIPipeline(str(docs), str(tmp_path / "par"), max_workers=3)) as parallel:
+        parallel.load_and_index()
+        assert _chunks(parallel) == expected
+        assert len(parallel.manifest) == 12
+        assert parallel.index.ntotal == len(expected)
+
+
+def test_unreadable_file_is_skipped_and_retried(tmp_path, docs):
+    broken = docs / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    with closing(SBIPipeline(str(docs), str(tmp_path / "db"), max_workers=2)) as pipeline:
+        pipeline.load_and_index()
+        assert len(pipeline.manifest) == 12 and str(broken) not in pipeline.manifest
+
+        # 실패한 파일은 manifest에 기록되지 않으므로 다음 스캔에서 다시 시도
+        changed, _ = pipeline._detect_changes(pipeline._scan_files())
+        assert [path for path, _ in changed] == [str(broken)]
+
+
+def test_rescan_reindexes_only_changed_files(pipeline, docs, monkeypatch):
+    """size/mtime이 같거나 내용 해시가 같은 파일은 다시 파싱하지 않음"""
+    paths = {name: str(docs / name) for name in ('doc00.txt', 'doc01.txt', 'doc02.txt')}
+    before = {name: pipeline.store.id_map().ids([path]).tolist() for name, path in paths.items()}
+    parsed = []
+    parse_files = SBIPipeline._parse_files
+
+    def record(self, changed):
+        parsed.extend(path for path, _ in changed)
+        return parse_files(self, changed)
+
+    monkeypatch.setattr(SBIPipeline, '_parse_files', record)
+    os.utime(paths['doc00.txt'], ns=(0, 10**18))  # 내용은 그대로, mtime만 바뀜
+    (docs / 'doc01.txt').write_text("rewritten " * 200)
+    os.remove(paths['doc02.txt'])
+    pipeline.load_and_index()
+
+    assert parsed == [paths['doc01.txt']]
+    assert pipeline.manifest[paths['doc00.txt']]['mtime_ns'] == 10**18
+    assert pipeline.store.id_map().ids([paths['doc00.txt']]).tolist() == before['doc00.txt']
+    assert set(pipeline.store.id_map().ids([paths['doc01.txt']])).isdisjoint(before['doc01.txt'])
+    assert paths['doc02.txt'] not in pipeline.manifest
+    assert pipeline.store.id_map().ids([paths['doc02.txt']]).tolist() == []
+
+    pipeline.load_and_index()
+    assert parsed == [paths['doc01.txt']]
+
+
+def test_embedding_batches_span_files(tmp_path, docs, monkeypatch):
+    """파일당 청크 수와 관계없이 encode는 batch_size개씩 (마지막 배치만 작음)"""
+    batches = []
+    encode = FakeSentenceTransformer.encode
+
+    def record(self, texts, batch_size=32, **kwargs):
+        batches.append(len(texts))
+        return encode(self, texts, batch_size=batch_size, **kwargs)
+
+    monkeypatch.setattr(FakeSentenceTransformer, 'encode', record)
+    with closing(
+        SBIPipeline(str(docs), str(tmp_path / "db"), max_workers=1, batch_size=16, save_every=100)
+    ) as pipeline:
+        pipeline.load_and_index()
+        chunks = len(pipeline.store)
+    assert chunks == 50 and batches == [16, 16, 16, 2]
+
+    # 토큰 예산(청크 1000자는 약 200토큰으로 추정)이 먼저 차면 batch_size보다 작은 배치로 나눔
+    batches.clear()
+    with closing(
+        SBIPipeline(
+            str(docs),
+            str(tmp_path / "tokens"),
+            max_workers=1,
+            batch_size=16,
+            max_batch_tokens=1024,
+            save_every=100,
+        )
+    ) as pipeline:
+        pipeline.load_and_index()
+    assert sum(batches) == 50 and max(batches) == 5
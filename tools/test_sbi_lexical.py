@@ -0,0 +1,52 @@
+# tools/test_sbi_lexical.py
+"""BM25 역색인(LexicalIndex)과 토큰 분리 테스트"""
+
+import sqlite3
+
+import pytest
+
+from sbi_lexical import LexicalIndex, estimate_tokens, tokenize
+
+
+@pytest.fixture
+def lexical():
+    conn = sqlite3.connect(":memory:")
+    yield LexicalIndex(conn)
+    conn.close()
+
+
+def _df(index: LexicalIndex):
+    return dict(index.conn.execute("SELECT term, df FROM terms"))
+
+
+def _expected_df(index: LexicalIndex):
+    return dict(index.conn.execute("SELECT term, COUNT(*) FROM postings GROUP BY term"))
+
+
+def test_tokenize_keeps_compound_markers_and_hangul_bigrams():
+    assert tokenize("Cytokeratin-7 양성") == ["cytokeratin-7", "cytokeratin", "7", "양성"]
+    assert tokenize("오가노이드를") == ["오가", "가노", "노이", "이드", "드를"]
+    assert estimate_tokens("abcdefgh") == 2 and estimate_tokens("세포") == 2
+
+
+def test_search_ranks_by_bm25(lexical):
+    lexical.add(1, "KRT7 organoid culture")
+    lexical.add(2, "KRT7 KRT7 KRT7 staining")
+    lexical.add(3, "unrelated text")
+    hits = lexical.search("krt7", k=5)
+    assert [chunk_id for chunk_id, _ in hits] == [2, 1]
+    assert lexical.search("krt7", k=5, restrict=("SELECT ?", [1]))[0][0] == 1
+
+
+def test_remove_updates_document_frequencies(lexical):
+    for chunk_id in range(1, 301):
+        lexical.add(chunk_id, f"shared term{chunk_id % 7} only{chunk_id}")
+    lexical.remove(range(1, 201))
+    lexical.remove([250, 250, 999])  # 중복/없는 id는 무시
+
+    assert len(lexical) == 99
+    assert _df(lexical) == _expected_df(lexical)
+    assert _df(lexical)["shared"] == 99
+    assert "only5" not in _df(lexical)
+    assert [chunk_id for chunk_id, _ in lexical.search("only260")] == [260]
+    assert lexical.search("only250") == []
@@ -0,0 +1,61 @@
+# tools/test_sbi_migration.py
+"""이전 버전(faiss_index.bin + knowledge_data.pkl) 인덱스를 현재 저장소 구성으로 이전하는 테스트"""
+
+import os
+import pickle
+
+import faiss
+import pytest
+
+from conftest import EMBEDDING_DIM, FakeSentenceTransformer
+from sbi_pipeline import SBIPipeline
+
+
+@pytest.fixture
+def legacy_db(tmp_path, docs):
+    """기준 버전 SBIPipeline.save_index()와 같은 형식으로 저장된 인덱스 (파일당 청크 2개)"""
+    db = tmp_path / "db"
+    db.mkdir()
+    paths = sorted(str(path) for path in docs.iterdir())[:3]
+    metadata = [
+        {"content": f"{os.path.basename(path)} part {part}", "source": os.path.basename(path)}
+        for path in paths
+        for part in range(2)
+    ]
+    index = faiss.IndexFlatL2(EMBEDDING_DIM)
+    index.add(FakeSentenceTransformer('legacy').encode([m['content'] for m in metadata]))
+    faiss.write_index(index, str(db / "faiss_index.bin"))
+    with open(db / "knowledge_data.pkl", 'wb') as f:
+        pickle.dump({'metadata': metadata, 'indexed_files': set(paths)}, f)
+    return db, paths
+
+
+def test_baseline_index_is_migrated(docs, legacy_db):
+    db, paths = legacy_db
+    pipeline = SBIPipeline(str(docs), str(db), max_workers=1)
+    try:
+        assert pipeline._load_error is None
+        assert len(pipeline.store) == 6 and pipeline.index.ntotal == 6
+        assert sorted(pipeline.manifest) == paths
+        assert not (db / "faiss_index.bin").exists() and not (db / "knowledge_data.pkl").exists()
+        assert pipeline.snapshot == "faiss_index.000001.bin"
+
+        hit = pipeline.search("doc01.txt part 1", n_results=1)[0]
+        assert hit['content'] == "doc01.txt part 1" and hit['distance'] == 0.0
+        assert {chunk['path'] for chunk in pipeline.store} == set(paths)
+
+        # 해시가 없는 이전 항목은 내용을 다시 인덱싱하지 않고 현재 상태로 채택
+        pipeline.load_and_index()
+        assert all(pipeline.manifest[path]['sha256'] for path in paths)
+        assert [c['content'] for c in pipeline.store][:6] == [
+            f"doc{i:02d}.txt part {part}" for i in range(3) for part in range(2)
+        ]
+    finally:
+        pipeline.close()
+
+    reopened = SBIPipeline(str(docs), str(db), max_workers=1)
+    try:
+        assert len(reopened.store) == len(pipeline.store)
+        assert reopened.search("doc02.txt part 0", n_results=1)[0]['source'] == 'doc02.txt'
+    finally:
+        reopened.close()
@@ -0,0 +1,122 @@
+# tools/test_sbi_persistence.py
+"""SBIPipeline 저장/로드 테스트 (memory-map 로드, 세그먼트 커밋과 복구)"""
+
+import os
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from conftest import write_docs
+from sbi_pipeline import SBIPipeline
+
+
+def _first_chunk(pipeline, source: str) -> str:
+    """파일의 첫 청크 본문 (가짜 임베딩에서는 이 본문으로 검색하면 그 청크가 거리 0으로 나옴)"""
+    return next(chunk['content'] for chunk in pipeline.store if chunk['source'] == source)
+
+
+def _open(tmp_path, docs, **kwargs) -> SBIPipeline:
+    return SBIPipeline(str(docs), str(tmp_path / "db"), max_workers=1, **kwargs)
+
+
+def test_index_is_memory_mapped_until_first_write(pipeline, docs):
+    query = _first_chunk(pipeline, 'doc03.txt')
+    expected = pipeline.search(query, n_results=5, mode='dense')
+    pipeline.compact()  # 스냅샷 이후 추가분(tail)이 있으면 다시 추가해야 하므로 매핑하지 않음
+    pipeline.close()
+
+    with closing(SBIPipeline(str(docs), pipeline.db_path, max_workers=1)) as reopened:
+        assert reopened._index_mmapped
+        assert reopened.search(query, n_results=5, mode='dense') == expected
+
+        write_docs(docs, 1, prefix='late')
+        reopened.load_and_index()  # 수정 전에 전체를 메모리로 다시 읽음
+        assert not reopened._index_mmapped
+        assert reopened.index.ntotal == len(reopened.store)
+        assert reopened.search(query, n_results=5, mode='dense') == expected
+
+    with closing(SBIPipeline(str(docs), pipeline.db_path, max_workers=1, mmap=False)) as in_memory:
+        assert not in_memory._index_mmapped
+        assert in_memory.search(query, n_results=5, mode='dense') == expected
+
+
+def test_reload_returns_same_results(pipeline, tmp_path, docs):
+    query = _first_chunk(pipeline, 'doc03.txt')
+    expected = pipeline.search(query, n_results=5, mode='dense')
+    assert expected[0]['source'] == 'doc03.txt'
+    pipeline.close()
+
+    with closing(_open(tmp_path, docs)) as reopened:
+        assert len(reopened.store) == len(pipeline.store)
+        assert reopened.search(query, n_results=5, mode='dense') == expected
+
+
+def test_missing_segment_keeps_disk_state(pipeline, tmp_path, docs):
+    chunks = len(pipeline.store)
+    segment = os.path.join(pipeline.segment_dir, pipeline.vectors.segments[0])
+    pipeline.close()
+
+    moved = segment + '.bak'
+    os.replace(segment, moved)
+    with closing(_open(tmp_path, docs)) as broken:
+        assert broken._load_error is not None
+        assert broken.search('doc0w1', mode='lexical') == []
+        with pytest.raises(RuntimeError):
+            broken.load_and_index()
+
+    # 실패한 로드가 청크/manifest를 지우지 않음
+    conn = sqlite3.connect(str(tmp_path / "db" / "knowledge.db"))
+    assert conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0] == chunks
+    assert conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 12
+    conn.close()
+
+    os.replace(moved, segment)
+    with closing(_open(tmp_path, docs)) as restored:
+        assert restored._load_error is None
+        assert len(restored.store) == chunks
+        assert restored.search('doc0w1', mode='lexical')[0]['source'] == 'doc00.txt'
+
+
+def test_interrupted_indexing_resumes_from_checkpoint(tmp_path, docs, monkeypatch):
+    publish = SBIPipeline._publish
+    calls = []
+
+    def crash_on_second(self, files, parts):
+        calls.append(len(files))
+        result = publish(self, files, parts)
+        if len(calls) == 2:
+            raise KeyboardInterrupt  # 반영 후 체크포인트 저장 전에 중단
+        return result
+
+    monkeypatch.setattr(SBIPipeline, '_publish', crash_on_second)
+    with closing(_open(tmp_path, docs, save_every=4)) as crashed:
+        with pytest.raises(KeyboardInterrupt):
+            crashed.load_and_index()
+    # 닫을 때 커밋되지 않은 청크는 버려짐
+    monkeypatch.setattr(SBIPipeline, '_publish', publish)
+
+    with closing(_open(tmp_path, docs, save_every=4)) as resumed:
+        assert resumed._load_error is None
+        assert len(resumed.manifest) == 4
+        assert len(resumed.vectors) == resumed.store.next_pos
+
+        resumed.load_and_index()
+        assert len(resumed.manifest) == 12
+        assert len(resumed.vectors) == resumed.store.next_pos == len(resumed.store)
+        query = _first_chunk(resumed, 'doc09.txt')
+        assert resumed.search(query, mode='dense')[0]['source'] == 'doc09.txt'
+
+
+def test_tail_after_snapshot_is_replayed_on_load(pipeline, tmp_path, docs):
+    snapshot = pipeline.snapshot
+    write_docs(docs, 2, prefix='late')
+    pipeline.load_and_index()
+    assert pipeline.snapshot == snapshot  # 추가분이 snapshot_ratio 미만이면 스냅샷은 그대로
+    pipeline.close()
+
+    with closing(_open(tmp_path, docs)) as reopened:
+        assert reopened.snapshot_rows < reopened.store.next_pos
+        assert reopened.index.ntotal == len(reopened.store)
+        query = _first_chunk(reopened, 'late01.txt')
+        assert reopened.search(query, mode='dense')[0]['source'] == 'late01.txt'
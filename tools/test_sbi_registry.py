@@ -0,0 +1,78 @@
+# tools/test_sbi_registry.py
+"""공유 레지스트리 테스트 (키별 1회 로드, 참조 카운트, 마지막 참조에서 닫기)"""
+
+import threading
+import time
+
+import pytest
+
+from sbi_pipeline import SBIPipeline
+from sbi_registry import SharedRegistry, acquire_pipeline, models, pipelines, release_pipeline
+
+
+def test_concurrent_acquire_loads_once_and_closes_on_last_release():
+    closed = []
+    registry = SharedRegistry("test", on_close=closed.append)
+    created = []
+
+    def factory():
+        time.sleep(0.05)  # 로드 중에 다른 스레드가 같은 키를 요청
+        created.append(object())
+        return created[-1]
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.acquire("key", factory)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1 and results == created * 4
+    assert registry.stats() == {"key": 4}
+    assert [registry.release("key") for _ in range(4)] == [False, False, False, True]
+    assert closed == created and registry.stats() == {}
+    assert registry.release("key") is False
+
+
+def test_failed_load_is_not_cached():
+    registry = SharedRegistry("test")
+
+    def broken():
+        raise OSError("model download failed")
+
+    with pytest.raises(OSError):
+        registry.acquire("key", broken)
+    assert registry.stats() == {}
+    assert registry.acquire("key", lambda: "loaded") == "loaded"
+
+
+def test_pipelines_share_instance_and_model(tmp_path, docs, monkeypatch):
+    closed = []
+    close = SBIPipeline.close
+
+    def recording_close(self):
+        closed.append(self)
+        close(self)
+
+    monkeypatch.setattr(SBIPipeline, 'close', recording_close)
+    db = str(tmp_path / "db")
+    first = acquire_pipeline(db, onedrive_path=str(docs), max_workers=1)
+    second = acquire_pipeline(db)
+    assert second is first
+
+    other = SBIPipeline(str(docs), str(tmp_path / "other"), max_workers=1)
+    try:
+        first.load_and_index()
+        other.load_and_index()
+        assert other.model is first.model  # 임베딩 모델은 db_path와 관계없이 공유
+        assert list(models.stats().values()) == [2]
+    finally:
+        other.close()
+
+    assert release_pipeline(first) is False and closed == [other]
+    assert release_pipeline(second) is True and closed == [other, first]
+    assert pipelines.stats() == {} and models.stats() == {}
+    assert release_pipeline(first) is False
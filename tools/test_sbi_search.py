@@ -0,0 +1,69 @@
+# tools/test_sbi_search.py
+"""SBIPipeline 검색 API 테스트 (일괄 검색, 결과 캐시, 검색 방식)"""
+
+from conftest import FakeSentenceTransformer, write_docs
+from sbi_pipeline import DEFAULT_SEARCH_MODE, SBIPipeline
+
+
+def _first_chunk(pipeline, source: str) -> str:
+    return next(chunk['content'] for chunk in pipeline.store if chunk['source'] == source)
+
+
+def test_default_mode_keeps_dense_result_shape(pipeline):
+    assert pipeline.search_mode == DEFAULT_SEARCH_MODE == 'dense'
+    hits = pipeline.search(_first_chunk(pipeline, 'doc04.txt'), n_results=3)
+    assert [set(hit) for hit in hits] == [{'content', 'source', 'page', 'distance'}] * 3
+    assert hits[0]['source'] == 'doc04.txt' and hits[0]['distance'] == 0.0
+
+
+def test_hybrid_and_lexical_are_opt_in(pipeline, monkeypatch):
+    hits = pipeline.search("doc7w3 doc7w4", n_results=3, mode='lexical')
+    assert hits[0]['source'] == 'doc07.txt' and hits[0]['score'] > 0
+
+    hits = pipeline.search("doc7w3 doc7w4", n_results=3, mode='hybrid')
+    assert 'doc07.txt' in [hit['source'] for hit in hits]
+    assert all('score' in hit for hit in hits)
+
+    monkeypatch.setenv('SBI_SEARCH_MODE', 'hybrid')
+    configured = SBIPipeline(pipeline.onedrive_path, pipeline.db_path, max_workers=1)
+    try:
+        assert configured.search_mode == 'hybrid'
+        assert 'score' in configured.search("doc7w3")[0]
+    finally:
+        configured.close()
+
+
+def test_search_many_matches_single_searches_with_one_encode(pipeline, monkeypatch):
+    queries = [_first_chunk(pipeline, f'doc{i:02d}.txt') for i in (1, 5, 9)] + ["doc3w7"]
+    expected = [pipeline.search(query, n_results=4, mode='dense') for query in queries]
+    pipeline._embedding_cache.clear()
+    pipeline._result_cache.clear()
+
+    encoded = []
+    encode = FakeSentenceTransformer.encode
+
+    def record(self, texts, batch_size=32, **kwargs):
+        encoded.append(list(texts))
+        return encode(self, texts, batch_size=batch_size, **kwargs)
+
+    monkeypatch.setattr(FakeSentenceTransformer, 'encode', record)
+    results = pipeline.search_many(queries + queries[:1], n_results=4, mode='dense')
+    assert results == expected + expected[:1]
+    assert encoded == [queries]  # 중복 질의는 한 번만, 전체를 한 번의 encode로
+    assert pipeline.search_many([], n_results=4) == []
+
+
+def test_cached_results_are_dropped_when_the_index_changes(pipeline, docs):
+    query = "doc2w5 late0w5"
+    first = pipeline.search(query, n_results=3, mode='lexical')
+    first[0]['source'] = 'mutated'  # 반환값을 바꿔도 캐시는 그대로
+    assert pipeline.search(query, n_results=3, mode='lexical')[0]['source'] == 'doc02.txt'
+    assert pipeline.cache_stats()['results']['hits'] == 1
+
+    generation = pipeline.generation
+    write_docs(docs, 1, prefix='late')
+    pipeline.load_and_index()
+    assert pipeline.generation > generation
+    sources = [hit['source'] for hit in pipeline.search(query, n_results=3, mode='lexical')]
+    assert 'late00.txt' in sources
+    assert pipeline.cache_stats()['results']['hits'] == 1
@@ -0,0 +1,90 @@
+# tools/test_sbi_shards.py
+"""ShardedPipeline 테스트 (폴더별 샤드, 전역 병합 검색, 샤드 재구성/삭제)"""
+
+import os
+import shutil
+from contextlib import closing
+
+import pytest
+
+from conftest import write_docs
+from sbi_pipeline import SBIPipeline
+from sbi_shards import ROOT_SHARD, ShardedPipeline
+
+
+@pytest.fixture
+def folders(docs):
+    """루트 문서 12개 + 최상위 폴더 두 개"""
+    write_docs(docs, 3, prefix='org', folder='Papers')
+    write_docs(docs, 2, prefix='note', folder=os.path.join('Notes', 'daily'))
+    return docs
+
+
+@pytest.fixture
+def sharded(tmp_path, folders):
+    with closing(
+        ShardedPipeline(str(folders), str(tmp_path / "shards"), search_workers=2, max_workers=1)
+    ) as pipeline:
+        pipeline.load_and_index()
+        yield pipeline
+
+
+def _chunk(pipeline, source: str) -> str:
+    return next(chunk['content'] for chunk in pipeline.store if chunk['source'] == source)
+
+
+def test_search_matches_single_index(sharded, tmp_path, folders):
+    assert sorted(sharded.shards) == sorted([ROOT_SHARD, 'Notes', 'Papers'])
+    assert sharded.shard_of(os.path.join(str(folders), 'Notes', 'daily', 'note00.txt')) == 'Notes'
+
+    with closing(SBIPipeline(str(folders), str(tmp_path / "single"), max_workers=1)) as single:
+        single.load_and_index()
+        assert len(sharded) == len(single.store)
+        queries = [_chunk(single, 'doc03.txt'), _chunk(single, 'org01.txt')]
+        for mode in ('dense', 'lexical', 'hybrid'):
+            expected = single.search_many(queries, n_results=6, mode=mode)
+            found = sharded.search_many(queries, n_results=6, mode=mode)
+            assert [[hit['content'] for hit in hits] for hits in found] == [
+                [hit['content'] for hit in hits] for hits in expected
+            ]
+        assert sharded.search('org2w5', mode='lexical')[0]['source'] == 'org02.txt'
+
+
+def test_indexing_one_shard_leaves_others_untouched(sharded, folders):
+    generations = {name: shard.generation for name, shard in sharded.shards.items()}
+    write_docs(folders, 4, prefix='org', folder='Papers')
+
+    sharded.load_and_index(shards=['Papers'])
+    changed = [
+        name for name, shard in sharded.shards.items() if shard.generation != generations[name]
+    ]
+    assert changed == ['Papers']
+    assert sharded.stats()['Papers']['files'] == 4
+    assert sharded.search('org3w7', mode='lexical')[0]['source'] == 'org03.txt'
+
+
+def test_rebuild_and_drop_swap_shard_directories(sharded, tmp_path, folders):
+    query = _chunk(sharded.shards['Papers'], 'org00.txt')
+    expected = sharded.search(query, n_results=4, mode='dense')
+    old_directory = sharded.stats()['Papers']['directory']
+
+    sharded.rebuild_shard('Papers')
+    new_directory = sharded.stats()['Papers']['directory']
+    assert new_directory != old_directory
+    assert not os.path.exists(os.path.join(sharded.shard_dir, old_directory))
+    assert sharded.search(query, n_results=4, mode='dense') == expected
+
+    shutil.rmtree(os.path.join(str(folders), 'Notes'))
+    sharded.load_and_index()
+    assert sorted(sharded.shards) == sorted([ROOT_SHARD, 'Papers'])
+    assert len(os.listdir(sharded.shard_dir)) == 2
+    expected = sharded.search(query, n_results=4, mode='dense')
+    assert not any(hit['source'].startswith('note') for hit in expected)
+    sharded.close()
+
+    # 샤드 매핑(shards.json)으로 다시 열면 재구성한 디렉터리를 그대로 사용
+    with closing(
+        ShardedPipeline(str(folders), str(tmp_path / "shards"), max_workers=1)
+    ) as reopened:
+        assert reopened.stats()['Papers']['directory'] == new_directory
+        assert reopened.search(query, n_results=4, mode='dense') == expected
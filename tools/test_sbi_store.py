@@ -0,0 +1,135 @@
+# tools/test_sbi_store.py
+"""ChunkStore / RawVectorStore / ChunkIdMap 단위 테스트"""
+
+import sqlite3
+
+import numpy as np
+import pytest
+
+from sbi_filter import ChunkIdMap
+from sbi_store import ChunkStore, RawVectorStore
+
+
+def _chunk(path: str, i: int):
+    return {'content': f"{path} chunk {i}", 'source': path, 'path': path, 'page': None}
+
+
+def test_id_map_is_sized_by_rows_not_id_range():
+    id_map = ChunkIdMap()
+    id_map.add(5, 'a.txt', 0)
+    id_map.add(1_000_000, 'b.txt', 1)
+    id_map.add(1_000_001, 'a.txt', 2)
+
+    assert len(id_map) == 3
+    assert id_map.rows([1_000_000, 5, 7]).tolist() == [1, 0, -1]
+    assert id_map.ids(['a.txt']).tolist() == [5, 1_000_001]
+
+    id_map.discard([5, 5, 42])
+    assert len(id_map) == 2
+    assert id_map.rows([5]).tolist() == [-1]
+    assert id_map.ids(['a.txt']).tolist() == [1_000_001]
+    assert id_map.live_ids().tolist() == [1_000_000, 1_000_001]
+
+
+def test_id_map_rejects_out_of_order_ids():
+    id_map = ChunkIdMap()
+    id_map.add(3, 'a.txt', 0)
+    with pytest.raises(ValueError):
+        id_map.add(2, 'a.txt', 1)
+
+
+def test_remove_paths_records_tombstones(tmp_path):
+    store = ChunkStore(str(tmp_path / "knowledge.db"))
+    ids = store.extend([_chunk('a.txt', i) for i in range(3)] + [_chunk('b.txt', 0)])
+    store.flush()
+    assert store.id_map().ids(['a.txt']).tolist() == ids[:3]
+
+    removed = store.remove_paths(['a.txt'])
+    store.flush()
+    assert sorted(removed) == ids[:3]
+    assert len(store) == 1 and store.tombstones == 3
+    assert store.tombstone_ids().tolist() == ids[:3]
+    assert store.id_map().live_ids().tolist() == [ids[3]]
+    assert store.next_pos == 4  # 원본 벡터 행은 정리 전까지 유지
+
+    live_ids, rows = store.live_rows()
+    id_map = store.renumber(live_ids, rows)
+    assert store.tombstone_ids().tolist() == ids[:3]  # 반영 전까지 메모리 상태는 그대로
+    store.adopt_renumbered(id_map)
+    store.flush()
+    assert store.tombstones == 0 and store.next_pos == 1
+    assert store.tombstone_ids().tolist() == []
+    assert store.id_map().rows([ids[3]]).tolist() == [0]
+    store.close()
+
+
+def test_read_snapshot_sees_commits_from_other_connections(tmp_path):
+    path = str(tmp_path / "knowledge.db")
+    writer = ChunkStore(path)
+    writer.extend([_chunk('a.txt', 0)])
+    writer.flush()
+
+    reader = ChunkStore(path)
+    assert len(reader) == 1
+
+    writer.extend([_chunk('b.txt', 0), _chunk('b.txt', 1)])
+    writer.set_state('marker', 3)
+    writer.flush()
+    assert len(reader) == 1  # 카운트는 연결할 때 읽은 값
+    with reader.read_snapshot():
+        assert len(reader) == 3
+        assert reader.next_pos == 3
+        assert reader.get_state('marker') == 3
+    writer.close()
+    reader.close()
+
+
+def test_vector_segments_and_orphan_cleanup(tmp_path):
+    store = RawVectorStore(str(tmp_path / "segments"), 4)
+    store.open([])
+    first = np.arange(8, dtype='float32').reshape(2, 4)
+    store.append(first)
+    committed = store.flush()
+    store.append(first + 100)
+    store.flush()  # 커밋(open)되지 않은 세그먼트
+
+    reopened = RawVectorStore(str(tmp_path / "segments"), 4)
+    reopened.open([committed])
+    assert len(reopened) == 2
+    np.testing.assert_array_equal(reopened.get([1, 0]), first[[1, 0]])
+
+    reopened.remove_orphans()
+    assert sorted(p.name for p in (tmp_path / "segments").iterdir()) == [committed]
+
+
+def test_chunk_rows_survive_in_sqlite(tmp_path):
+    """청크는 SQLite에 커밋되어 다른 연결(다른 프로세스)에서도 그대로 읽힘"""
+    path = str(tmp_path / "knowledge.db")
+    store = ChunkStore(path)
+    store.extend([_chunk('a.txt', i) for i in range(5)])
+    store.flush()
+    assert store[1]['content'] == "a.txt chunk 1" and store[-1]['pos'] == 4
+    with pytest.raises(IndexError):
+        store[5]
+    store.close()
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0] == 5
+    conn.close()
+
+
+def test_shared_contents_are_reference_counted(tmp_path):
+    store = ChunkStore(str(tmp_path / "knowledge.db"))
+    same = {'content': "identical abstract", 'source': 'x', 'page': None}
+    store.extend([dict(same, path='a.txt'), dict(same, path='a.txt'), dict(same, path='b.txt')])
+    store.flush()
+
+    store.remove_paths(['a.txt'])
+    store.flush()
+    refs = store._conn.execute("SELECT refs FROM contents").fetchall()
+    assert refs == [(1,)]
+    assert [chunk['content'] for chunk in store] == ["identical abstract"]
+
+    store.remove_paths(['b.txt'])
+    store.flush()
+    assert store._conn.execute("SELECT COUNT(*) FROM contents").fetchone()[0] == 0
+    store.close()
@@ -0,0 +1,122 @@
+# tools/test_sbi_sync.py
+"""읽기/쓰기 잠금과 인덱싱 중 동시 검색 테스트"""
+
+import threading
+import time
+
+from conftest import write_docs
+from sbi_sync import RWLock
+
+
+def _start(target) -> threading.Thread:
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_readers_share_and_writer_is_exclusive():
+    lock = RWLock()
+    events = []
+    both_reading = threading.Barrier(2, timeout=5)
+
+    def reader(name):
+        with lock.read():
+            both_reading.wait()  # 두 reader가 동시에 잠금 안에 있어야 통과
+            events.append(name)
+            time.sleep(0.05)
+
+    def writer():
+        with lock.write():
+            events.append('w')
+
+    readers = [_start(lambda name=name: reader(name)) for name in ('r1', 'r2')]
+    time.sleep(0.01)
+    for thread in readers + [_start(writer)]:
+        thread.join(5)
+    assert sorted(events[:2]) == ['r1', 'r2'] and events[2] == 'w'
+
+
+def test_waiting_writer_blocks_new_readers():
+    lock = RWLock()
+    order = []
+    release_first = threading.Event()
+
+    def first_reader():
+        with lock.read():
+            release_first.wait(5)
+        order.append('r1 done')
+
+    def writer():
+        with lock.write():
+            order.append('w')
+
+    def late_reader():
+        with lock.read():
+            order.append('r2')
+
+    threads = [_start(first_reader)]
+    time.sleep(0.02)
+    threads.append(_start(writer))
+    time.sleep(0.02)
+    threads.append(_start(late_reader))
+    time.sleep(0.02)
+    assert order == []  # writer는 r1을, r2는 대기 중인 writer를 기다림
+    release_first.set()
+    for thread in threads:
+        thread.join(5)
+    assert order == ['r1 done', 'w', 'r2']
+
+
+def test_reentrant_acquisition():
+    lock = RWLock()
+    with lock.write():
+        with lock.write(), lock.read():
+            pass
+        assert lock._owner == threading.get_ident()
+    assert lock._owner is None
+
+    written = []
+
+    def writer():
+        with lock.write():
+            written.append(threading.get_ident())
+
+    with lock.read():
+        waiting = _start(writer)
+        time.sleep(0.02)
+        with lock.read():  # 대기 중인 writer가 있어도 이미 잡은 스레드는 다시 읽을 수 있음
+            assert written == []
+    waiting.join(5)
+    assert written == [waiting.ident] and lock._owner is None
+
+
+def test_search_sees_only_published_generations(pipeline, docs):
+    """인덱싱 중에 검색해도 청크 저장소와 인덱스가 항상 같은 세대를 가리킴"""
+    query = next(chunk['content'] for chunk in pipeline.store if chunk['source'] == 'doc00.txt')
+    write_docs(docs, 8, prefix='late')
+    pipeline.save_every = 1
+    stop = threading.Event()
+    seen, errors = [], []
+
+    def searcher():
+        try:
+            while not stop.is_set():
+                with pipeline.reading():
+                    hits = pipeline.search(query, n_results=5, mode='dense')
+                    seen.append((len(pipeline.store), pipeline.index.ntotal, len(hits)))
+                    assert hits[0]['content'] == query
+        except Exception as e:  # 스레드의 실패를 본 테스트로 전달
+            errors.append(e)
+
+    searchers = [_start(searcher) for _ in range(3)]
+    try:
+        pipeline.load_and_index()
+    finally:
+        stop.set()
+        for thread in searchers:
+            thread.join(10)
+
+    assert errors == []
+    assert all(chunks == ntotal and hits == 5 for chunks, ntotal, hits in seen)
+    assert len({chunks for chunks, _, _ in seen}) > 1  # 중간 세대도 관찰됨
+    assert len(pipeline.manifest) == 20
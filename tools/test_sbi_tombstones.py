@@ -0,0 +1,82 @@
+# tools/test_sbi_tombstones.py
+"""청크 id 기반 삭제/갱신 테스트 (tombstone 제외, 정리와 병합, 파일 단위 교체)"""
+
+import os
+from contextlib import closing
+
+from sbi_pipeline import SBIPipeline
+
+
+def _first_chunk(pipeline, source: str) -> str:
+    """파일의 첫 청크 본문 (가짜 임베딩에서는 이 본문으로 검색하면 그 청크가 거리 0으로 나옴)"""
+    return next(chunk['content'] for chunk in pipeline.store if chunk['source'] == source)
+
+
+def _sources(hits):
+    return [hit['source'] for hit in hits]
+
+
+def _live_exact(pipeline, query: str, k: int):
+    """살아 있는 청크 전체에 대한 정확한 검색 결과 (청크 id 목록)"""
+    query_vectors = pipeline._embed_queries([query])
+    _, indices = pipeline._exact_search(query_vectors, pipeline.store.id_map().live_ids(), k)
+    return [int(i) for i in indices[0] if i >= 0]
+
+
+def _open(tmp_path, docs, **kwargs) -> SBIPipeline:
+    return SBIPipeline(str(docs), str(tmp_path / "db"), max_workers=1, **kwargs)
+
+
+def test_removed_source_is_excluded_before_purge(tmp_path, docs):
+    with closing(_open(tmp_path, docs, tombstone_ratio=1.0)) as pipeline:
+        pipeline.load_and_index()
+        query = _first_chunk(pipeline, 'doc05.txt')
+        removed = pipeline.remove_source(os.path.join(pipeline.onedrive_path, 'doc05.txt'))
+
+        assert removed and pipeline.store.tombstones == removed
+        assert pipeline.index.ntotal == len(pipeline.store) + removed
+        hits = pipeline.search(query, n_results=8, mode='dense')
+        assert len(hits) == 8 and 'doc05.txt' not in _sources(hits)
+        expected = pipeline.store.get_by_ids(_live_exact(pipeline, query, 8))
+        assert [hit['content'] for hit in hits] == [chunk['content'] for chunk in expected]
+        assert pipeline.search('doc5w3', mode='lexical') == []
+
+
+def test_tombstones_are_purged_and_compacted(tmp_path, docs):
+    with closing(_open(tmp_path, docs, tombstone_ratio=0.01, save_every=3)) as pipeline:
+        pipeline.load_and_index()
+        assert len(pipeline.vectors.segments) > 1
+        query = _first_chunk(pipeline, 'doc01.txt')
+        pipeline.remove_source(os.path.join(pipeline.onedrive_path, 'doc01.txt'))
+
+        assert pipeline.store.tombstones == 0
+        assert pipeline.index.ntotal == len(pipeline.store) == len(pipeline.vectors)
+        assert pipeline.store.next_pos == len(pipeline.store)
+
+        pipeline.compact()
+        assert len(pipeline.vectors.segments) == 1
+        assert pipeline.snapshot_rows == len(pipeline.vectors)
+        hits = pipeline.search(query, n_results=5, mode='dense')
+        assert 'doc01.txt' not in _sources(hits)
+
+    with closing(_open(tmp_path, docs)) as reopened:
+        assert reopened.search(query, n_results=5, mode='dense') == hits
+
+
+def test_update_source_replaces_only_that_file(pipeline, docs):
+    """갱신한 파일의 청크만 새 id로 교체되고, 다른 파일의 청크 id는 그대로"""
+    before = {chunk['id']: chunk['source'] for chunk in pipeline.store}
+    path = os.path.join(pipeline.onedrive_path, 'doc04.txt')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(" ".join(f"new4w{j}" for j in range(400)))
+
+    added = pipeline.update_source(path)
+    after = {chunk['id']: chunk['source'] for chunk in pipeline.store}
+    kept = {i: source for i, source in before.items() if source != 'doc04.txt'}
+    assert {i: source for i, source in after.items() if i in before} == kept
+    assert sorted(source for i, source in after.items() if i not in before) == ['doc04.txt'] * added
+
+    assert pipeline.search('doc4w3', mode='lexical') == []
+    assert _sources(pipeline.search('new4w3', mode='lexical')) == ['doc04.txt']
+    query = _first_chunk(pipeline, 'doc04.txt')
+    assert pipeline.search(query, n_results=1, mode='dense')[0]['content'] == query
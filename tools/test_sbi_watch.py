@@ -0,0 +1,151 @@
+# tools/test_sbi_watch.py
+"""백그라운드 인덱싱 테스트 (변경 감지와 debounce, 샤드 단위 반영, 정리 중에도 막히지 않는 검색)"""
+
+import os
+import threading
+import time
+import types
+
+import pytest
+
+from conftest import write_docs
+
+
+@pytest.mark.parametrize('index_type', ['flat', 'hnsw'])
+def test_purge_builds_outside_exclusive_lock(tmp_path, docs, index_type):
+    from sbi_pipeline import SBIPipeline
+
+    pipeline = SBIPipeline(
+        str(docs), str(tmp_path / "db"), max_workers=1, index_type=index_type, tombstone_ratio=1.0
+    )
+    try:
+        pipeline.load_and_index()
+        query = next(chunk['content'] for chunk in pipeline.store if chunk['source'] == 'doc04.txt')
+        pipeline.remove_source(os.path.join(pipeline.onedrive_path, 'doc04.txt'))
+        assert pipeline.store.tombstones
+        expected = pipeline.search(query, n_results=6, mode='dense')
+
+        renumber = pipeline.store.renumber
+        during = {}
+
+        def renumber_with_search(ids, positions):
+            # pos 갱신과 새 인덱스 구성은 끝났지만 아직 교체 전: 다른 스레드의 검색이 바로 끝나야 함
+            id_map = renumber(ids, positions)
+            searcher = threading.Thread(
+                target=lambda: during.update(hits=pipeline.search(query, n_results=6, mode='dense'))
+            )
+            searcher.start()
+            searcher.join(timeout=10)
+            during['blocked'] = searcher.is_alive()
+            return id_map
+
+        pipeline.store.renumber = renumber_with_search
+        pipeline.compact()
+
+        assert during == {'blocked': False, 'hits': expected}
+        assert pipeline.store.tombstones == 0
+        assert pipeline.index.ntotal == len(pipeline.store) == len(pipeline.vectors)
+        assert pipeline.search(query, n_results=6, mode='dense') == expected
+    finally:
+        pipeline.close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    import sbi_watch
+
+    clock = FakeClock()
+    monkeypatch.setattr(
+        sbi_watch,
+        'time',
+        types.SimpleNamespace(monotonic=clock, perf_counter=time.perf_counter, time=time.time),
+    )
+    return clock
+
+
+def test_poll_waits_for_changes_to_settle(pipeline, docs, clock):
+    from sbi_watch import IndexWatcher
+
+    watcher = IndexWatcher(pipeline, debounce=10, max_delay=25, use_watchdog=False)
+    assert watcher.poll(force=True) and watcher.runs == 1
+    assert not watcher.poll()
+
+    write_docs(docs, 1, prefix='late')
+    assert not watcher.poll() and watcher.pending
+    clock.now += 9
+    assert not watcher.poll()
+    clock.now += 1
+    assert watcher.poll() and watcher.runs == 2 and not watcher.pending
+    assert pipeline.search('late0w3', mode='lexical')[0]['source'] == 'late00.txt'
+
+    # 계속 바뀌는 파일도 max_delay가 지나면 반영
+    for step in range(3):
+        write_docs(docs, 1, words=400 + step, prefix='busy')
+        assert not watcher.poll()
+        clock.now += 9
+    write_docs(docs, 1, words=500, prefix='busy')
+    assert watcher.poll() and watcher.runs == 3
+    assert pipeline.search('busy0w450', mode='lexical')[0]['source'] == 'busy00.txt'
+
+    # 바뀌었다가 원래대로 돌아오면 인덱싱하지 않음
+    os.remove(os.path.join(str(docs), 'busy00.txt'))
+    assert not watcher.poll() and watcher.pending
+    busy = os.path.join(str(docs), 'busy00.txt')
+    write_docs(docs, 1, words=500, prefix='busy')
+    os.utime(busy, ns=(watcher._indexed[busy][1], watcher._indexed[busy][1]))
+    clock.now += 10
+    assert not watcher.poll() and not watcher.pending and watcher.runs == 3
+
+
+def test_sharded_watch_indexes_only_changed_shards(tmp_path, docs, clock, monkeypatch):
+    from sbi_shards import ShardedPipeline
+    from sbi_watch import IndexWatcher
+
+    write_docs(docs, 2, prefix='org', folder='Papers')
+    write_docs(docs, 2, prefix='note', folder='Notes')
+    sharded = ShardedPipeline(str(docs), str(tmp_path / "shards"), max_workers=1)
+    try:
+        watcher = IndexWatcher(sharded, debounce=1, use_watchdog=False)
+        assert watcher.poll(force=True)
+
+        calls = []
+        load_and_index = sharded.load_and_index
+        monkeypatch.setattr(
+            sharded,
+            'load_and_index',
+            lambda shards=None: calls.append(shards) or load_and_index(shards=shards),
+        )
+        write_docs(docs, 3, prefix='org', folder='Papers')
+        assert not watcher.poll()
+        clock.now += 1
+        assert watcher.poll()
+        assert calls == [['Papers']]
+        assert sharded.search('org2w3', mode='lexical')[0]['source'] == 'org02.txt'
+    finally:
+        sharded.close()
+
+
+def test_background_thread_indexes_new_files(pipeline, docs):
+    from sbi_watch import IndexWatcher
+
+    watcher = IndexWatcher(pipeline, interval=0.05, debounce=0.05, use_watchdog=False).start()
+    try:
+        deadline = time.monotonic() + 10
+        while watcher.runs < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        write_docs(docs, 1, prefix='late')
+        while watcher.runs < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert watcher.stats()['running'] and watcher.runs == 2
+        assert pipeline.search('late0w3', mode='lexical')[0]['source'] == 'late00.txt'
+    finally:
+        watcher.stop(timeout=10)
+    assert not watcher.stats()['running']
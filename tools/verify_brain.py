@@ -39,13 +39,15 @@ def verify_brain():
     # 3. SBI Pipeline 검증
     print("-" * 50)
     try:
-        from sbi_pipeline import SBIPipeline
+        from sbi_registry import acquire_pipeline, release_pipeline
         print("[OK] SBIPipeline imported successfully")
         try:
-            pipeline = SBIPipeline()
+            # 프로세스 공유 인스턴스 사용 (ResearchEngine이 같은 인덱스/모델을 재사용)
+            pipeline = acquire_pipeline()
             print(f"[OK] SBIPipeline initialized")
             print(f"     OneDrive: {pipeline.onedrive_path}")
             print(f"     DB Path: {pipeline.db_path}")
+            release_pipeline(pipeline)
         except Exception as e:
             print(f"[WARN] SBIPipeline init failed: {e}")
     except ImportError as e:
@@ -54,13 +56,17 @@ def verify_brain():
     # 4. ResearchEngine 검증
     print("-" * 50)
     try:
-        from research_engine import ResearchEngine
+        from research_engine import ResearchEngine, PIPELINE_AVAILABLE
         print("[OK] ResearchEngine imported successfully")
         try:
             engine = ResearchEngine()
             print("[OK] ResearchEngine initialized")
             print(f"     Brain: {'Available' if engine.brain else 'Not available'}")
-            print(f"     Pipeline: {'Available' if engine.pipeline else 'Not available'}")
+            # Pipeline은 첫 검색 때 로드되므로 여기서는 사용 가능 여부만 표시 (3번에서 초기화 검증)
+            print(
+                "     Pipeline: "
+                + ('Available (loaded on first use)' if PIPELINE_AVAILABLE else 'Not available')
+            )
         except Exception as e:
             print(f"[WARN] ResearchEngine init failed: {e}")
     except ImportError as e: